@@ -1,22 +1,17 @@
 # app.py
 
-from cognite.client.config import global_config
 import streamlit as st
 from utils.themes import get_plotly_template
 from ui.sidebar import render_sidebar
-from logic.dashboard_data import load_dashboard_data
 from logic.depletion import VALVE_CLASS_MAP, FLOW_THRESHOLDS
-from ui.dashboard import render_dashboard
-from ui.overview import render_overview
-from ui.eds_cycles import render_eds_cycles
-from ui.pressure_cycles import render_pressure_cycles
-from ui.analog_trends import render_analog_trends
+from ui.pages import PAGES, lazy_import, needs_rig_data, page_renderer
 from utils.colors import OC_COLORS, BY_COLORS, FLOW_COLORS, FLOW_CATEGORY_ORDER
 from logic.tag_maps import get_rig_tags
-from logic.data_loaders import get_pressure_df
-from logic.preprocessing import to_ms
-from datetime import timedelta
+from logic import instrumentation
+from ui_components import render_profile
+import config
 import pandas as pd
+from datetime import date
 
 st.set_page_config(
     page_title="BOP Valve Dashboard",
@@ -42,17 +37,14 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+if config.CACHE_WARMER:
+    lazy_import("logic.cache_warmer").start_cache_warmer()
+
 params = st.query_params
 requested_rig = params.get("rig")
 requested_theme = params.get("theme")
 
-available_pages = [
-    "Valve Analytics",
-    "Pods Overview",
-    "EDS Cycles",
-    "Pressure Cycles",
-    "Analog Trends",
-]
+available_pages = list(PAGES)
 requested_page = params.get("page")
 page_from_deeplink = requested_page if requested_page in available_pages else available_pages[0]
 
@@ -72,6 +64,17 @@ default_rig = rig_map.get(requested_rig, None)
 sidebar_args = dict(default_rig=default_rig, default_page=page_from_deeplink)
 rig, start_date, end_date, category_windows, page = render_sidebar(**sidebar_args)
 
+# Fetches still queued for the page or rig this session just left are no
+# longer wanted; cancel them before this run queues its own
+lazy_import("logic.fetch_scheduler").cancel_on_change(
+    st.session_state, (rig, st.session_state.get("sidebar_page", page)),
+)
+
+# Per-run pipeline diagnostics: INSTRUMENTATION=1 for everyone, ?diagnostics=1 per session
+trace = instrumentation.begin(f"{rig} / {page}", force=params.get("diagnostics") == "1")
+# Render profiler (figure/table payloads, section build times): ?profile=1
+profile = render_profile.begin(f"{rig} / {page}", enabled=params.get("profile") == "1")
+
 oc_colors = OC_COLORS
 by_colors = BY_COLORS
 flow_colors = FLOW_COLORS
@@ -87,20 +90,49 @@ per_valve_simple_map = tags["per_valve_simple_map"]
 per_valve_function_map = tags["per_valve_function_map"]
 valve_order = list(valve_map.keys())
 
+# Data extents of the rig's tags, looked up in the background so later
+# fetches skip dead tags and out-of-range windows (logic/tag_catalog.py)
+if config.TAG_CATALOG:
+    tag_catalog = lazy_import("logic.tag_catalog")
+    tag_catalog.get_tag_catalog().refresh(tag_catalog.rig_external_ids(rig))
+
 data_key = f"{rig}_{start_date}_{end_date}"
+live_key = f"{rig}_{start_date}_live"
+# Live tail: keep polling new datapoints and update the tables incrementally
+live = st.sidebar.toggle(
+    "Live tail",
+    key="live_tail",
+    disabled=end_date < date.today(),
+    help=f"Poll for new data every {config.LIVE_POLL_S:g} s (the date range must end today).",
+) and end_date >= date.today()
 if st.sidebar.button("Reload Data"):
-    for key in [data_key, data_key + "_pressure"]:
+    for key in [data_key, data_key + "_pressure", live_key]:
         if key in st.session_state:
             del st.session_state[key]
 
-# Load analytics data (+ precomputed cycles + well pressure)
-if data_key not in st.session_state:
-    df, vol_df, cycles_df, well_pressure_series = load_dashboard_data(
-        rig, start_date, end_date, category_windows, valve_map,
-        per_valve_simple_map, per_valve_function_map,
-        VALVE_CLASS_MAP, vol_ext, pressure_map,
-        active_pod_tag, FLOW_THRESHOLDS
-    )
+# Fleet, Analog Trends and Long-Range Trends load their own data (ui/pages.py)
+own_data_page = not needs_rig_data(st.session_state.get("sidebar_page", page))
+
+if own_data_page:
+    df = vol_df = cycles_df = well_pressure_series = None
+elif live:
+    tail = st.session_state.get(live_key)
+    if tail is None or tail.category_windows != dict(category_windows):
+        tail = lazy_import("logic.live_tail").LiveTail(rig, start_date, category_windows, tags, VALVE_CLASS_MAP, FLOW_THRESHOLDS)
+        with instrumentation.stage("live_tail", tag=rig), st.spinner("Loading live data…"):
+            tail.refresh()
+        st.session_state[live_key] = tail
+    df, vol_df, cycles_df, well_pressure_series = tail.outputs()
+# Load analytics data (+ precomputed cycles + well pressure); months in the
+# materialized store are read, the rest is computed (logic/event_store.py)
+elif data_key not in st.session_state:
+    with instrumentation.stage("load_dashboard_data", tag=rig):
+        df, vol_df, cycles_df, well_pressure_series = lazy_import("logic.event_store").load_dashboard(
+            rig, start_date, end_date, category_windows, valve_map,
+            per_valve_simple_map, per_valve_function_map,
+            VALVE_CLASS_MAP, vol_ext, pressure_map,
+            active_pod_tag, FLOW_THRESHOLDS
+        )
     st.session_state[data_key] = (df, vol_df, cycles_df, well_pressure_series)
 else:
     df, vol_df, cycles_df, well_pressure_series = st.session_state[data_key]
@@ -113,20 +145,15 @@ if isinstance(cycles_df, pd.DataFrame) and not cycles_df.empty:
 
 # Pressure series cache (for regulator traces)
 pressure_key = data_key + "_pressure"
-if pressure_key not in st.session_state:
-    sm = to_ms(start_date)
-    em = to_ms(end_date + timedelta(days=1)) - 1
-    pressure_results = get_pressure_df(pressure_map, sm, em)
-
-    pressure_series_by_valve = {}
+if own_data_page:
+    pressure_series_by_valve = regulator_pressure_series_map = {}
+elif live:
+    pressure_series_by_valve = tail.pressure_series_by_valve()
+    regulator_pressure_series_map = {v: pressure_series_by_valve.get(v) for v in valve_order}
+elif pressure_key not in st.session_state:
+    pressure_series_by_valve = lazy_import("logic.event_store").load_pressures(rig, pressure_map, start_date, end_date)
     wp_series = well_pressure_series
 
-    for p_df in pressure_results:
-        valve_name = p_df["valve"].iat[0]
-        p_ser = p_df.set_index(p_df.index)["pressure"].sort_index()
-        p_ser.index = pd.to_datetime(p_ser.index)
-        pressure_series_by_valve[valve_name] = p_ser
-
     regulator_pressure_series_map = {}
     for v in valve_order:
         ser = pressure_series_by_valve.get(v)
@@ -153,58 +180,72 @@ if st.query_params.get("page") != current_page:
 page = current_page
 
 # Render
-if df is not None and vol_df is not None:
-    if page == "Valve Analytics":
-        render_dashboard(
-            df=df,
-            vol_df=vol_df,
-            plotly_template=plotly_template,
-            oc_colors=oc_colors,
-            flow_colors=flow_colors,
-            flow_category_order=flow_category_order,
-            valve_order=valve_order,
-            cycles_df=filtered_cycles_df,  # cycles already filtered by Rare
-        )
-
-    elif page == "Pods Overview":
-        render_overview(
-            df=df,
-            vol_df=vol_df,
-            plotly_template=plotly_template,
-            oc_colors=oc_colors,
-            by_colors=by_colors,
-            flow_colors=flow_colors,
-            flow_category_order=flow_category_order,
-        )
-
-    elif page == "EDS Cycles":
-        render_eds_cycles(
-            rig, start_date, end_date,
-            valve_map=valve_map,
-            per_valve_simple_map=per_valve_simple_map,
-            per_valve_function_map=per_valve_function_map,
-            vol_ext=vol_ext,
-            active_pod_tag=active_pod_tag,
-            eds_base_tag=eds_base_tag,
-        )
-
-    elif page == "Pressure Cycles":
-        if isinstance(well_pressure_series, pd.Series) and not well_pressure_series.empty:
-            render_pressure_cycles(
-                df=df,
-                valve_map=valve_map,
-                well_pressure_series=well_pressure_series,
-                pressure_series_by_valve=regulator_pressure_series_map,
-                cycles_df=filtered_cycles_df,  # cycles already filtered by Rare
-            )
-        else:
-            st.warning("No well pressure data available for analysis.")
+with render_profile.section(page):
+    render = page_renderer(page)
+    if page == "Fleet":
+        render(start_date, end_date, category_windows, rare_thr, plotly_template)
+    elif page == "Long-Range Trends":
+        render(rig, start_date, end_date, plotly_template)
     elif page == "Analog Trends":
-        render_analog_trends(
+        render(
             rig=rig,
             default_start=start_date,
             default_end=end_date,
             template=plotly_template,
         )
-else:
-    st.info("Please click **Load Data** in the sidebar to get started.")
+    elif df is not None and vol_df is not None:
+        if page == "Valve Analytics":
+            render(
+                df=df,
+                vol_df=vol_df,
+                plotly_template=plotly_template,
+                oc_colors=oc_colors,
+                flow_colors=flow_colors,
+                flow_category_order=flow_category_order,
+                valve_order=valve_order,
+                cycles_df=filtered_cycles_df,  # cycles already filtered by Rare
+            )
+
+        elif page == "Pods Overview":
+            render(
+                df=df,
+                vol_df=vol_df,
+                plotly_template=plotly_template,
+                oc_colors=oc_colors,
+                by_colors=by_colors,
+                flow_colors=flow_colors,
+                flow_category_order=flow_category_order,
+            )
+
+        elif page == "EDS Cycles":
+            render(
+                rig, start_date, end_date,
+                valve_map=valve_map,
+                per_valve_simple_map=per_valve_simple_map,
+                per_valve_function_map=per_valve_function_map,
+                vol_ext=vol_ext,
+                active_pod_tag=active_pod_tag,
+                eds_base_tag=eds_base_tag,
+            )
+
+        elif page == "Pressure Cycles":
+            if well_pressure_series is not None and not well_pressure_series.empty:
+                render(
+                    df=df,
+                    valve_map=valve_map,
+                    well_pressure_series=well_pressure_series,
+                    pressure_series_by_valve=regulator_pressure_series_map,
+                    cycles_df=filtered_cycles_df,  # cycles already filtered by Rare
+                )
+            else:
+                st.warning("No well pressure data available for analysis.")
+    else:
+        st.info("Please click **Load Data** in the sidebar to get started.")
+
+if live and not own_data_page:
+    lazy_import("ui_components.live_status").render_live_status(live_key)
+
+render_profile.render_profile(render_profile.end(profile))
+trace = instrumentation.end(trace)
+if trace is not None:
+    lazy_import("ui_components.diagnostics").render_diagnostics(trace)
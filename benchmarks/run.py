@@ -0,0 +1,194 @@
+# benchmarks/run.py
+#
+# Times the logic pipeline on synthetic rigs (logic/synthetic.py) and
+# compares against a stored baseline.
+#
+#   python -m benchmarks.run                      # all scales vs baseline.json
+#   python -m benchmarks.run --scales week month  # subset
+#   python -m benchmarks.run --update-baseline    # record a new baseline
+#
+# Timings are the best of --repeat runs; peak memory comes from one extra
+# run under tracemalloc so it does not slow the timed runs down. Memoization
+# (logic/memo.py) is off, so every run measures the computation itself.
+
+import argparse
+import contextlib
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import config as app_config
+import logic.data_loaders as data_loaders
+from logic.dashboard_data import fill_minute_gaps_with_ffill
+from logic.data_sources import SyntheticSource, set_data_source
+from logic.depletion import DEFAULT_CATEGORY_WINDOWS, VALVE_CLASS_MAP, load_and_preprocess
+from logic.eds import analyze_eds_windows, load_eds_signals
+from logic.ingest import concat_frames
+from logic.preprocessing import compute_transitions, extract_ramp, to_ms
+from logic.pressure import assign_max_pressure_vectorized, assign_max_well_pressure
+from logic.pressure_cycles import analyze_pressure_cycles
+from logic.synthetic import SyntheticConfig, SyntheticRig
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+SCALES = {
+    "week":     SyntheticConfig(days=7, sample_hz=0.1),
+    "week-1hz": SyntheticConfig(days=7, sample_hz=1.0),
+    "month":    SyntheticConfig(days=30, sample_hz=0.1),
+    "year":     SyntheticConfig(days=365, sample_hz=1 / 60),
+}
+DEFAULT_SCALES = ["week", "week-1hz", "month"]
+
+
+@contextlib.contextmanager
+def synthetic_source(rig):
+    previous = set_data_source(SyntheticSource(rigs=[rig]))
+    try:
+        yield
+    finally:
+        set_data_source(previous)
+
+
+def _measure(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return out, best, peak
+
+
+def run_scale(config, repeat=3):
+    """Load one synthetic rig through the data_loaders and time every stage
+    on the previous stage's output, in dashboard order."""
+    rig = SyntheticRig(config)
+    tags = rig.tags
+    sm = to_ms(rig.start_date)
+    em = to_ms(rig.end_date + pd.Timedelta(days=1)) - 1
+    results = {}
+
+    def stage(name, fn, rows):
+        out, seconds, peak = _measure(fn, repeat)
+        results[name] = {
+            "seconds": round(seconds, 5),
+            "rows": int(rows),
+            "rows_per_s": round(rows / seconds) if seconds > 0 else None,
+            "peak_mb": round(peak / 2**20, 2),
+        }
+        return out
+
+    with synthetic_source(rig):
+        vol_df = fill_minute_gaps_with_ffill(data_loaders.get_volume_df(tags["vol_ext"], sm, em))
+        valve_df = concat_frames(data_loaders.get_valve_df(
+            tags["valve_map"], tags["per_valve_simple_map"], tags["per_valve_function_map"], sm, em
+        )).sort_index()
+        pressures = {p["valve"].cat.categories[0]: p["pressure"]
+                     for p in data_loaders.get_pressure_df(tags["pressure_map"], sm, em)}
+        signals = load_eds_signals(config.rig, rig.start_date, rig.end_date, tags["valve_map"],
+                                   tags["vol_ext"], tags["active_pod_tag"], tags["eds_base_tag"])
+
+    trans = stage("compute_transitions", lambda: compute_transitions(valve_df), len(valve_df))
+    events = stage("extract_ramp",
+                   lambda: extract_ramp(trans, vol_df, VALVE_CLASS_MAP, DEFAULT_CATEGORY_WINDOWS),
+                   len(trans) + len(vol_df))
+
+    def max_pressure():
+        out = np.full(len(events), np.nan)
+        for valve, ser in pressures.items():
+            mask = (events["valve"] == valve).to_numpy()
+            if valve != "Well Pressure" and mask.any():
+                out[mask] = assign_max_pressure_vectorized(events[mask], ser, VALVE_CLASS_MAP, DEFAULT_CATEGORY_WINDOWS)
+        return out
+    events["Max Pressure"] = stage("assign_max_pressure_vectorized", max_pressure, len(events))
+
+    wp = pressures["Well Pressure"]
+    events["Max Well Pressure"] = stage(
+        "assign_max_well_pressure",
+        lambda: assign_max_well_pressure(events, wp, VALVE_CLASS_MAP, DEFAULT_CATEGORY_WINDOWS),
+        len(events),
+    )
+    stage("analyze_pressure_cycles",
+          lambda: analyze_pressure_cycles(events[["timestamp", "valve", "state"]], tags["valve_map"], wp),
+          len(events))
+    stage("load_and_preprocess", lambda: load_and_preprocess(events), len(events))
+
+    window_rows = sum(len(s) for windows in signals["valves"].values() for s in windows)
+    stage("analyze_eds_windows",
+          lambda: analyze_eds_windows(signals, tags["per_valve_simple_map"], tags["per_valve_function_map"]),
+          max(window_rows, 1))
+    return results
+
+
+def compare(current, baseline, tolerance):
+    """Rows of (scale, stage, seconds, baseline seconds, ratio, regressed)."""
+    rows = []
+    for scale, stages in current.items():
+        for name, r in stages.items():
+            base = baseline.get(scale, {}).get(name)
+            if not base:
+                rows.append((scale, name, r["seconds"], None, None, False))
+                continue
+            ratio = r["seconds"] / base["seconds"] if base["seconds"] > 0 else float("inf")
+            rows.append((scale, name, r["seconds"], base["seconds"], ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the logic pipeline on synthetic rigs.")
+    parser.add_argument("--scales", nargs="+", default=DEFAULT_SCALES, choices=sorted(SCALES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", type=Path, help="also write this run's results here")
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+    app_config.MEMO = False
+
+    results = {}
+    for scale in args.scales:
+        print(f"[BENCH] {scale} ...", flush=True)
+        results[scale] = run_scale(SCALES[scale], repeat=args.repeat)
+
+    meta = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+    }
+    report = {"meta": meta, "results": results}
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+    baseline = json.loads(args.baseline.read_text())["results"] if args.baseline.exists() else {}
+    rows = compare(results, baseline, args.tolerance)
+    print(f"{'scale':<9} {'stage':<32} {'seconds':>9} {'baseline':>9} {'ratio':>6} {'rows/s':>12} {'peak MB':>8}")
+    for scale, name, sec, base, ratio, regressed in rows:
+        r = results[scale][name]
+        print(f"{scale:<9} {name:<32} {sec:>9.4f} "
+              f"{'' if base is None else f'{base:.4f}':>9} {'' if ratio is None else f'{ratio:.2f}':>6} "
+              f"{r['rows_per_s'] or 0:>12,} {r['peak_mb']:>8.1f}{'  REGRESSION' if regressed else ''}")
+
+    if args.update_baseline:
+        merged = {**baseline, **results}
+        args.baseline.write_text(json.dumps({"meta": meta, "results": merged}, indent=2) + "\n")
+        print(f"[BENCH] baseline written to {args.baseline}")
+        return 0
+    return 1 if any(r[-1] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,4 +15,96 @@ SCOPES = "delfi-sauth-cognitedata-api-audience"
 # SAuth Settings
 CDF_CLIENT_ID = os.getenv("CDF_CLIENT_ID")
 CDF_CLIENT_SECRET = os.getenv("CDF_CLIENT_SECRET")
-AUTHORITY_HOST_URI = os.getenv("AUTHORITY_HOST_URI", "https://login.microsoftonline.com")
\ No newline at end of file
+AUTHORITY_HOST_URI = os.getenv("AUTHORITY_HOST_URI", "https://login.microsoftonline.com")
+
+# Data source behind data_loaders.fetch_timeseries_df:
+#   "cognite"   live CDF (default)
+#   "replay"    local Parquet files, one per external id, under REPLAY_DIR
+#   "synthetic" logic/synthetic.py rigs generated on the fly
+DATA_SOURCE = os.getenv("DATA_SOURCE", "cognite").lower()
+REPLAY_DIR = os.getenv("REPLAY_DIR", "replay_data")
+SYNTHETIC_START = os.getenv("SYNTHETIC_START", "2024-01-01")
+SYNTHETIC_DAYS = float(os.getenv("SYNTHETIC_DAYS", "30"))
+SYNTHETIC_HZ = float(os.getenv("SYNTHETIC_HZ", "0.1"))
+
+# Fault injection for the offline sources (ignored for "cognite")
+SOURCE_LATENCY_MS = float(os.getenv("SOURCE_LATENCY_MS", "0"))
+SOURCE_JITTER_MS = float(os.getenv("SOURCE_JITTER_MS", "0"))
+SOURCE_FAILURE_RATE = float(os.getenv("SOURCE_FAILURE_RATE", "0"))
+SOURCE_SEED = int(os.getenv("SOURCE_SEED", "0"))
+# Simulated rate limit: calls beyond this many in flight get a 429 (0 = off)
+SOURCE_MAX_CONCURRENT = int(os.getenv("SOURCE_MAX_CONCURRENT", "0"))
+SOURCE_RETRY_AFTER_S = float(os.getenv("SOURCE_RETRY_AFTER_S", "0.5"))
+
+# Pipeline diagnostics (logic/instrumentation.py). INSTRUMENTATION traces every
+# run (``?diagnostics=1`` turns it on for one session); INSTRUMENTATION_MEMORY
+# also tracks peak allocations via tracemalloc, which slows the app noticeably.
+INSTRUMENTATION = os.getenv("INSTRUMENTATION", "0") == "1"
+INSTRUMENTATION_MEMORY = os.getenv("INSTRUMENTATION_MEMORY", "0") == "1"
+
+# Process-wide fetch pool shared by every session (logic/fetch_scheduler.py)
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+# Upstream calls in flight are sized by AIMD (logic/rate_control.py) between
+# 1 and FETCH_WORKERS, starting here; calls slower than the target count as
+# congestion. The SDK's own retries are capped so 429s reach the controller.
+FETCH_CONCURRENCY_START = int(os.getenv("FETCH_CONCURRENCY_START", "4"))
+FETCH_LATENCY_TARGET_S = float(os.getenv("FETCH_LATENCY_TARGET_S", "10"))
+CDF_SDK_MAX_RETRIES = int(os.getenv("CDF_SDK_MAX_RETRIES", "2"))
+
+# Sidebar default date range: the last N days up to today
+DEFAULT_LOOKBACK_DAYS = int(os.getenv("DEFAULT_LOOKBACK_DAYS", "60"))
+
+# Background cache warmer (logic/cache_warmer.py): when on, each app process
+# fills every rig's default-window caches at startup and then daily at the
+# local HH:MM times in CACHE_WARM_TIMES, at prefetch priority.
+CACHE_WARMER = os.getenv("CACHE_WARMER", "0") == "1"
+CACHE_WARM_TIMES = [t.strip() for t in os.getenv("CACHE_WARM_TIMES", "05:30").split(",") if t.strip()]
+CACHE_WARM_ON_START = os.getenv("CACHE_WARM_ON_START", "1") == "1"
+
+# Live-tail mode (logic/live_tail.py): seconds between polls for new datapoints
+LIVE_POLL_S = float(os.getenv("LIVE_POLL_S", "10"))
+
+# Materialized analytics (logic/event_store.py, written by tools/materialize.py):
+# months held here are read instead of recomputed; empty disables the store
+EVENT_STORE_DIR = os.getenv("EVENT_STORE_DIR", "event_store")
+
+# Multi-resolution rollups (logic/rollups.py): fetches of the signals
+# Analog Trends and Long-Range Trends read as rollups are folded into
+# 1 min / 1 h / 1 day summaries. Analog Trends plots rollups instead of raw
+# samples for ranges longer than ANALOG_RAW_MAX_DAYS, at the coarsest level
+# still giving ROLLUP_MIN_POINTS buckets. The store holds up to ROLLUP_MAX_MB; the last
+# ROLLUP_SETTLE_S seconds before a fetch are fetched again next time.
+ROLLUPS = os.getenv("ROLLUPS", "1") == "1"
+ANALOG_RAW_MAX_DAYS = int(os.getenv("ANALOG_RAW_MAX_DAYS", "62"))
+ROLLUP_MIN_POINTS = int(os.getenv("ROLLUP_MIN_POINTS", "1000"))
+ROLLUP_MAX_MB = int(os.getenv("ROLLUP_MAX_MB", "512"))
+ROLLUP_SETTLE_S = float(os.getenv("ROLLUP_SETTLE_S", "300"))
+
+# Cross-process shared store (logic/shared_store.py) for deployments with
+# several server processes: loaded rig data is published once as Arrow IPC
+# files here (ideally on tmpfs, e.g. /dev/shm/bop) and memory-mapped by all
+# of them. Empty keeps the per-process st.cache_data behaviour.
+SHARED_STORE_DIR = os.getenv("SHARED_STORE_DIR", "")
+SHARED_STORE_MAX_MB = int(os.getenv("SHARED_STORE_MAX_MB", "4096"))
+
+# Chunked series (logic/chunked_series.py): the cached loaders hold well and
+# regulator pressures as chunks of delta-encoded timestamps and float64
+# values, compressed with CHUNKED_SERIES_CODEC (lz4, zstd; empty for none)
+CHUNKED_SERIES = os.getenv("CHUNKED_SERIES", "1") == "1"
+CHUNKED_SERIES_CODEC = os.getenv("CHUNKED_SERIES_CODEC", "lz4")
+
+# Content-addressed memoization (logic/memo.py) of the pure pipeline
+# functions: results are keyed by a hash of the input data and held in
+# memory. Setting MEMO_DIR adds a disk tier of up to MEMO_DISK_MB of
+# pickles there, shared by the server processes and kept across restarts;
+# they are unpickled on load, so use a directory only the app can write
+# (e.g. /var/cache/bop/memo). Empty (the default): memory only.
+MEMO = os.getenv("MEMO", "1") == "1"
+MEMO_DIR = os.getenv("MEMO_DIR", "")
+MEMO_MEMORY_MB = int(os.getenv("MEMO_MEMORY_MB", "512"))
+MEMO_DISK_MB = int(os.getenv("MEMO_DISK_MB", "2048"))
+
+# Tag catalog (logic/tag_catalog.py): per-tag data extents looked up in the
+# background; fetches outside a tag's extent are skipped or clipped
+TAG_CATALOG = os.getenv("TAG_CATALOG", "1") == "1"
+TAG_CATALOG_TTL_S = float(os.getenv("TAG_CATALOG_TTL_S", str(6 * 3600)))
@@ -0,0 +1,162 @@
+# logic/aligned_table.py
+
+import numpy as np
+import pandas as pd
+
+from logic.timeaxis import NS_PER_S, ns_to_index, to_ns
+
+
+def channel_arrays(raw_df: pd.DataFrame) -> dict:
+    """Split a long ``timestamp``/``value``/``channel`` frame into per-channel
+    sorted (int64 ns, float64) arrays. Duplicate timestamps are averaged, the
+    same way ``pivot_table(aggfunc="mean")`` treated them."""
+    out = {}
+    if raw_df is None or raw_df.empty:
+        return out
+    for ch, g in raw_df.groupby("channel", sort=False):
+        ts = to_ns(g["timestamp"])
+        vals = g["value"].to_numpy(dtype=float)
+        order = np.argsort(ts, kind="stable")
+        ts, vals = ts[order], vals[order]
+        uniq, first = np.unique(ts, return_index=True)
+        if uniq.size != ts.size:
+            counts = np.diff(np.append(first, ts.size))
+            vals = np.add.reduceat(vals, first) / counts
+            ts = uniq
+        out[ch] = (ts, vals)
+    return out
+
+
+def asof_values(ts: np.ndarray, vals: np.ndarray, at: np.ndarray) -> np.ndarray:
+    """Last value at or before each time in ``at``; times before the first
+    sample take the first value (ffill then bfill)."""
+    if ts.size == 0:
+        return np.full(at.size, np.nan)
+    pos = np.searchsorted(ts, at, side="right") - 1
+    return vals[np.clip(pos, 0, None)]
+
+
+# Merged rows are rebuilt in blocks of about this many samples per channel
+MERGE_BLOCK = 65_536
+
+
+class MergedTimes:
+    """Sorted union of several sorted int64 arrays, without holding it.
+
+    One pass cuts the union into consecutive blocks (about ``block``
+    samples per channel each) and keeps, per block, every array's start
+    position, the block's first time and its rank in the union. Rows are
+    rebuilt a block at a time on demand, so memory is bounded by the
+    block and page sizes rather than the total sample count.
+    """
+
+    def __init__(self, arrays, block: int | None = None):
+        block = MERGE_BLOCK if block is None else block
+        self.arrays = [np.asarray(a, dtype=np.int64) for a in arrays if len(a)]
+        sizes = np.array([a.size for a in self.arrays], dtype=np.int64)
+        pos = np.zeros(len(self.arrays), dtype=np.int64)
+        cursors, ranks, firsts = [], [0], []
+        while (pos < sizes).any():
+            # Everything up to the earliest of the arrays' next-block ends
+            bound = min(a[min(p + block, a.size) - 1] for a, p in zip(self.arrays, pos) if p < a.size)
+            end = np.array([np.searchsorted(a, bound, side="right") for a in self.arrays], dtype=np.int64)
+            times = self._union(pos, end)
+            cursors.append(pos)
+            firsts.append(times[0])
+            ranks.append(ranks[-1] + times.size)
+            pos = end
+        cursors.append(pos)
+        self._cursors = np.array(cursors, dtype=np.int64)  # (blocks + 1, arrays)
+        self._ranks = np.array(ranks, dtype=np.int64)  # union rank of each block's first row, then the total
+        self._firsts = np.array(firsts, dtype=np.int64)
+        self._last = (None, None)  # (block, rows): sequential pages reuse it
+
+    def __len__(self) -> int:
+        return int(self._ranks[-1])
+
+    def _union(self, lo, hi) -> np.ndarray:
+        return np.unique(np.concatenate([a[l:h] for a, l, h in zip(self.arrays, lo, hi)]))
+
+    def _block(self, j) -> np.ndarray:
+        cached, rows = self._last
+        if cached != j:
+            rows = self._union(self._cursors[j], self._cursors[j + 1])
+            self._last = (j, rows)
+        return rows
+
+    def rank(self, t, side="left") -> int:
+        """Number of union times before ``t`` (``side="right"``: at or before)."""
+        j = int(np.searchsorted(self._firsts, t, side="right")) - 1
+        if j < 0:
+            return 0
+        return int(self._ranks[j] + np.searchsorted(self._block(j), t, side=side))
+
+    def take(self, lo: int, hi: int) -> np.ndarray:
+        """Union times at ranks [lo, hi)."""
+        hi = min(hi, len(self))
+        parts = []
+        while lo < hi:
+            j = int(np.searchsorted(self._ranks, lo, side="right")) - 1
+            rows = self._block(j)
+            a = lo - int(self._ranks[j])
+            part = rows[a:a + hi - lo]
+            parts.append(part)
+            lo += part.size
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+class AlignedTable:
+    """Lazy wide view of several channels on a shared time axis.
+
+    ``mode="timestamps"`` uses the union of all sample times as rows (a
+    MergedTimes, never built in full), ``mode="grid"`` a fixed-step grid
+    between ``start`` and ``end``. Rows are only materialized for the
+    requested page, so memory is bounded by the page size rather than the
+    range length.
+    """
+
+    def __init__(self, channels: dict, mode: str = "timestamps", start=None, end=None, step_s: int = 1):
+        self.channels = channels
+        self.mode = mode
+        self.step_ns = int(step_s * NS_PER_S)
+        if mode == "grid":
+            self.start_ns = pd.Timestamp(start).value
+            end_ns = pd.Timestamp(end).value
+            self._n = max(0, (end_ns - self.start_ns) // self.step_ns + 1)
+            self._times = None
+        else:
+            self._times = MergedTimes([ts for ts, _ in channels.values()])
+            self._n = len(self._times)
+
+    def __len__(self) -> int:
+        return int(self._n)
+
+    def row_range(self, t_from=None, t_to=None) -> tuple[int, int]:
+        """Row positions [lo, hi) whose times fall inside [t_from, t_to]."""
+        lo, hi = 0, len(self)
+        if self.mode == "grid":
+            if t_from is not None:
+                lo = max(lo, -(-(pd.Timestamp(t_from).value - self.start_ns) // self.step_ns))
+            if t_to is not None:
+                hi = min(hi, (pd.Timestamp(t_to).value - self.start_ns) // self.step_ns + 1)
+        else:
+            if t_from is not None:
+                lo = self._times.rank(pd.Timestamp(t_from).value, side="left")
+            if t_to is not None:
+                hi = self._times.rank(pd.Timestamp(t_to).value, side="right")
+        return int(lo), int(max(lo, hi))
+
+    def times(self, lo: int, hi: int) -> np.ndarray:
+        if self.mode == "grid":
+            return self.start_ns + np.arange(lo, hi, dtype=np.int64) * self.step_ns
+        return self._times.take(lo, hi)
+
+    def page(self, offset: int, limit: int, t_from=None, t_to=None) -> pd.DataFrame:
+        lo, hi = self.row_range(t_from, t_to)
+        a = min(hi, lo + max(0, offset))
+        b = min(hi, a + limit)
+        at = self.times(a, b)
+        data = {"timestamp": ns_to_index(at, utc=True)}
+        for ch, (ts, vals) in self.channels.items():
+            data[ch] = asof_values(ts, vals, at)
+        return pd.DataFrame(data)
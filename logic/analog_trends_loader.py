@@ -1,6 +1,12 @@
+from dataclasses import dataclass, field
 from pathlib import Path
+import threading
+
 import pandas as pd
 
+MAP_DIR = Path(__file__).resolve().parent / "trend_maps/subsea_analogs"
+FALLBACK_CHANNELS = range(1, 100)
+
 
 def load_analog_map(rig: str) -> pd.DataFrame | None:
     """Load analog channel metadata for a given rig.
@@ -18,8 +24,7 @@ def load_analog_map(rig: str) -> pd.DataFrame | None:
         no mapping file exists for the requested rig.
     """
 
-    base_dir = Path(__file__).resolve().parent / "trend_maps/subsea_analogs"
-    file_path = base_dir / f"{rig}.csv"
+    file_path = MAP_DIR / f"{rig}.csv"
 
     if not file_path.exists():
         return None
@@ -41,3 +46,103 @@ def build_tag(rig: str, channel: int) -> str:
         base = f"pi-no:{rig}.BOP.DCP"
     return f"{base}.ScaledValue{channel}"
 
+
+
+@dataclass(frozen=True)
+class AnalogCatalog:
+    """Prebuilt analog channel metadata for one rig.
+
+    ``labels`` keeps the CSV order; every other mapping is keyed by label or
+    channel number so widget callbacks can look things up in O(1).
+    """
+
+    rig: str
+    labels: list[str]
+    label_to_channel: dict[str, int]
+    channel_to_tag: dict[int, str]
+    units: dict[int, str] = field(default_factory=dict)
+    eu_range: dict[int, tuple[float, float]] = field(default_factory=dict)
+    deadband: dict[int, float] = field(default_factory=dict)
+    has_map: bool = True
+    mtime: float | None = None
+
+    def tag_for_label(self, label: str) -> str:
+        return self.channel_to_tag[self.label_to_channel[label]]
+
+
+def _clean_str(col: pd.Series) -> pd.Series:
+    return col.astype("string").fillna("")
+
+
+def _build_catalog(rig: str, analog_map: pd.DataFrame | None, mtime: float | None) -> AnalogCatalog:
+    if analog_map is None or analog_map.empty or "Ch" not in analog_map.columns:
+        channels = list(FALLBACK_CHANNELS)
+        labels = [f"Ch {n}" for n in channels]
+        return AnalogCatalog(
+            rig=rig,
+            labels=labels,
+            label_to_channel=dict(zip(labels, channels)),
+            channel_to_tag={n: build_tag(rig, n) for n in channels},
+            has_map=False,
+            mtime=mtime,
+        )
+
+    df = analog_map.dropna(subset=["Ch"])
+    channels = df["Ch"].astype(int)
+    names = _clean_str(df["Analog Name"]) if "Analog Name" in df.columns else pd.Series("", index=df.index)
+    units = _clean_str(df["Units"]) if "Units" in df.columns else pd.Series("", index=df.index)
+
+    base = channels.astype(str) + " · " + names.where(names != "", "Channel")
+    labels = base.where(units == "", base + " [" + units + "]").tolist()
+    ch_list = channels.tolist()
+
+    eu_range = {}
+    if {"Min EU", "Max EU"} <= set(df.columns):
+        lo = pd.to_numeric(df["Min EU"], errors="coerce").tolist()
+        hi = pd.to_numeric(df["Max EU"], errors="coerce").tolist()
+        eu_range = {ch: (a, b) for ch, a, b in zip(ch_list, lo, hi) if pd.notna(a) and pd.notna(b)}
+    deadband = {}
+    if "Deadband" in df.columns:
+        db = pd.to_numeric(df["Deadband"], errors="coerce").tolist()
+        deadband = {ch: d for ch, d in zip(ch_list, db) if pd.notna(d)}
+
+    return AnalogCatalog(
+        rig=rig,
+        labels=labels,
+        label_to_channel=dict(zip(labels, ch_list)),
+        channel_to_tag={ch: build_tag(rig, ch) for ch in ch_list},
+        units={ch: u for ch, u in zip(ch_list, units.tolist()) if u},
+        eu_range=eu_range,
+        deadband=deadband,
+        mtime=mtime,
+    )
+
+
+_CATALOGS: dict[str, AnalogCatalog] = {}
+_CATALOG_LOCK = threading.Lock()
+
+
+def get_analog_catalog(rig: str) -> AnalogCatalog:
+    """Return the process-wide catalog for ``rig``.
+
+    The CSV is parsed once; later calls only ``stat`` the file and rebuild
+    when its mtime changes (or it appears/disappears).
+    """
+
+    file_path = MAP_DIR / f"{rig}.csv"
+    try:
+        mtime = file_path.stat().st_mtime
+    except OSError:
+        mtime = None
+
+    cached = _CATALOGS.get(rig)
+    if cached is not None and cached.mtime == mtime:
+        return cached
+
+    with _CATALOG_LOCK:
+        cached = _CATALOGS.get(rig)
+        if cached is None or cached.mtime != mtime:
+            analog_map = load_analog_map(rig) if mtime is not None else None
+            cached = _build_catalog(rig, analog_map, mtime)
+            _CATALOGS[rig] = cached
+    return cached
@@ -0,0 +1,132 @@
+# logic/cache_warmer.py
+#
+# Background cache warmer. A daemon thread in the app process calls the
+# cached loaders (dashboard tables, pressure series, EDS signals) for every
+# rig on the sidebar's default window, with exactly the arguments an
+# untouched sidebar produces, so the first interactive load is a cache hit.
+# Ranges partly in the materialized store (logic/event_store.py) warm only
+# the part the app computes live.
+# Its fetches are queued at PREFETCH priority behind interactive sessions.
+#
+# It has to run inside the Streamlit process: st.cache_data lives in that
+# process's memory.
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+import config
+from logic import event_store
+from logic.depletion import DEFAULT_CATEGORY_WINDOWS, FLOW_THRESHOLDS, VALVE_CLASS_MAP
+from logic.eds import cached_eds_signals
+from logic.fetch_scheduler import PREFETCH, priority
+from logic.tag_maps import RIGS, get_rig_tags
+
+logger = logging.getLogger("cache_warmer")
+
+GROUP = "cache-warmer"
+
+
+def default_window(now=None):
+    """(start, end) dates of an untouched sidebar (see ui/sidebar.py)."""
+    now = now or datetime.today()
+    return (now - timedelta(days=config.DEFAULT_LOOKBACK_DAYS)).date(), now.date()
+
+
+def warm_rig(rig, start, end) -> dict:
+    """Fill the cached loaders for one rig/window; seconds per loader."""
+    tags = get_rig_tags(rig)
+    timings = {}
+    with priority(PREFETCH, group=GROUP):
+        t = time.perf_counter()
+        event_store.load_dashboard(
+            rig, start, end, dict(DEFAULT_CATEGORY_WINDOWS), tags["valve_map"],
+            tags["per_valve_simple_map"], tags["per_valve_function_map"],
+            VALVE_CLASS_MAP, tags["vol_ext"], tags["pressure_map"],
+            tags["active_pod_tag"], FLOW_THRESHOLDS,
+        )
+        timings["dashboard"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        event_store.load_pressures(rig, tags["pressure_map"], start, end)
+        timings["pressure"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        live_start = event_store.plan_range(rig, start, end).live_fetch_start
+        if live_start is not None:
+            cached_eds_signals(
+                rig, live_start, end, tags["valve_map"], tags["vol_ext"],
+                tags["active_pod_tag"], tags["eds_base_tag"],
+            )
+        timings["eds"] = time.perf_counter() - t
+    return timings
+
+
+def next_run(now, times):
+    """Next datetime after ``now`` at one of the local ``HH:MM`` times."""
+    candidates = []
+    for hhmm in times:
+        hour, minute = (int(x) for x in hhmm.split(":"))
+        at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        candidates.append(at if at > now else at + timedelta(days=1))
+    return min(candidates) if candidates else None
+
+
+class CacheWarmer(threading.Thread):
+    def __init__(self, rigs=None, times=None, on_start=True):
+        super().__init__(name="cache-warmer", daemon=True)
+        self.rigs = list(rigs or RIGS)
+        self.times = list(config.CACHE_WARM_TIMES if times is None else times)
+        self.on_start = on_start
+        self.last_run = None  # {"at", "window", "rigs": {rig: timings or error}}
+        self._wake = threading.Event()
+        self._stopped = False
+
+    def warm_all(self):
+        start, end = default_window()
+        results = {}
+        for rig in self.rigs:
+            try:
+                timings = warm_rig(rig, start, end)
+                results[rig] = {k: round(v, 2) for k, v in timings.items()}
+                logger.info(f"[WARM] {rig} {start}..{end}: {results[rig]}")
+            except Exception as e:
+                # One rig failing (no data, upstream down) must not stop the rest
+                results[rig] = {"error": str(e)}
+                logger.warning(f"[WARM] {rig} {start}..{end} failed: {e}")
+        self.last_run = {"at": datetime.now(), "window": (start, end), "rigs": results}
+        return results
+
+    def run(self):
+        if self.on_start:
+            self.warm_all()
+        while not self._stopped:
+            at = next_run(datetime.now(), self.times)
+            if at is None:
+                return
+            logger.info(f"[WARM] Next run at {at:%Y-%m-%d %H:%M}")
+            self._wake.wait(timeout=max(0.0, (at - datetime.now()).total_seconds()))
+            if self._stopped:
+                return
+            self._wake.clear()
+            self.warm_all()
+
+    def trigger(self):
+        """Run now instead of waiting for the next scheduled time."""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+
+@st.cache_resource(show_spinner=False)
+def start_cache_warmer() -> CacheWarmer:
+    """Start the process's warmer once; later calls return the same one."""
+    warmer = CacheWarmer(on_start=config.CACHE_WARM_ON_START)
+    warmer.start()
+    logger.info(f"[WARM] Cache warmer started for {', '.join(warmer.rigs)} at {', '.join(warmer.times)}")
+    return warmer
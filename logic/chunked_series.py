@@ -0,0 +1,225 @@
+# logic/chunked_series.py
+#
+# Compact container for long, high-rate series (well pressure, regulator
+# pressures) held by the cached loaders and sessions. Samples are split into
+# fixed-size chunks; per chunk the timestamps are delta-encoded (in the
+# coarsest of ms / us / ns that represents them exactly, int32 when the
+# deltas fit) and the values kept as float64, each optionally compressed
+# with a pyarrow codec (lz4, zstd; lossless). Values stay float64 for the
+# same reason as in logic/ingest.py: the pressure statistics are
+# threshold-based, so rounding can flip which samples are included and
+# change the displayed pressures. That is about 12 bytes per sample before
+# compression, against 16 plus pandas overhead.
+#
+# Range reads decode only the chunks a window touches. The pressure and
+# cycle code (logic/pressure.py, logic/pressure_cycles.py) and the cycle
+# charts take a ChunkedSeries wherever they take a pd.Series; .loc[t0:t1]
+# slicing, .empty, .index and .values behave like the Series ones.
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from logic.timeaxis import ns_to_index, to_ns
+
+CHUNK_SIZE = 1 << 16
+_UNITS = (1_000_000, 1_000, 1)  # ms, us, ns
+
+
+class _Chunk:
+    __slots__ = ("first_ns", "last_ns", "n", "unit", "t_dtype", "t_data", "v_data", "codec")
+
+    def __init__(self, ts, values, value_dtype, codec):
+        self.first_ns, self.last_ns, self.n = int(ts[0]), int(ts[-1]), len(ts)
+        deltas = np.diff(ts)
+        self.unit = next(u for u in _UNITS if not (deltas % u).any())
+        deltas //= self.unit
+        self.t_dtype = np.int32 if not len(deltas) or deltas.max() <= np.iinfo(np.int32).max else np.int64
+        self.codec = codec
+        self.t_data = self._pack(deltas.astype(self.t_dtype))
+        self.v_data = self._pack(np.asarray(values, dtype=value_dtype))
+
+    def _pack(self, arr):
+        if self.codec is None:
+            return arr
+        return (pa.compress(arr.tobytes(), codec=self.codec, asbytes=True), arr.dtype, arr.nbytes)
+
+    def _unpack(self, data):
+        if self.codec is None:
+            return data
+        raw, dtype, size = data
+        return np.frombuffer(pa.decompress(raw, size, codec=self.codec, asbytes=True), dtype=dtype)
+
+    def times(self) -> np.ndarray:
+        out = np.empty(self.n, dtype=np.int64)
+        out[0] = self.first_ns
+        np.cumsum(self._unpack(self.t_data).astype(np.int64) * self.unit, out=out[1:])
+        out[1:] += self.first_ns
+        return out
+
+    def values(self) -> np.ndarray:
+        return self._unpack(self.v_data).astype(float)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(d.nbytes if self.codec is None else len(d[0]) for d in (self.t_data, self.v_data))
+
+
+class _Loc:
+    def __init__(self, series):
+        self._series = series
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step is not None:
+            raise TypeError("ChunkedSeries.loc supports [start:stop] time slices only")
+        return self._series.slice(key.start, key.stop)
+
+
+class ChunkedSeries:
+    def __init__(self, chunks, name=None):
+        self._chunks = list(chunks)
+        self.name = name
+        self._first = np.array([c.first_ns for c in self._chunks], dtype=np.int64)
+        self._last = np.array([c.last_ns for c in self._chunks], dtype=np.int64)
+
+    @classmethod
+    def from_arrays(cls, ts_ns, values, name=None, chunk_size=CHUNK_SIZE, codec=None, value_dtype=np.float64):
+        ts_ns = np.asarray(ts_ns, dtype=np.int64)
+        values = np.asarray(values)
+        chunks = [
+            _Chunk(ts_ns[i:i + chunk_size], values[i:i + chunk_size], value_dtype, codec)
+            for i in range(0, len(ts_ns), chunk_size)
+        ]
+        return cls(chunks, name)
+
+    @classmethod
+    def from_series(cls, series: pd.Series, **kwargs):
+        """Series on the canonical time axis (sorted naive-UTC index)."""
+        kwargs.setdefault("name", series.name)
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+        return cls.from_arrays(to_ns(series.index), values, **kwargs)
+
+    @classmethod
+    def concat(cls, parts, **kwargs):
+        """Time-ordered, non-overlapping parts (Series or ChunkedSeries)."""
+        chunks, name = [], None
+        for part in parts:
+            if part is None or len(part) == 0:
+                continue
+            if not isinstance(part, ChunkedSeries):
+                part = cls.from_series(part, **kwargs)
+            chunks += part._chunks
+            name = part.name if name is None else name
+        return cls(chunks, name)
+
+    def append(self, part, codec=None, chunk_size=CHUNK_SIZE):
+        """This series followed by ``part`` (newer samples). The trailing
+        partial chunk is re-encoded together with ``part``, so a series grown
+        by many small appends keeps full-size chunks; the other chunks are
+        shared with this series, not copied."""
+        ts, vals = series_arrays(part)
+        if not len(ts):
+            return self
+        keep = len(self._chunks)
+        if keep and self._chunks[-1].n < chunk_size:
+            keep -= 1
+            held_ts, held_vals = self._decode([keep])
+            ts, vals = np.concatenate([held_ts, ts]), np.concatenate([held_vals, vals])
+        tail = ChunkedSeries.from_arrays(ts, vals, chunk_size=chunk_size, codec=codec)
+        return ChunkedSeries(self._chunks[:keep] + tail._chunks, self.name)
+
+    def __len__(self):
+        return sum(c.n for c in self._chunks)
+
+    @property
+    def empty(self) -> bool:
+        return not self._chunks
+
+    @property
+    def nbytes(self) -> int:
+        return sum(c.nbytes for c in self._chunks)
+
+    @property
+    def last_ns(self):
+        return int(self._last[-1]) if self._chunks else None
+
+    def _decode(self, chunk_ids):
+        if len(chunk_ids) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        ts = np.concatenate([self._chunks[i].times() for i in chunk_ids])
+        vals = np.concatenate([self._chunks[i].values() for i in chunk_ids])
+        return ts, vals
+
+    def arrays(self, start_ns=None, stop_ns=None):
+        """(times ns, float64 values) of the samples in [start_ns, stop_ns]."""
+        a = 0 if start_ns is None else int(np.searchsorted(self._last, start_ns, side="left"))
+        b = len(self._chunks) if stop_ns is None else int(np.searchsorted(self._first, stop_ns, side="right"))
+        ts, vals = self._decode(range(a, b))
+        lo = 0 if start_ns is None else np.searchsorted(ts, start_ns, side="left")
+        hi = len(ts) if stop_ns is None else np.searchsorted(ts, stop_ns, side="right")
+        return ts[lo:hi], vals[lo:hi]
+
+    def window_arrays(self, starts_ns, stops_ns):
+        """(times, values) of every chunk touched by any [start, stop]
+        window: searching them gives the same window contents as the full
+        series, without decoding the chunks no window reaches."""
+        starts_ns, stops_ns = np.asarray(starts_ns), np.asarray(stops_ns)
+        if not self._chunks or not len(starts_ns):
+            return self._decode([])
+        a = np.searchsorted(self._last, starts_ns, side="left")
+        b = np.searchsorted(self._first, stops_ns, side="right")
+        touched = np.zeros(len(self._chunks) + 1, dtype=np.int64)
+        np.add.at(touched, a, 1)
+        np.add.at(touched, b, -1)
+        return self._decode(np.flatnonzero(np.cumsum(touched)[:-1] > 0))
+
+    def slice(self, start=None, stop=None) -> pd.Series:
+        """Like series.loc[start:stop] (inclusive, timestamps or ns)."""
+        ts, vals = self.arrays(
+            None if start is None else int(to_ns([pd.Timestamp(start)])[0]),
+            None if stop is None else int(to_ns([pd.Timestamp(stop)])[0]),
+        )
+        return pd.Series(vals, index=ns_to_index(ts), name=self.name)
+
+    def memo_key_parts(self) -> tuple:
+        """Content for logic/memo.py fingerprints, without decoding."""
+        return self.name, [
+            (c.first_ns, c.n, c.unit, c.codec, *(d if c.codec is None else d[0] for d in (c.t_data, c.v_data)))
+            for c in self._chunks
+        ]
+
+    @property
+    def loc(self):
+        return _Loc(self)
+
+    def to_series(self) -> pd.Series:
+        return self.slice()
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return ns_to_index(self.arrays()[0])
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.arrays()[1]
+
+
+def series_arrays(series, starts_ns=None, stops_ns=None):
+    """(times ns, float64 values) of a Series or ChunkedSeries. Given
+    windows, a ChunkedSeries decodes only the chunks they touch."""
+    if isinstance(series, ChunkedSeries):
+        if starts_ns is None:
+            return series.arrays()
+        return series.window_arrays(starts_ns, stops_ns)
+    return to_ns(series.index), pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+
+
+def concat_series(parts):
+    """pd.concat for time-ordered series parts, chunked when any part is."""
+    parts = [p for p in parts if p is not None]
+    if not parts:
+        return None
+    chunked = [p for p in parts if isinstance(p, ChunkedSeries) and not p.empty]
+    if chunked:
+        return ChunkedSeries.concat(parts, codec=chunked[0]._chunks[0].codec)
+    return pd.concat(parts)
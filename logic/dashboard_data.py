@@ -5,32 +5,147 @@ import pandas as pd
 import numpy as np
 from datetime import timedelta
 
+import config
+
 from logic.data_loaders    import get_volume_df, get_valve_df, get_pressure_df, get_raw_df
 from logic.preprocessing   import to_ms, classify_flow, compute_transitions, extract_ramp
 from logic.pressure        import assign_max_pressure_vectorized, assign_max_well_pressure
 from logic.depletion       import load_and_preprocess
 from logic.pressure_cycles import analyze_pressure_cycles  # NEW
-
-def _map_active_pod(value: float) -> str:
-    if value in (1, 2):
-        return "Blue Pod"
-    if value in (3, 4):
-        return "Yellow Pod"
-    return "Unknown"
+from logic.ingest          import concat_frames, compact_events, decode_active_pod
+from logic.step_signals    import StepSignal
+from logic.chunked_series  import ChunkedSeries
+from logic.timeaxis        import to_ns
+from logic.instrumentation import stage
 
 def fill_minute_gaps_with_ffill(df, value_col="accumulator"):
     df = df.copy()
-    df.index = pd.to_datetime(df.index)
     full_minute_index = pd.date_range(
         start=df.index.min().floor('min'),
         end=df.index.max().ceil('min'),
         freq='1min'
     )
     artificial_df = pd.DataFrame(index=full_minute_index)
-    combined = pd.concat([df, artificial_df], axis=0).sort_index()
+    combined = pd.concat([df, artificial_df], axis=0).sort_index(kind="stable")
     combined[value_col] = combined[value_col].ffill()
     return combined
 
+def annotate_volume(vol_df, pod):
+    """Gap-filled accumulator frame with the active pod and the
+    instantaneous flow rate (gpm) per row."""
+    vol_annot = vol_df.reset_index().rename(columns={"index": "timestamp"})
+    vol_annot = vol_annot.sort_values("timestamp", kind="stable").set_index("timestamp")
+    vol_annot["Active Pod"] = decode_active_pod(pod.asof(to_ns(vol_annot.index)))
+
+    dt_s = vol_annot.index.to_series().diff().dt.total_seconds()
+    dv = vol_annot["accumulator"].diff()
+    vol_annot["flow_rate_gpm_inst"] = (dv / (dt_s / 60)).bfill().astype("float32")
+    return vol_annot
+
+def build_events(
+    trans,
+    vol_annot,
+    pressure_series_by_valve,
+    pod,
+    valve_class,
+    category_windows,
+    flow_thresholds,
+    used=None,
+    well_open_stats=None,
+):
+    """Valve events from transitions: ramp gallons, flow category, max
+    regulator and well pressure, active pod, flow rates and depletion.
+    ``used`` seeds extract_ramp's overlap check and ``well_open_stats`` is
+    assign_max_well_pressure's ``open_stats`` (see logic/live_tail.py)."""
+    # Extract ramp windows & gallons
+    with stage("extract_ramp", rows_in=len(trans)) as s:
+        df = extract_ramp(trans, vol_annot, valve_class, category_windows, used=used)
+        s.rows_out = len(df)
+
+    # Flow Category using provided thresholds (kept as-is)
+    with stage("classify_flow", rows_in=len(df)):
+        df["Flow Category"] = pd.Categorical(
+            df.apply(
+                lambda r: classify_flow(
+                    r["Δ (gal)"],
+                    valve_class.get(r["valve"], "Pipe Ram"),
+                    flow_thresholds
+                ),
+                axis=1
+            ),
+            categories=["Low", "Mid", "High"],
+            ordered=True
+        )
+
+    # ----------- PRESSURE ASSIGNMENT (with Well Pressure) -------------
+    df["Max Pressure"] = np.nan
+    for valve_name, p_ser in pressure_series_by_valve.items():
+        if valve_name == "Well Pressure":
+            continue
+        mask = df["valve"] == valve_name
+        with stage("assign_max_pressure", tag=valve_name, rows_in=len(p_ser)) as s:
+            df.loc[mask, "Max Pressure"] = assign_max_pressure_vectorized(
+                df.loc[mask],
+                p_ser,
+                valve_class,
+                category_windows,
+            )
+            s.rows_out = int(mask.sum())
+
+    well_pressure_series = pressure_series_by_valve.get("Well Pressure")
+    with stage("assign_max_well_pressure", rows_in=len(df)):
+        if well_pressure_series is not None:
+            df["Max Well Pressure"] = assign_max_well_pressure(
+                df, well_pressure_series, valve_class, category_windows, open_stats=well_open_stats,
+            )
+        else:
+            df["Max Well Pressure"] = np.nan
+
+    # ---- Pod tagging, flow rate, etc ----
+    with stage("pod_tagging", rows_in=len(df)):
+        df = df.sort_values("timestamp").reset_index(drop=True)
+        df["Active Pod"] = decode_active_pod(pod.asof(to_ns(df["timestamp"])))
+
+    with stage("flow_rate", rows_in=len(df)):
+        df["Duration (min)"] = (
+            (df["End Time"] - df["Start Time"])
+            .dt.total_seconds() / 60
+        )
+        df["Flow Rate (gpm)"] = df["Δ (gal)"] / df["Duration (min)"]
+
+        df = pd.merge_asof(
+            df.sort_values("timestamp"),
+            vol_annot[["flow_rate_gpm_inst"]]
+                .reset_index()
+                .rename(columns={"index": "timestamp"}),
+            on="timestamp",
+            direction="backward"
+        )
+
+    # Depletion & standardized Flow Category (vectorized)
+    with stage("load_and_preprocess", rows_in=len(df)) as s:
+        df = load_and_preprocess(df)
+        df = compact_events(df)
+        s.rows_out = len(df)
+    return df
+
+def pod_signal(pod_values: pd.Series) -> StepSignal:
+    """Active-pod step signal from raw ActiveSem samples."""
+    return StepSignal.from_series(pod_values.astype("float").ffill().bfill())
+
+def fetch_pressure_series(pressure_map, sm, em):
+    """Pressure series per valve name (regulators and "Well Pressure")."""
+    return {
+        p_df["valve"].cat.categories[0]: p_df["pressure"]
+        for p_df in get_pressure_df(pressure_map, sm, em)
+    }
+
+def chunk_series(series):
+    """Compact form of a pressure series held by the caches (CHUNKED_SERIES)."""
+    if not config.CHUNKED_SERIES or series is None or len(series) == 0:
+        return series
+    return ChunkedSeries.from_series(series, codec=config.CHUNKED_SERIES_CODEC or None)
+
 @st.cache_data(
     ttl=24 * 3600,
     show_spinner="Loading dashboard…"
@@ -49,128 +164,80 @@ def load_dashboard_data(
     active_pod_tag,
     flow_thresholds,
 ):
+    df, vol_annot, cycles_df, well_pressure_series = compute_dashboard_data(
+        rig, start_date, end_date, category_windows, valve_map,
+        simple_map, function_map, valve_class, vol_ext, pressure_map,
+        active_pod_tag, flow_thresholds,
+    )
+    return df, vol_annot, cycles_df, chunk_series(well_pressure_series)
+
+def compute_dashboard_data(
+    rig,
+    start_date,
+    end_date,
+    category_windows,
+    valve_map,
+    simple_map,
+    function_map,
+    valve_class,
+    vol_ext,
+    pressure_map,
+    active_pod_tag,
+    flow_thresholds,
+    pressure_series_by_valve=None,
+):
+    """load_dashboard_data without st.cache_data (batch jobs and worker
+    processes). ``pressure_series_by_valve`` skips the pressure fetch when
+    the caller already holds the series for the range."""
     sm = to_ms(start_date)
     em = to_ms(end_date + timedelta(days=1)) - 1
 
     # --- Volume (accumulator) ---
     vol_df = get_volume_df(vol_ext, sm, em)
-    vol_df = fill_minute_gaps_with_ffill(vol_df, value_col="accumulator")
+    with stage("fill_minute_gaps", rows_in=len(vol_df)) as s:
+        vol_df = fill_minute_gaps_with_ffill(vol_df, value_col="accumulator")
+        s.rows_out = len(vol_df)
 
     # --- Valves ---
-    valve_list = get_valve_df(valve_map, simple_map, function_map, sm, em)
-    valve_df = pd.concat(valve_list).sort_index()
+    with stage("fetch_valves") as s:
+        valve_list = get_valve_df(valve_map, simple_map, function_map, sm, em)
+        valve_df = concat_frames(valve_list).sort_index()
+        s.rows_out = len(valve_df)
 
     # Transitions w/ prev fields
-    trans = compute_transitions(valve_df)
-
-    # Extract ramp windows & gallons
-    df = extract_ramp(trans, vol_df, valve_class, category_windows)
-
-    # Flow Category using provided thresholds (kept as-is)
-    df["Flow Category"] = pd.Categorical(
-        df.apply(
-            lambda r: classify_flow(
-                r["Δ (gal)"],
-                valve_class.get(r["valve"], "Pipe Ram"),
-                flow_thresholds
-            ),
-            axis=1
-        ),
-        categories=["Low", "Mid", "High"],
-        ordered=True
-    )
-
-    # ----------- PRESSURE ASSIGNMENT (with Well Pressure) -------------
-    df["Max Pressure"] = np.nan
-    well_pressure_series = None
-
-    for p_df in get_pressure_df(pressure_map, sm, em):
-        valve_name = p_df["valve"].iat[0]
-        p_ser = p_df.set_index(p_df.index)["pressure"].sort_index()
-        if valve_name == "Well Pressure":
-            well_pressure_series = p_ser
-        else:
-            mask = df["valve"] == valve_name
-            df.loc[mask, "Max Pressure"] = assign_max_pressure_vectorized(
-                df.loc[mask],
-                p_ser,
-                valve_class,
-                category_windows,
-            )
+    with stage("compute_transitions", rows_in=len(valve_df)) as s:
+        trans = compute_transitions(valve_df)
+        s.rows_out = len(trans)
 
-    if well_pressure_series is not None:
-        df["Max Well Pressure"] = assign_max_well_pressure(
-            df, well_pressure_series, valve_class, category_windows
-        )
-    else:
-        df["Max Well Pressure"] = np.nan
+    with stage("fetch_pressures") as s:
+        if pressure_series_by_valve is None:
+            pressure_series_by_valve = fetch_pressure_series(pressure_map, sm, em)
+        s.rows_out = sum(len(p) for p in pressure_series_by_valve.values())
+    well_pressure_series = pressure_series_by_valve.get("Well Pressure")
 
-    # ---- Pod tagging, flow rate, etc ----
-    pod = (
-        get_raw_df(active_pod_tag, sm, em)
-        .rename(columns={"value": "ActiveSem_CBM"})
-        .astype({"ActiveSem_CBM": "float"})
-    )
-    pod.index = pd.to_datetime(pod.index)
-    pod = pod[["ActiveSem_CBM"]].ffill().bfill()
-
-    df = pd.merge_asof(
-        df.sort_values("timestamp"),
-        pod,
-        left_on="timestamp",
-        right_index=True,
-        direction="backward"
-    )
-    df["Active Pod"] = df["ActiveSem_CBM"].apply(_map_active_pod)
-    df.drop(columns=["ActiveSem_CBM"], inplace=True)
+    pod = get_raw_df(active_pod_tag, sm, em)["value"]
+    with stage("annotate_volume", rows_in=len(vol_df)) as s:
+        pod = pod_signal(pod)
+        vol_annot = annotate_volume(vol_df, pod)
+        s.rows_out = len(vol_annot)
 
-    vol_annot = vol_df.reset_index().rename(columns={"index": "timestamp"})
-    vol_annot = pd.merge_asof(
-        vol_annot.sort_values("timestamp"),
-        pod,
-        left_on="timestamp",
-        right_index=True,
-        direction="backward"
+    df = build_events(
+        trans, vol_annot, pressure_series_by_valve, pod,
+        valve_class, category_windows, flow_thresholds,
     )
-    vol_annot["Active Pod"] = vol_annot["ActiveSem_CBM"].apply(_map_active_pod)
-    vol_annot.set_index("timestamp", inplace=True)
-    vol_annot.drop(columns=["ActiveSem_CBM"], inplace=True)
-
-    dt_s = vol_annot.index.to_series().diff().dt.total_seconds()
-    dv = vol_annot["accumulator"].diff()
-    vol_annot["flow_rate_gpm_inst"] = (dv / (dt_s / 60)).bfill()
-
-    df["Duration (min)"] = (
-        (df["End Time"] - df["Start Time"])
-        .dt.total_seconds() / 60
-    )
-    df["Flow Rate (gpm)"] = df["Δ (gal)"] / df["Duration (min)"]
-
-    df = pd.merge_asof(
-        df.sort_values("timestamp"),
-        vol_annot[["flow_rate_gpm_inst"]]
-            .reset_index()
-            .rename(columns={"index": "timestamp"}),
-        on="timestamp",
-        direction="backward"
-    )
-
-    # Depletion & standardized Flow Category (vectorized)
-    df = load_and_preprocess(df)
 
     # ----------------- Compute cycles ONCE and return -----------------
     cycles_df = pd.DataFrame()
     try:
         if well_pressure_series is not None:
-            # ensure well pressure index is datetime for slicing
-            wp = well_pressure_series.copy()
-            wp.index = pd.to_datetime(wp.index)
-            wp = wp.sort_index()
+            wp = well_pressure_series
             base_cols = ["timestamp", "valve", "state"]
             missing = [c for c in base_cols if c not in df.columns]
             if not missing:
                 # Use full df (not pod-filtered) so 'lower-valve' logic is correct
-                cycles_df = analyze_pressure_cycles(df[base_cols], valve_map, wp)
+                with stage("analyze_pressure_cycles", rows_in=len(df)) as s:
+                    cycles_df = analyze_pressure_cycles(df[base_cols], valve_map, wp)
+                    s.rows_out = len(cycles_df)
     except Exception as e:
         # Keep UI robust even if cycles analysis fails
         st.warning(f"Pressure cycles analysis failed: {e}")
@@ -178,6 +245,18 @@ def load_dashboard_data(
     # IMPORTANT: return signature changed (now 4 items)
     return df, vol_annot, cycles_df, well_pressure_series
 
+@st.cache_data(ttl=24 * 3600, show_spinner=False)
+def load_pressure_series(pressure_map, start_date, end_date):
+    """Pressure series per valve name (regulators and "Well Pressure")."""
+    series = compute_pressure_series(pressure_map, start_date, end_date)
+    return {name: chunk_series(s) for name, s in series.items()}
+
+def compute_pressure_series(pressure_map, start_date, end_date):
+    """load_pressure_series without st.cache_data."""
+    sm = to_ms(start_date)
+    em = to_ms(end_date + timedelta(days=1)) - 1
+    return fetch_pressure_series(pressure_map, sm, em)
+
 def get_timeseries_data(tag, start_date, end_date):
     sm = to_ms(start_date)
     em = to_ms(end_date + timedelta(days=1)) - 1
@@ -1,59 +1,30 @@
 # logic/data_loaders.py
 
 from config import *
-from cognite.client import CogniteClient, ClientConfig
-from cognite.client.credentials import OAuthClientCredentials
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
-import time
 import logging
-from functools import lru_cache, wraps
+
+from logic.ingest import decode_status, compact_status_codes
+from logic.step_signals import change_points
+from logic.timeaxis import canonical_index
+from logic.data_sources import get_data_source
+from logic import instrumentation
+from logic.rollups import get_rollups
+from logic.fetch_scheduler import run_all
+from logic.rate_control import api_retry
+from logic.tag_catalog import get_tag_catalog
 
 # --- Set up logging for error handling and API feedback
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("data_loaders")
 
-# --- Retry Decorator for API calls
-def api_retry(max_attempts=3, base_delay=1):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            last_exc = None
-            for attempt in range(1, max_attempts + 1):
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    logger.warning(f"[API] {func.__name__} failed (attempt {attempt}): {e}")
-                    last_exc = e
-                    time.sleep(base_delay * (2 ** (attempt - 1)))
-            logger.error(f"[API] {func.__name__} failed after {max_attempts} attempts.")
-            raise last_exc
-        return wrapper
-    return decorator
-
-# --- Caching: Credentials and client are safe to cache as they are static
-@lru_cache(maxsize=2)
-def get_cognite_client():
-    creds = OAuthClientCredentials(
-        token_url=AUTHORITY_HOST_URI,
-        client_id=CDF_CLIENT_ID,
-        client_secret=CDF_CLIENT_SECRET,
-        scopes=SCOPES
-    )
-    client_config = ClientConfig(
-        client_name="client",
-        project=CDF_PROJECT,
-        credentials=creds,
-        base_url=BASE_URL
-    )
-    return CogniteClient(client_config)
-
 # --- Main API fetchers (use retry)
 @api_retry()
 def fetch_timeseries_df(external_id, start, end):
-    client = get_cognite_client()
+    source = get_data_source()
     try:
-        df = client.time_series.data.retrieve_dataframe(external_id=external_id, start=start, end=end)
+        df = source.retrieve(external_id, start, end)
         if df.empty:
             logger.warning(f"[DATA] No data returned for {external_id} ({start} - {end})")
         return df
@@ -61,72 +32,129 @@ def fetch_timeseries_df(external_id, start, end):
         logger.error(f"Error fetching timeseries {external_id}: {e}")
         raise
 
-def get_volume_df(external_id, start, end):
-    df = fetch_timeseries_df(external_id, start, end)
+def _fetch(external_id, start, end):
+    # Every loader goes through here so the rest of the app can rely on a
+    # sorted naive-UTC datetime64[ns] index (see logic/timeaxis.py).
+    catalog = get_tag_catalog()
+    span = catalog.plan(external_id, start, end) if catalog is not None else (start, end)
+    if span is None:
+        # Outside the tag's extent (or no such tag): nothing to retrieve
+        logger.debug(f"[DATA] Skipped {external_id} ({start} - {end}): no data per tag catalog")
+        df = pd.DataFrame()
+    else:
+        with instrumentation.stage("fetch", tag=external_id) as s:
+            df = fetch_timeseries_df(external_id, *span)
+            s.rows_out = len(df)
+            s.bytes = instrumentation.frame_bytes(df)
     if df.empty or df.shape[1] == 0:
-        logger.warning(f"[VOLUME] No data in get_volume_df for {external_id}")
-        return pd.DataFrame(columns=["raw_value", "accumulator"])
+        if ROLLUPS:
+            get_rollups().observe(external_id, pd.DataFrame(), start, end)
+        return df
+    df = canonical_index(df)
+    if ROLLUPS:
+        with instrumentation.stage("rollup", tag=external_id):
+            get_rollups().observe(external_id, df, start, end)
+    return df
+
+def _empty_index():
+    return pd.DatetimeIndex([], dtype="datetime64[ns]")
+
+def fetch_frame(external_id, start, end):
+    """Raw frame for one tag on the canonical time axis; empty when the
+    tag has no data in the range."""
+    return _fetch(external_id, start, end)
+
+def volume_frame(df):
     col = df.columns[0]
     df = df.rename(columns={col: "raw_value"})
     df["accumulator"] = df["raw_value"] / 10
     return df
 
+def get_volume_df(external_id, start, end):
+    df = _fetch(external_id, start, end)
+    if df.empty or df.shape[1] == 0:
+        logger.warning(f"[VOLUME] No data in get_volume_df for {external_id}")
+        return pd.DataFrame(columns=["raw_value", "accumulator"], index=_empty_index(), dtype=float)
+    return volume_frame(df)
+
+def _empty_valve_frame(name):
+    return pd.DataFrame({
+        "state": pd.Categorical([]),
+        "function_state": pd.Categorical([]),
+        "valve": pd.Categorical([], categories=[name]),
+        "status_code": pd.Series([], dtype="int16"),
+    }, index=_empty_index())
+
 def _fetch_valve(name, ext, smap, fmap, start, end):
-    df = fetch_timeseries_df(ext, start, end)
+    df = _fetch(ext, start, end)
     if df.empty or df.shape[1] == 0:
         logger.warning(f"[VALVE] No data for valve {name}, tag {ext}")
-        return pd.DataFrame(columns=["state", "function_state", "valve", "status_code"])
-    col = df.columns[0]
-    df = df.rename(columns={col: "status_code"})
-    df["state"] = df["status_code"].map(smap)
-    df["function_state"] = df["status_code"].map(fmap)
-    df["valve"] = name
-    return df.dropna(subset=["state"])[["state", "function_state", "valve", "status_code"]]
-
-def get_valve_df(valve_map, per_valve_simple_map, per_valve_function_map, start, end, max_workers=6):
-    # Parallel fetch, logs errors individually
-    results = []
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [
-            executor.submit(_fetch_valve, name, ext, per_valve_simple_map[name], per_valve_function_map[name], start, end)
-            for name, ext in valve_map.items()
-        ]
-        for f in as_completed(futures):
-            try:
-                results.append(f.result())
-            except Exception as e:
-                logger.error(f"[VALVE_DF] Error: {e}")
-    return results
+        return _empty_valve_frame(name)
+    return valve_status_frame(name, df, smap, fmap)
+
+def valve_status_frame(name, df, smap, fmap):
+    """Decoded status change points of one valve's raw status frame."""
+    codes = df.iloc[:, 0].to_numpy(dtype=float, na_value=float("nan"))
+    out = pd.DataFrame({
+        "state": decode_status(codes, smap),
+        "function_state": decode_status(codes, fmap),
+        "valve": pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), categories=[name]),
+        "status_code": codes,
+    }, index=df.index)
+    out = out.dropna(subset=["state"])
+    # Status is a step signal: keep change points only. compute_transitions
+    # compares each row with the previous one, so repeats never contribute.
+    out = out.iloc[change_points(out["status_code"].to_numpy())]
+    out["status_code"] = compact_status_codes(out["status_code"])
+    return out
+
+def _successful(results, label):
+    # Parallel fetches log failures individually and keep the rest
+    out = []
+    for r in results:
+        if isinstance(r, Exception):
+            logger.error(f"[{label}] Error: {r}")
+        else:
+            out.append(r)
+    return out
+
+def get_valve_df(valve_map, per_valve_simple_map, per_valve_function_map, start, end):
+    jobs = [
+        (name, ext, per_valve_simple_map[name], per_valve_function_map[name], start, end)
+        for name, ext in valve_map.items()
+    ]
+    return _successful(run_all(_fetch_valve, jobs), "VALVE_DF")
 
 def _fetch_pressure(valve, ext, start, end):
-    df = fetch_timeseries_df(ext, start, end)
+    df = _fetch(ext, start, end)
     if df.empty or df.shape[1] == 0:
         logger.warning(f"[PRESSURE] No data for pressure {valve}, tag {ext}")
-        return pd.DataFrame(columns=["pressure", "valve"])
-    col = df.columns[0]
-    df = df.rename(columns={col: "pressure"})
-    df["valve"] = valve
-    return df[["pressure", "valve"]]
-
-def get_pressure_df(pressure_map, start, end, max_workers=6):
-    results = []
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [
-            executor.submit(_fetch_pressure, valve, ext, start, end)
-            for valve, ext in pressure_map.items()
-        ]
-        for f in as_completed(futures):
-            try:
-                results.append(f.result())
-            except Exception as e:
-                logger.error(f"[PRESSURE_DF] Error: {e}")
-    return results
+        return pd.DataFrame({
+            "pressure": pd.Series([], dtype="float64"),
+            "valve": pd.Categorical([], categories=[valve]),
+        }, index=_empty_index())
+    return pd.DataFrame({
+        "pressure": df.iloc[:, 0],
+        "valve": pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), categories=[valve]),
+    }, index=df.index)
+
+def get_pressure_df(pressure_map, start, end):
+    jobs = [(valve, ext, start, end) for valve, ext in pressure_map.items()]
+    return _successful(run_all(_fetch_pressure, jobs), "PRESSURE_DF")
 
 def get_raw_df(external_id, start, end):
-    df = fetch_timeseries_df(external_id, start, end)
+    df = _fetch(external_id, start, end)
     if df.empty or df.shape[1] == 0:
         logger.warning(f"[RAW] No data for {external_id}")
-        return pd.DataFrame(columns=["value"])
+        return pd.DataFrame(columns=["value"], index=_empty_index(), dtype=float)
     col = df.columns[0]
     return df.rename(columns={col: "value"})
 
+def get_raw_dfs(requests):
+    """get_raw_df for each (external_id, start, end), fetched in parallel;
+    frames come back in request order and failures raise."""
+    results = run_all(get_raw_df, list(requests))
+    for r in results:
+        if isinstance(r, Exception):
+            raise r
+    return results
@@ -0,0 +1,347 @@
+# logic/data_sources.py
+#
+# Pluggable backends for data_loaders.fetch_timeseries_df. Every source
+# answers ``retrieve(external_id, start_ms, end_ms)`` with a frame indexed by
+# timestamp and one value column named after the external id (empty when
+# there is no data), i.e. what CogniteClient.retrieve_dataframe returns.
+# ``extent(external_id)`` describes where a tag has data (a TagExtent, or
+# None when the source cannot tell); logic/tag_catalog.py caches it.
+
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import config
+
+logger = logging.getLogger("data_sources")
+
+
+class InjectedFailure(ConnectionError):
+    """Raised by FaultInjectingSource to simulate a flaky backend."""
+
+
+class InjectedThrottle(InjectedFailure):
+    """FaultInjectingSource's stand-in for an HTTP 429 with Retry-After."""
+
+    code = 429
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class TagExtent:
+    """Where a tag has data, as of ``checked_ms`` (epoch ms, like the
+    datapoint times). ``first_ms`` is None for a tag without datapoints;
+    ``sample_s`` is the typical spacing of recent samples."""
+
+    exists: bool
+    checked_ms: int
+    first_ms: int | None = None
+    last_ms: int | None = None
+    sample_s: float | None = None
+
+    @property
+    def has_data(self) -> bool:
+        return self.exists and self.first_ms is not None
+
+    def clip(self, start, end):
+        """(start, end) narrowed to where datapoints can be, or None when
+        the range holds none. Beyond ``checked_ms`` new data may have
+        arrived, so an end past it is kept."""
+        if not self.exists:
+            return None
+        if self.first_ms is None:
+            return (max(start, self.checked_ms + 1), end) if end > self.checked_ms else None
+        start = max(start, self.first_ms)
+        if end <= self.checked_ms:
+            end = min(end, self.last_ms)
+        return (start, end) if start <= end else None
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class DataSource:
+    name = "base"
+
+    def retrieve(self, external_id, start, end) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def extent(self, external_id) -> TagExtent | None:
+        return None
+
+
+@lru_cache(maxsize=2)
+def get_cognite_client():
+    from cognite.client import CogniteClient, ClientConfig
+    from cognite.client.credentials import OAuthClientCredentials
+
+    from cognite.client.config import global_config
+
+    # Let throttling reach api_retry's adaptive limiter instead of being
+    # absorbed by the SDK's own long backoff while holding a fetch worker
+    global_config.max_retries = config.CDF_SDK_MAX_RETRIES
+
+    creds = OAuthClientCredentials(
+        token_url=config.AUTHORITY_HOST_URI,
+        client_id=config.CDF_CLIENT_ID,
+        client_secret=config.CDF_CLIENT_SECRET,
+        scopes=config.SCOPES
+    )
+    client_config = ClientConfig(
+        client_name="client",
+        project=config.CDF_PROJECT,
+        credentials=creds,
+        base_url=config.BASE_URL
+    )
+    return CogniteClient(client_config)
+
+
+class CogniteSource(DataSource):
+    name = "cognite"
+
+    def retrieve(self, external_id, start, end):
+        client = get_cognite_client()
+        return client.time_series.data.retrieve_dataframe(external_id=external_id, start=start, end=end)
+
+    def extent(self, external_id):
+        client = get_cognite_client()
+        now = _now_ms()
+        # A single retrieve returns None for an unknown id
+        if client.time_series.retrieve(external_id=external_id) is None:
+            return TagExtent(exists=False, checked_ms=now)
+        first = client.time_series.data.retrieve(external_id=external_id, start=0, end=now, limit=1)
+        if first is None or not len(first):
+            return TagExtent(exists=True, checked_ms=now)
+        first_ms = int(first.timestamp[0])
+        # One LatestDatapoint, with a datetime timestamp
+        latest = client.time_series.data.retrieve_latest(external_id=external_id, before=now + 1)
+        if latest is None or latest.timestamp is None:
+            last_ms = first_ms
+        else:
+            last_ms = round(latest.timestamp.timestamp() * 1000)
+        # Spacing over the last day of data, from hourly count aggregates
+        lo = max(first_ms, last_ms - 86_400_000)
+        counts = client.time_series.data.retrieve(
+            external_id=external_id, start=lo, end=last_ms + 1, aggregates="count", granularity="1h",
+        )
+        n = int(sum(counts.count)) if counts is not None and len(counts) else 0
+        sample_s = (last_ms - lo) / 1000 / (n - 1) if n > 1 else None
+        return TagExtent(True, now, first_ms, last_ms, sample_s)
+
+
+def replay_path(root, external_id) -> str:
+    return os.path.join(root, re.sub(r"[^A-Za-z0-9._-]", "_", external_id) + ".parquet")
+
+
+@lru_cache(maxsize=64)
+def _read_replay(path, mtime):
+    df = pd.read_parquet(path, columns=["timestamp", "value"])
+    ts = pd.DatetimeIndex(df["timestamp"]).as_unit("ns").asi8
+    order = np.argsort(ts, kind="stable")
+    return ts[order], df["value"].to_numpy(dtype=float)[order]
+
+
+class ReplaySource(DataSource):
+    """Recorded series from ``<root>/<external id>.parquet`` (columns
+    ``timestamp``, ``value``). Files are read once and sliced in memory; a
+    missing file behaves like a tag with no data in range."""
+
+    name = "replay"
+
+    def __init__(self, root):
+        self.root = root
+
+    def retrieve(self, external_id, start, end):
+        path = replay_path(self.root, external_id)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        ts, vals = _read_replay(path, os.path.getmtime(path))
+        lo = np.searchsorted(ts, int(start) * 1_000_000, side="left")
+        hi = np.searchsorted(ts, int(end) * 1_000_000, side="right")
+        index = pd.DatetimeIndex(ts[lo:hi].astype("datetime64[ns]"))
+        return pd.DataFrame({external_id: vals[lo:hi]}, index=index)
+
+    def extent(self, external_id):
+        path = replay_path(self.root, external_id)
+        if not os.path.exists(path):
+            return TagExtent(exists=False, checked_ms=_now_ms())
+        ts, _ = _read_replay(path, os.path.getmtime(path))
+        if not len(ts):
+            return TagExtent(exists=True, checked_ms=_now_ms())
+        # Recorded files do not grow: the extent holds for any range
+        sample_s = float(np.median(np.diff(ts[-1000:]))) / 1e9 if len(ts) > 1 else None
+        return TagExtent(True, _now_ms(), int(ts[0]) // 1_000_000, -(-int(ts[-1]) // 1_000_000), sample_s)
+
+
+def write_replay(root, external_id, df) -> str:
+    """Store a retrieve()-shaped frame as a replay file; returns the path."""
+    os.makedirs(root, exist_ok=True)
+    path = replay_path(root, external_id)
+    values = df.iloc[:, 0] if df.shape[1] else pd.Series(dtype=float)
+    pd.DataFrame({
+        "timestamp": pd.DatetimeIndex(df.index).as_unit("ns"),
+        "value": pd.to_numeric(values, errors="coerce").to_numpy(dtype=float),
+    }).to_parquet(path, index=False)
+    return path
+
+
+class SyntheticSource(DataSource):
+    """logic/synthetic.py rigs, one per rig name found in the external id.
+    Prebuilt ``rigs`` are used as-is; others are generated from the config."""
+
+    name = "synthetic"
+
+    def __init__(self, start=None, days=None, sample_hz=None, seed=0, rigs=()):
+        self.start = start or config.SYNTHETIC_START
+        self.days = days or config.SYNTHETIC_DAYS
+        self.sample_hz = sample_hz or config.SYNTHETIC_HZ
+        self.seed = seed
+        self._rigs = {r.config.rig: r for r in rigs}
+        self._lock = threading.Lock()
+
+    def rig(self, name):
+        from logic.synthetic import SyntheticConfig, SyntheticRig
+
+        with self._lock:
+            if name not in self._rigs:
+                self._rigs[name] = SyntheticRig(SyntheticConfig(
+                    rig=name, start=self.start, days=self.days, sample_hz=self.sample_hz, seed=self.seed,
+                ))
+            return self._rigs[name]
+
+    def retrieve(self, external_id, start, end):
+        return self.rig(self._rig_name(external_id)).fetch(external_id, start, end)
+
+    def extent(self, external_id):
+        first_ms, last_ms, sample_s = self.rig(self._rig_name(external_id)).extent(external_id)
+        return TagExtent(True, _now_ms(), first_ms, last_ms, sample_s)
+
+    @staticmethod
+    def _rig_name(external_id):
+        return external_id.split(":", 1)[-1].split(".", 1)[0]
+
+
+class FaultInjectingSource(DataSource):
+    """Wraps a source with latency (``latency_ms`` plus uniform jitter) and a
+    seeded failure rate, so concurrency, retry and cache behaviour can be
+    measured reproducibly without a network. With ``max_concurrent`` set,
+    calls beyond that many in flight are rejected like an API rate limit
+    (InjectedThrottle, carrying ``retry_after_s``)."""
+
+    def __init__(self, inner, latency_ms=0.0, jitter_ms=0.0, failure_rate=0.0, seed=0,
+                 max_concurrent=None, retry_after_s=None):
+        self.inner = inner
+        self.name = inner.name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.max_concurrent = max_concurrent
+        self.retry_after_s = retry_after_s
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def retrieve(self, external_id, start, end):
+        with self._lock:
+            self.calls += 1
+            if self.max_concurrent and self.in_flight >= self.max_concurrent:
+                self.throttled += 1
+                raise InjectedThrottle(f"too many requests for {external_id}", self.retry_after_s)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            delay = self.latency_ms + self.jitter_ms * self._rng.random()
+            fail = self._rng.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        try:
+            if delay > 0:
+                time.sleep(delay / 1000)
+            if fail:
+                raise InjectedFailure(f"injected failure for {external_id}")
+            return self.inner.retrieve(external_id, start, end)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def extent(self, external_id):
+        return self.inner.extent(external_id)
+
+
+_source = None
+_source_lock = threading.Lock()
+
+
+def _from_config():
+    kind = config.DATA_SOURCE
+    if kind == "cognite":
+        return CogniteSource()
+    if kind == "replay":
+        inner = ReplaySource(config.REPLAY_DIR)
+    elif kind == "synthetic":
+        inner = SyntheticSource()
+    else:
+        raise ValueError(f"Unknown DATA_SOURCE {kind!r} (expected cognite, replay or synthetic)")
+    if (config.SOURCE_LATENCY_MS or config.SOURCE_JITTER_MS or config.SOURCE_FAILURE_RATE
+            or config.SOURCE_MAX_CONCURRENT):
+        return FaultInjectingSource(
+            inner, config.SOURCE_LATENCY_MS, config.SOURCE_JITTER_MS,
+            config.SOURCE_FAILURE_RATE, config.SOURCE_SEED,
+            max_concurrent=config.SOURCE_MAX_CONCURRENT or None,
+            retry_after_s=config.SOURCE_RETRY_AFTER_S,
+        )
+    return inner
+
+
+def get_data_source() -> DataSource:
+    global _source
+    with _source_lock:
+        if _source is None:
+            _source = _from_config()
+            logger.info(f"[SOURCE] Using {_source.name} data source")
+        return _source
+
+
+def set_data_source(source):
+    """Swap the active source (benchmarks, load tests); returns the previous
+    one so callers can restore it. ``None`` re-reads the config next time."""
+    global _source
+    with _source_lock:
+        previous, _source = _source, source
+    return previous
+
+
+def source_spec(source=None) -> tuple:
+    """Picklable description of ``source`` (default: the active one) for
+    worker processes, which build their own; see use_source_spec."""
+    source = source or get_data_source()
+    if isinstance(source, ReplaySource):
+        return ("replay", source.root)
+    if isinstance(source, SyntheticSource):
+        return ("synthetic", {"start": source.start, "days": source.days,
+                              "sample_hz": source.sample_hz, "seed": source.seed})
+    return ("config", None)
+
+
+def use_source_spec(spec):
+    """Process-pool initializer: activate the source described by ``spec``
+    (``("config", None)`` keeps the configured one)."""
+    kind, arg = spec
+    if kind == "replay":
+        set_data_source(ReplaySource(arg))
+    elif kind == "synthetic":
+        set_data_source(SyntheticSource(**arg))
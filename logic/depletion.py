@@ -5,6 +5,8 @@ import numpy as np
 from functools import lru_cache
 import logging
 
+from logic.memo import memoize
+
 logger = logging.getLogger("depletion")
 
 VALVE_CLASS_MAP = {
@@ -29,6 +31,15 @@ FLOW_THRESHOLDS = {
     "Connector":    (2, 5),
 }
 
+# Sidebar defaults for the ramp detection window (seconds) per valve class
+DEFAULT_CATEGORY_WINDOWS = {
+    "Annular":      30,
+    "Pipe Ram":     60,
+    "Shear Ram":    90,
+    "Casing Shear": 120,
+    "Connector":    120,
+}
+
 VALVE_DEPLETION_WEIGHTS = {
     "Annular": {
         "normal_open":   0.1,   
@@ -104,14 +115,16 @@ def classify_flow_category(delta_gal: float, valve_class: str) -> str:
 def estimate_cycle_depletion(valve_class: str, state: str, flow_category: str) -> float:
     return get_depletion_weight(valve_class, state, flow_category)
 
+@memoize
 def load_and_preprocess(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         logger.warning("[DEPLETION] load_and_preprocess: Empty DataFrame")
         return df
     df = df.copy()
     df["Valve Class"] = df["valve"].map(VALVE_CLASS_MAP)
-    low = df["Valve Class"].map(lambda v: FLOW_THRESHOLDS.get(v, (float("inf"), float("inf")))[0])
-    high = df["Valve Class"].map(lambda v: FLOW_THRESHOLDS.get(v, (float("inf"), float("inf")))[1])
+    # Dict lookups (not lambdas) so categorical "valve" columns map by category
+    low = df["Valve Class"].map({k: v[0] for k, v in FLOW_THRESHOLDS.items()}).astype(float).fillna(float("inf"))
+    high = df["Valve Class"].map({k: v[1] for k, v in FLOW_THRESHOLDS.items()}).astype(float).fillna(float("inf"))
     df["Flow Category"] = pd.Categorical(
         np.select(
             [df["Δ (gal)"] <= low, df["Δ (gal)"] <= high],
@@ -0,0 +1,190 @@
+# logic/eds.py
+
+import pandas as pd
+import numpy as np
+import logging
+import streamlit as st
+
+from datetime import timedelta
+
+from logic.data_loaders import get_raw_dfs
+from logic.preprocessing import to_ms
+from logic.step_signals import StepSignal
+from logic.timeaxis import NS_PER_MS, NS_PER_S, to_ns
+from logic.instrumentation import stage
+
+logger = logging.getLogger("eds")
+
+EDS_CHANNELS = ["Ba", "Bb", "Ya", "Yb"]
+POD_CHANNEL_MAP = {1: "Ba", 2: "Bb", 3: "Ya", 4: "Yb"}
+
+# Valve status is fetched once per trigger for the longest selectable window,
+# so any shorter post-command window can be re-sliced from the cached arrays.
+MAX_WINDOW_SECONDS = 3600
+# Post-command window lengths offered on the EDS page
+WINDOW_OPTIONS = [30, 60, 120, 300, 600, 900, 1200, 1800, 2700, 3600]
+
+VALVE_EVENT_COLUMNS = [
+    "EDS Command Time",
+    "EDS Command Value",
+    "Valve Name",
+    "Valve Event",
+    "Function State",
+    "Raw Status Code",
+    "Valve Event Time",
+    "Seconds After Command",
+]
+
+_EMPTY = (np.empty(0, dtype=np.int64), np.empty(0, dtype=float))
+
+
+def eds_progress_tag(rig, eds_base_tag, ch):
+    if rig == "Drillmax":
+        return f"{eds_base_tag}{ch}EDSProgress"
+    return f"{eds_base_tag}{ch}.{ch}EDSProgress"
+
+
+def _index_to_arrays(df):
+    if df.empty or df.shape[1] == 0:
+        return _EMPTY
+    ts = to_ns(df.index)
+    vals = pd.to_numeric(df.iloc[:, 0], errors="coerce").to_numpy(dtype=float)
+    return ts, vals
+
+
+def _detect_triggers(progress, pod):
+    """EDS commands are rising edges of a channel's progress signal from 0,
+    kept only when that channel belongs to the pod active at the time."""
+    rows = []
+    for ch, (ts, vals) in progress.items():
+        if ts.size == 0:
+            continue
+        prev = np.concatenate(([0.0], vals[:-1]))
+        prev = np.where(np.isnan(prev), 0.0, prev)
+        for i in np.flatnonzero((prev == 0) & (vals > 0)):
+            pod_val = pod.asof([ts[i]])[0]
+            if np.isnan(pod_val):
+                continue
+            pod_val = int(pod_val)
+            if POD_CHANNEL_MAP.get(pod_val) != ch:
+                continue
+            trigger_val = vals[i]
+            rows.append({
+                "Channel": ch,
+                "EDS Command Time": pd.Timestamp(ts[i]),
+                "Pod at Command": "Blue Pod" if pod_val in (1, 2) else "Yellow Pod",
+                "EDS Command Value": int(trigger_val) if int(trigger_val) == trigger_val else trigger_val,
+            })
+    triggers_df = pd.DataFrame(rows)
+    if triggers_df.empty:
+        return triggers_df
+    triggers_df = triggers_df.sort_values("EDS Command Time").reset_index(drop=True)
+    triggers_df.insert(0, "Event #", triggers_df.index + 1)
+    return triggers_df
+
+
+def load_eds_signals(rig, start, end, valve_map, vol_ext, active_pod_tag, eds_base_tag):
+    """Fetch the raw signals behind the EDS page.
+
+    Returns a dict of sorted int64-ns/value arrays for ``vol`` and
+    ``progress`` (per channel), the active ``pod`` as a StepSignal, the
+    window-independent ``triggers`` table and ``valves`` — per valve, one
+    status StepSignal per trigger covering ``MAX_WINDOW_SECONDS`` after the
+    command (or up to the next command).
+    """
+    sm = to_ms(start)
+    em = to_ms(end + timedelta(days=1)) - 1
+    tags = [active_pod_tag, vol_ext] + [eds_progress_tag(rig, eds_base_tag, ch) for ch in EDS_CHANNELS]
+    pod_raw, vol_raw, *progress_raw = get_raw_dfs((tag, sm, em) for tag in tags)
+    pod = StepSignal.from_samples(*_index_to_arrays(pod_raw))
+    vol = _index_to_arrays(vol_raw)
+    progress = {ch: _index_to_arrays(raw) for ch, raw in zip(EDS_CHANNELS, progress_raw)}
+    with stage("eds_triggers") as s:
+        triggers_df = _detect_triggers(progress, pod)
+        s.rows_out = len(triggers_df)
+
+    valves = {name: [] for name in valve_map}
+    if not triggers_df.empty:
+        cmd_ns = to_ns(triggers_df["EDS Command Time"])
+        max_ns = MAX_WINDOW_SECONDS * NS_PER_S
+        requests = []
+        for i, t0 in enumerate(cmd_ns):
+            t1 = t0 + max_ns
+            if i + 1 < len(cmd_ns):
+                t1 = min(t1, cmd_ns[i + 1])
+            requests += [(name, tag, int(t0 // NS_PER_MS), int(t1 // NS_PER_MS)) for name, tag in valve_map.items()]
+        frames = get_raw_dfs(req[1:] for req in requests)
+        for (name, *_), raw in zip(requests, frames):
+            valves[name].append(StepSignal.from_samples(*_index_to_arrays(raw)))
+
+    return {
+        "pod": pod,
+        "vol": vol,
+        "progress": progress,
+        "triggers": triggers_df,
+        "valves": valves,
+    }
+
+
+@st.cache_data(ttl=24 * 3600, show_spinner="Loading EDS signals…")
+def cached_eds_signals(rig, start, end, valve_map, vol_ext, active_pod_tag, eds_base_tag):
+    """load_eds_signals behind st.cache_data, shared across sessions (and
+    filled ahead of time by logic/cache_warmer.py)."""
+    return load_eds_signals(rig, start, end, valve_map, vol_ext, active_pod_tag, eds_base_tag)
+
+
+def analyze_eds_windows(signals, simple_map, function_map, window_seconds=900):
+    """Slice cached EDS signals into post-command windows.
+
+    Each window runs ``window_seconds`` after a command, or up to the next
+    command if that comes first. Returns (triggers_df, valve_events_df).
+    """
+    triggers_df = signals["triggers"]
+    if triggers_df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    if window_seconds > MAX_WINDOW_SECONDS:
+        logger.warning(f"[EDS] window_seconds={window_seconds} clipped to {MAX_WINDOW_SECONDS}")
+        window_seconds = MAX_WINDOW_SECONDS
+
+    triggers_df = triggers_df.copy()
+    cmd_ns = to_ns(triggers_df["EDS Command Time"])
+    win_ns = int(window_seconds * NS_PER_S)
+    ends = cmd_ns + win_ns
+    ends[:-1] = np.minimum(ends[:-1], cmd_ns[1:])
+
+    vol_ts, vol_vals = signals["vol"]
+    lo = np.searchsorted(vol_ts, cmd_ns, side="left")
+    hi = np.searchsorted(vol_ts, ends, side="left")
+    total_vols = []
+    for a, b in zip(lo, hi):
+        if b > a:
+            seg = vol_vals[a:b]
+            total_vols.append(round((np.nanmax(seg) - np.nanmin(seg)) / 10, 2))
+        else:
+            total_vols.append(None)
+    triggers_df["Total Volume (gal)"] = total_vols
+
+    events = []
+    cmd_values = triggers_df["EDS Command Value"].tolist()
+    cmd_times = triggers_df["EDS Command Time"].tolist()
+    for i in range(len(triggers_df)):
+        for valve_name, windows in signals["valves"].items():
+            status = windows[i]
+            ts, codes = status.times, status.values
+            # first sample of each fetch has no predecessor, so it never counts
+            change = status.transitions()
+            change = change[(ts[change] >= cmd_ns[i]) & (ts[change] < ends[i])]
+            for j in change:
+                raw_code = int(codes[j])
+                events.append({
+                    "EDS Command Time": cmd_times[i],
+                    "EDS Command Value": cmd_values[i],
+                    "Valve Name": valve_name,
+                    "Valve Event": simple_map[valve_name].get(raw_code, "OTHER"),
+                    "Function State": function_map[valve_name].get(raw_code, "OTHER"),
+                    "Raw Status Code": raw_code,
+                    "Valve Event Time": pd.Timestamp(ts[j]),
+                    "Seconds After Command": int((ts[j] - cmd_ns[i]) // NS_PER_S),
+                })
+
+    return triggers_df, pd.DataFrame(events, columns=VALVE_EVENT_COLUMNS)
@@ -0,0 +1,431 @@
+# logic/event_store.py
+#
+# Materialized analytics store. tools/materialize.py runs the dashboard
+# pipeline, the pressure series and the EDS analysis per rig and calendar
+# month (in a process pool) and writes the results as Parquet:
+#
+#   {EVENT_STORE_DIR}/v{STORE_VERSION}/{table}/rig={rig}/{YYYY-MM}.parquet
+#   {EVENT_STORE_DIR}/v{STORE_VERSION}/manifest.json
+#
+# A month is computed over the month plus ``pad_days`` on each side and cut
+# back to its own rows, so ramp windows, well-pressure windows and cycles
+# that cross a month boundary still see their neighbours (up to the pad).
+# Only months whose padded range is in the past are written.
+#
+# The app reads the leading months of a date range that are in the store
+# and computes the rest (the recent part, or everything after a gap) live
+# with the usual cached loaders, then stitches the two. The live part is
+# padded like a month: computed from ``pad_days`` before its first day and
+# cut back to its own rows. Dashboard tables are only served for the
+# parameters they were built with (category windows, flow thresholds,
+# valve classes). Bump STORE_VERSION when the pipeline's output changes;
+# older versions are left on disk and ignored.
+
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import config
+from logic.dashboard_data import (
+    chunk_series, compute_dashboard_data, compute_pressure_series, fetch_pressure_series, load_dashboard_data,
+    load_pressure_series,
+)
+from logic.depletion import DEFAULT_CATEGORY_WINDOWS, FLOW_THRESHOLDS, VALVE_CLASS_MAP
+from logic.chunked_series import concat_series
+from logic.eds import VALVE_EVENT_COLUMNS, WINDOW_OPTIONS, analyze_eds_windows, load_eds_signals
+from logic.ingest import concat_frames
+from logic.preprocessing import to_ms
+from logic.shared_store import get_shared_store, shared_key
+from logic.tag_maps import get_rig_tags
+
+logger = logging.getLogger("event_store")
+
+STORE_VERSION = 1
+DEFAULT_PAD_DAYS = 2
+
+# Table -> time column rows are partitioned and range-filtered by (None: the index)
+TABLES = {
+    "events": "timestamp",
+    "vol": None,
+    "pressure": None,
+    "cycles": "Close Time",
+    "eds_triggers": "EDS Command Time",
+    "eds_valve_events": "EDS Command Time",
+}
+
+
+def params_key(category_windows, flow_thresholds=FLOW_THRESHOLDS, valve_class=VALVE_CLASS_MAP) -> str:
+    """Fingerprint of the parameters the dashboard tables depend on."""
+    payload = json.dumps(
+        [dict(category_windows), {k: list(v) for k, v in flow_thresholds.items()}, dict(valve_class)],
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+def month_bounds(month: str, pad_days=0):
+    """[start, stop) timestamps of a ``YYYY-MM`` month, widened by the pad."""
+    period = pd.Period(month, freq="M")
+    pad = pd.Timedelta(days=pad_days)
+    return period.start_time - pad, period.end_time.normalize() + pd.Timedelta(days=1) + pad
+
+
+def months_between(start, end) -> list:
+    return [str(p) for p in pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq="M")]
+
+
+@lru_cache(maxsize=4)
+def _read_manifest(path, mtime):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_atomic(path, write):
+    # Readers only ever see complete files: write aside, then rename over
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+@dataclass
+class StorePlan:
+    months: list = field(default_factory=list)  # stored months to read, in order
+    live_start: date = None  # first day computed live (None: all stored)
+    pad_days: int = DEFAULT_PAD_DAYS
+
+    @property
+    def live_fetch_start(self):
+        """First day to compute the live part from. After stored months it
+        is padded like a month, so the rows just past the boundary still
+        see their neighbours; cut the result back with live_rows()."""
+        if self.live_start is None or not self.months:
+            return self.live_start
+        return self.live_start - timedelta(days=self.pad_days)
+
+    def live_rows(self, table, df):
+        """Rows of a live-computed ``table`` (a frame, or a series for
+        "pressure") from live_start on."""
+        if df is None or self.live_start is None or not self.months:
+            return df
+        start = pd.Timestamp(self.live_start)
+        if TABLES[table] is None and not isinstance(df, pd.DataFrame):
+            return df.loc[start:]
+        return _slice(df, TABLES[table], start, None)
+
+
+class EventStore:
+    def __init__(self, root=None, version=STORE_VERSION):
+        self.root = os.path.join(root or config.EVENT_STORE_DIR, f"v{version}")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+
+    def path(self, table, rig, month) -> str:
+        return os.path.join(self.root, table, f"rig={rig}", f"{month}.parquet")
+
+    def manifest(self) -> dict:
+        try:
+            mtime = os.path.getmtime(self.manifest_path)
+        except OSError:
+            return {"version": STORE_VERSION, "partitions": {}}
+        return _read_manifest(self.manifest_path, mtime)
+
+    def entry(self, rig, month):
+        return self.manifest()["partitions"].get(f"{rig}/{month}")
+
+    # --- writing (tools/materialize.py) ----------------------------------
+    def write_partition(self, rig, month, tables: dict) -> dict:
+        """Write one month's rows of each table; returns row counts. Call
+        record() with the result once every table is written."""
+        start, stop = month_bounds(month)
+        rows = {}
+        for name, df in tables.items():
+            df = _slice(df, TABLES[name], start, stop)
+            rows[name] = len(df)
+            path = self.path(name, rig, month)
+            if df.empty:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            table = pa.Table.from_pandas(df, preserve_index=TABLES[name] is None)
+            _write_atomic(path, lambda tmp: pq.write_table(table, tmp))
+        return rows
+
+    def record(self, entries):
+        """Add or replace manifest entries ({"rig", "month", ...}); one
+        writer (the batch job's parent process) at a time."""
+        manifest = self.manifest()
+        partitions = dict(manifest["partitions"])
+        for e in entries:
+            partitions[f"{e['rig']}/{e['month']}"] = e
+        data = {"version": STORE_VERSION, "updated_at": datetime.now().isoformat(timespec="seconds"),
+                "partitions": dict(sorted(partitions.items()))}
+
+        def write(tmp):
+            with open(tmp, "w") as f:
+                json.dump(data, f, indent=1, default=str)
+        _write_atomic(self.manifest_path, write)
+
+    # --- reading ---------------------------------------------------------
+    def plan(self, rig, start_date, end_date, params=None) -> StorePlan:
+        """Leading months of the range held in the store (built with
+        ``params`` when given) and the first day left to compute live."""
+        plan = StorePlan()
+        for month in months_between(start_date, end_date):
+            e = self.entry(rig, month)
+            if e is None or (params is not None and e.get("params") != params):
+                plan.live_start = max(month_bounds(month)[0].date(), start_date)
+                break
+            plan.months.append(month)
+        return plan
+
+    def read(self, table, rig, months, start=None, stop=None, filters=None) -> pd.DataFrame:
+        """Rows of ``table`` for the months in [start, stop); ``filters``
+        are pushed down to the Parquet reader."""
+        frames = []
+        for month in months:
+            path = self.path(table, rig, month)
+            if os.path.exists(path):
+                frames.append(pq.read_table(path, filters=filters, partitioning=None).to_pandas())
+        if not frames:
+            return pd.DataFrame()
+        return _slice(concat_frames(frames), TABLES[table], start, stop)
+
+
+def _slice(df, time_col, start, stop):
+    if df is None or df.empty:
+        return pd.DataFrame() if df is None else df
+    t = df.index if time_col is None else df[time_col]
+    keep = np.ones(len(df), dtype=bool)
+    if start is not None:
+        keep &= np.asarray(t >= start)
+    if stop is not None:
+        keep &= np.asarray(t < stop)
+    return df[keep]
+
+
+def get_store():
+    return EventStore() if config.EVENT_STORE_DIR else None
+
+
+def _range_bounds(start_date, end_date):
+    return pd.Timestamp(start_date), pd.Timestamp(end_date) + pd.Timedelta(days=1)
+
+
+# --- batch side ------------------------------------------------------------
+def pressure_frame(series_by_valve: dict) -> pd.DataFrame:
+    """Pressure series per valve name as one long frame (index: time)."""
+    frames = [
+        pd.DataFrame({"series": name, "pressure": s.to_numpy(dtype=float)}, index=s.index)
+        for name, s in series_by_valve.items()
+    ]
+    if not frames:
+        return pd.DataFrame()
+    out = pd.concat(frames)
+    out["series"] = out["series"].astype("category")
+    return out
+
+
+def pressure_series(frame: pd.DataFrame) -> dict:
+    if frame.empty:
+        return {}
+    return {
+        name: grp["pressure"].rename_axis(None)
+        for name, grp in frame.groupby("series", observed=True, sort=False)
+    }
+
+
+def _eds_tables(rig, tags, start, end):
+    signals = load_eds_signals(
+        rig, start, end, tags["valve_map"], tags["vol_ext"],
+        tags["active_pod_tag"], tags["eds_base_tag"],
+    )
+    triggers, valve_events = [], []
+    for seconds in WINDOW_OPTIONS:
+        trig, events = analyze_eds_windows(
+            signals, tags["per_valve_simple_map"], tags["per_valve_function_map"], window_seconds=seconds,
+        )
+        if not trig.empty:
+            triggers.append(trig.drop(columns="Event #").assign(**{"Window (s)": seconds}))
+        if not events.empty:
+            valve_events.append(events.assign(**{"Window (s)": seconds}))
+    return (
+        pd.concat(triggers, ignore_index=True) if triggers else pd.DataFrame(),
+        pd.concat(valve_events, ignore_index=True) if valve_events else pd.DataFrame(),
+    )
+
+
+def compute_partition(rig, month, pad_days=DEFAULT_PAD_DAYS, category_windows=None) -> dict:
+    """All tables for one rig/month, computed over the padded month."""
+    category_windows = dict(category_windows or DEFAULT_CATEGORY_WINDOWS)
+    tags = get_rig_tags(rig)
+    start, stop = month_bounds(month, pad_days)
+    start_date, end_date = start.date(), (stop - pd.Timedelta(days=1)).date()
+    pressures = fetch_pressure_series(tags["pressure_map"], to_ms(start_date), to_ms(stop) - 1)
+    events, vol, cycles, _ = compute_dashboard_data(
+        rig, start_date, end_date, category_windows, tags["valve_map"],
+        tags["per_valve_simple_map"], tags["per_valve_function_map"],
+        VALVE_CLASS_MAP, tags["vol_ext"], tags["pressure_map"],
+        tags["active_pod_tag"], FLOW_THRESHOLDS,
+        pressure_series_by_valve=pressures,
+    )
+    eds_triggers, eds_valve_events = _eds_tables(rig, tags, start_date, end_date)
+    return {
+        "events": events,
+        "vol": vol,
+        "pressure": pressure_frame(pressures),
+        "cycles": cycles,
+        "eds_triggers": eds_triggers,
+        "eds_valve_events": eds_valve_events,
+    }
+
+
+def materialize(rig, month, root=None, pad_days=DEFAULT_PAD_DAYS, category_windows=None) -> dict:
+    """Compute and write one partition; returns its manifest entry."""
+    t0 = time.perf_counter()
+    category_windows = dict(category_windows or DEFAULT_CATEGORY_WINDOWS)
+    store = EventStore(root)
+    rows = store.write_partition(rig, month, compute_partition(rig, month, pad_days, category_windows))
+    return {
+        "rig": rig,
+        "month": month,
+        "pad_days": pad_days,
+        "params": params_key(category_windows),
+        "rows": rows,
+        "seconds": round(time.perf_counter() - t0, 2),
+        "written_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def is_settled(month, pad_days=DEFAULT_PAD_DAYS, now=None) -> bool:
+    """True once the whole padded month is in the past."""
+    now = pd.Timestamp(now or datetime.now())
+    return month_bounds(month, pad_days)[1] <= now
+
+
+# --- app side ----------------------------------------------------------------
+def plan_range(rig, start_date, end_date, params=None) -> StorePlan:
+    """EventStore.plan on the configured store; everything live without one."""
+    store = get_store()
+    if store is None:
+        return StorePlan(live_start=start_date)
+    return store.plan(rig, start_date, end_date, params)
+
+
+def _stored_bounds(plan, start_date, end_date):
+    start, stop = _range_bounds(start_date, end_date)
+    return start, (stop if plan.live_start is None else pd.Timestamp(plan.live_start))
+
+
+DASHBOARD_TABLES = ("events", "vol", "cycles", "well")
+
+
+def load_dashboard(
+    rig, start_date, end_date, category_windows, valve_map, simple_map,
+    function_map, valve_class, vol_ext, pressure_map, active_pod_tag, flow_thresholds,
+):
+    """load_dashboard_data, served from the store where it holds the range
+    (and from the cross-process shared store when one is configured)."""
+    plan = plan_range(rig, start_date, end_date, params_key(category_windows, flow_thresholds, valve_class))
+    args = (category_windows, valve_map, simple_map, function_map, valve_class,
+            vol_ext, pressure_map, active_pod_tag, flow_thresholds)
+    shared = get_shared_store()
+    if shared is None:
+        return _load_dashboard(rig, start_date, end_date, plan, args, load_dashboard_data)
+    key = shared_key("dashboard", rig, start_date, end_date, plan, args)
+    tables = shared.get_or_compute(key, lambda: dict(zip(
+        DASHBOARD_TABLES, _load_dashboard(rig, start_date, end_date, plan, args, compute_dashboard_data),
+    )))
+    return tuple(tables.get(name) for name in DASHBOARD_TABLES)
+
+
+def _load_dashboard(rig, start_date, end_date, plan, args, load):
+    if not plan.months:
+        return load(rig, start_date, end_date, *args)
+
+    store = get_store()
+    start, stop = _stored_bounds(plan, start_date, end_date)
+    events = store.read("events", rig, plan.months, start, stop)
+    vol = store.read("vol", rig, plan.months, start, stop)
+    cycles = store.read("cycles", rig, plan.months, start, stop)
+    well = pressure_series(store.read(
+        "pressure", rig, plan.months, start, stop, filters=[("series", "=", "Well Pressure")],
+    )).get("Well Pressure")
+    logger.info(f"[STORE] {rig}: {plan.months[0]}..{plan.months[-1]} from the store, "
+                f"live from {plan.live_start or '-'}")
+    if plan.live_start is None:
+        return events.reset_index(drop=True), vol, cycles, well
+
+    live_events, live_vol, live_cycles, live_well = load(rig, plan.live_fetch_start, end_date, *args)
+    events = concat_frames([events, plan.live_rows("events", live_events)]).reset_index(drop=True)
+    vol = concat_frames([vol, plan.live_rows("vol", live_vol)])
+    cycles = [f for f in (cycles, plan.live_rows("cycles", live_cycles)) if len(f)]
+    cycles = pd.concat(cycles, ignore_index=True) if cycles else pd.DataFrame()
+    well = chunk_series(concat_series([well, plan.live_rows("pressure", live_well)]))
+    return events, vol, cycles, well
+
+
+def load_pressures(rig, pressure_map, start_date, end_date):
+    """load_pressure_series, served from the store where it holds the range
+    (and from the cross-process shared store when one is configured)."""
+    plan = plan_range(rig, start_date, end_date)
+    shared = get_shared_store()
+    if shared is None:
+        return _load_pressures(rig, pressure_map, start_date, end_date, plan, load_pressure_series)
+    key = shared_key("pressures", rig, start_date, end_date, plan, pressure_map)
+    return shared.get_or_compute(key, lambda: _load_pressures(
+        rig, pressure_map, start_date, end_date, plan, compute_pressure_series,
+    ))
+
+
+def _load_pressures(rig, pressure_map, start_date, end_date, plan, load):
+    if not plan.months:
+        return load(pressure_map, start_date, end_date)
+    start, stop = _stored_bounds(plan, start_date, end_date)
+    out = pressure_series(get_store().read("pressure", rig, plan.months, start, stop))
+    if plan.live_start is not None:
+        for name, s in load(pressure_map, plan.live_fetch_start, end_date).items():
+            s = plan.live_rows("pressure", s)
+            out[name] = chunk_series(concat_series([out[name], s]) if name in out else s)
+    return out
+
+
+def stored_eds_windows(rig, plan, start_date, end_date, window_seconds):
+    """(triggers, valve events) of the stored months for one post-command
+    window; the caller computes from plan.live_fetch_start on and keeps
+    plan.live_rows of its tables."""
+    if not plan.months:
+        return pd.DataFrame(), pd.DataFrame()
+    store = get_store()
+    start, stop = _stored_bounds(plan, start_date, end_date)
+    out = []
+    for table in ("eds_triggers", "eds_valve_events"):
+        df = store.read(table, rig, plan.months, start, stop)
+        if len(df):
+            df = df[df["Window (s)"] == window_seconds].drop(columns="Window (s)").reset_index(drop=True)
+        out.append(df)
+    return tuple(out)
+
+
+def stitch_eds(stored, live):
+    """Stored then live (triggers, valve events), commands renumbered."""
+    triggers = [t.drop(columns="Event #", errors="ignore") for t in (stored[0], live[0]) if len(t)]
+    triggers = pd.concat(triggers, ignore_index=True) if triggers else pd.DataFrame()
+    if len(triggers):
+        triggers.insert(0, "Event #", triggers.index + 1)
+    events = [e for e in (stored[1], live[1]) if len(e)]
+    events = pd.concat(events, ignore_index=True) if events else pd.DataFrame(columns=VALVE_EVENT_COLUMNS)
+    return triggers, events
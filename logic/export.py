@@ -0,0 +1,82 @@
+# logic/export.py
+
+import io
+import logging
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from logic.aligned_table import AlignedTable
+from logic.timeaxis import ns_to_index
+
+logger = logging.getLogger("export")
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def _aligned_chunks(table: AlignedTable, chunk_rows: int, t_from=None, t_to=None):
+    lo, hi = table.row_range(t_from, t_to)
+    for offset in range(0, hi - lo, chunk_rows):
+        yield table.page(offset, chunk_rows, t_from, t_to)
+
+
+def _long_chunks(channels: dict, chunk_rows: int, t_from=None, t_to=None):
+    lo_ns = None if t_from is None else pd.Timestamp(t_from).value
+    hi_ns = None if t_to is None else pd.Timestamp(t_to).value
+    for ch, (ts, vals) in channels.items():
+        a = 0 if lo_ns is None else int(np.searchsorted(ts, lo_ns, side="left"))
+        b = ts.size if hi_ns is None else int(np.searchsorted(ts, hi_ns, side="right"))
+        for i in range(a, b, chunk_rows):
+            j = min(b, i + chunk_rows)
+            yield pd.DataFrame({
+                "timestamp": ns_to_index(ts[i:j], utc=True),
+                "channel": ch,
+                "value": vals[i:j],
+            })
+
+
+def _frame_chunks(df: pd.DataFrame, chunk_rows: int):
+    for i in range(0, len(df), chunk_rows):
+        yield df.iloc[i:i + chunk_rows]
+
+
+def write_chunks(chunks, fileobj, fmt: str = "parquet") -> int:
+    """Write DataFrame chunks to ``fileobj`` one row group (or CSV block) at
+    a time and return the number of rows written."""
+    rows = 0
+    writer = None
+    wrote_header = False
+    try:
+        for chunk in chunks:
+            if fmt == "parquet":
+                batch = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(fileobj, batch.schema)
+                writer.write_table(batch)
+            else:
+                text = chunk.to_csv(index=False, header=not wrote_header)
+                fileobj.write(text.encode("utf-8"))
+                wrote_header = True
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if rows == 0:
+        logger.warning("[EXPORT] No rows to export")
+    return rows
+
+
+def export_aligned(table: AlignedTable, fileobj, fmt: str = "parquet", chunk_rows: int = DEFAULT_CHUNK_ROWS, t_from=None, t_to=None) -> int:
+    return write_chunks(_aligned_chunks(table, chunk_rows, t_from, t_to), fileobj, fmt)
+
+
+def export_long(channels: dict, fileobj, fmt: str = "parquet", chunk_rows: int = DEFAULT_CHUNK_ROWS, t_from=None, t_to=None) -> int:
+    return write_chunks(_long_chunks(channels, chunk_rows, t_from, t_to), fileobj, fmt)
+
+
+def frame_to_bytes(df: pd.DataFrame, fmt: str = "parquet", chunk_rows: int = DEFAULT_CHUNK_ROWS) -> bytes:
+    buf = io.BytesIO()
+    write_chunks(_frame_chunks(df, chunk_rows), buf, fmt)
+    return buf.getvalue()
@@ -0,0 +1,210 @@
+# logic/fetch_scheduler.py
+#
+# One process-wide pool for upstream fetches. Jobs carry a priority (what the
+# user is looking at before prefetch) and a group (the Streamlit session), and
+# workers serve groups round-robin within a priority so one heavy session
+# cannot starve the others. A session's queued jobs, at every priority, are
+# cancelled when it switches page or rig (cancel_on_change, from app.py).
+#
+# Jobs must not wait on other scheduler jobs: a worker blocked on a queued
+# job can deadlock the pool.
+
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, Future, as_completed
+
+import config
+from logic import instrumentation
+
+logger = logging.getLogger("fetch_scheduler")
+
+VISIBLE = 0
+PREFETCH = 10
+
+_priority = contextvars.ContextVar("fetch_priority", default=VISIBLE)
+_group = contextvars.ContextVar("fetch_group", default=None)
+
+
+class FetchScheduler:
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._lock = threading.Condition()
+        # priority -> OrderedDict(group -> deque of (future, fn, args, kwargs))
+        self._queues: dict[int, OrderedDict] = {}
+        self._workers: list[threading.Thread] = []
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._cancelled = 0
+        self._closed = False
+
+    def submit(self, fn, *args, priority=None, group=None, **kwargs) -> Future:
+        priority = _priority.get() if priority is None else priority
+        group = current_group() if group is None else group
+        future = Future()
+        job = (future, instrumentation.bind(fn), args, kwargs)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("FetchScheduler is shut down")
+            self._queues.setdefault(priority, OrderedDict()).setdefault(group, deque()).append(job)
+            self._submitted += 1
+            if len(self._workers) < self.max_workers and len(self._workers) < self._in_flight + self._queued():
+                worker = threading.Thread(target=self._work, name=f"fetch-{len(self._workers)}", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._lock.notify()
+        return future
+
+    def _queued(self) -> int:
+        return sum(len(q) for groups in self._queues.values() for q in groups.values())
+
+    def _next_job(self):
+        # Lowest priority number first; within it, take the head group's
+        # oldest job and rotate that group to the back.
+        for priority in sorted(self._queues):
+            groups = self._queues[priority]
+            while groups:
+                group, jobs = next(iter(groups.items()))
+                job = jobs.popleft()
+                if jobs:
+                    groups.move_to_end(group)
+                else:
+                    del groups[group]
+                if job[0].set_running_or_notify_cancel():
+                    return job
+                self._cancelled += 1
+            del self._queues[priority]
+        return None
+
+    def _work(self):
+        while True:
+            with self._lock:
+                job = self._next_job()
+                while job is None:
+                    if self._closed:
+                        return
+                    self._lock.wait()
+                    job = self._next_job()
+                self._in_flight += 1
+            future, fn, args, kwargs = job
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                    self._completed += 1
+
+    def cancel(self, group, priority=None) -> int:
+        """Cancel ``group``'s queued jobs (at ``priority``, or all); running
+        fetches finish. Returns the number cancelled."""
+        n = 0
+        with self._lock:
+            for p, groups in self._queues.items():
+                if priority is not None and p != priority:
+                    continue
+                for future, *_ in groups.pop(group, ()):
+                    n += future.cancel()
+            self._cancelled += n
+        if n:
+            logger.info(f"[SCHED] Cancelled {n} queued fetches for {group}")
+        return n
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": len(self._workers),
+                "max_workers": self.max_workers,
+                "in_flight": self._in_flight,
+                "queued": self._queued(),
+                "queued_by_priority": {
+                    p: sum(len(q) for q in groups.values()) for p, groups in sorted(self._queues.items())
+                },
+                "sessions_waiting": len({g for groups in self._queues.values() for g in groups}),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "cancelled": self._cancelled,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> FetchScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = FetchScheduler(config.FETCH_WORKERS)
+        return _scheduler
+
+
+def _script_ctx():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx(suppress_warning=True)
+    except Exception:
+        return None
+
+
+def current_group():
+    group = _group.get()
+    if group is not None:
+        return group
+    ctx = _script_ctx()
+    return ctx.session_id if ctx is not None else "default"
+
+
+def cancel_on_change(state, view, group=None) -> int:
+    """Cancel ``group``'s (default: this session's) queued jobs at every
+    priority when ``view`` differs from the one recorded in ``state`` (the
+    session state) on the previous run. Returns the number cancelled."""
+    previous = state.get("_fetch_view", view)
+    state["_fetch_view"] = view
+    if previous == view:
+        return 0
+    return get_scheduler().cancel(current_group() if group is None else group)
+
+
+@contextlib.contextmanager
+def priority(level: int, group=None):
+    """Submit fetches made inside the block at ``level`` (and for ``group``)."""
+    p_token = _priority.set(level)
+    g_token = _group.set(group) if group is not None else None
+    try:
+        yield
+    finally:
+        _priority.reset(p_token)
+        if g_token is not None:
+            _group.reset(g_token)
+
+
+def run_all(fn, jobs):
+    """``[fn(*args) for args in jobs]`` on the scheduler, results in job
+    order. A job's exception is returned in its slot rather than raised."""
+    scheduler = get_scheduler()
+    futures = [scheduler.submit(fn, *args) for args in jobs]
+    index = {f: i for i, f in enumerate(futures)}
+    results = [None] * len(futures)
+    t0 = time.perf_counter()
+    for f in as_completed(futures):
+        try:
+            results[index[f]] = f.result()
+        except CancelledError:
+            raise
+        except Exception as e:
+            results[index[f]] = e
+    logger.debug(f"[SCHED] {len(jobs)} x {getattr(fn, '__name__', fn)} in {time.perf_counter() - t0:.2f}s")
+    return results
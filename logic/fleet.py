@@ -0,0 +1,183 @@
+# logic/fleet.py
+#
+# Fleet comparison: the dashboard pipeline (event_store.load_dashboard) for
+# every rig, one rig per worker process, reduced in the worker to small
+# per-rig and per-valve-class summary tables so only those cross the
+# process boundary. Wall time is about the slowest rig rather than the sum.
+#
+# Each rig has its own long-lived worker process, spawned on first use: it
+# keeps that rig's loader caches between runs, and months in the
+# materialized event store are read from the shared files by every worker
+# instead of recomputed.
+
+import logging
+import multiprocessing
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+import pandas as pd
+
+from logic import event_store
+from logic.data_sources import source_spec, use_source_spec
+from logic.depletion import FLOW_THRESHOLDS, VALVE_CLASS_MAP
+from logic.tag_maps import RIGS, get_rig_tags
+
+logger = logging.getLogger("fleet")
+
+RIG_COLUMNS = [
+    "Rig", "Transitions", "Total Volume (gal)", "Avg Flow (gpm)", "Total Depletion (%)",
+    "Pressure Cycles", "Max Well Pressure (psi)", "Seconds",
+]
+CLASS_COLUMNS = [
+    "Rig", "Valve Class", "Transitions", "Total Volume (gal)", "Avg Δ (gal)",
+    "Avg Flow (gpm)", "Total Depletion (%)", "Pressure Cycles",
+]
+
+_pools = {}
+_pool_specs = {}
+_pool_lock = threading.Lock()
+
+
+def _cycle_counts(cycles, rare_threshold) -> pd.Series:
+    """Pressure cycles at or above ``rare_threshold`` per valve class (the
+    app's Rare filter)."""
+    if cycles is None or cycles.empty:
+        return pd.Series(dtype="int64")
+    cycles = cycles[cycles["Max Well Pressure"] >= rare_threshold]
+    return cycles["Valve"].map(VALVE_CLASS_MAP).value_counts()
+
+
+def summarize_rig(rig, events, cycles, rare_threshold, seconds=None) -> tuple:
+    """(one-row rig summary, per-valve-class summary) of one rig's tables."""
+    counts = _cycle_counts(cycles, rare_threshold)
+    well = cycles["Max Well Pressure"].max() if cycles is not None and len(cycles) else float("nan")
+    rig_row = pd.DataFrame([{
+        "Rig": rig,
+        "Transitions": len(events),
+        "Total Volume (gal)": events["Δ (gal)"].sum() if len(events) else 0.0,
+        "Avg Flow (gpm)": events["Flow Rate (gpm)"].mean() if len(events) else float("nan"),
+        "Total Depletion (%)": events["Depletion (%)"].sum() if len(events) else 0.0,
+        "Pressure Cycles": int(counts.sum()),
+        "Max Well Pressure (psi)": well,
+        "Seconds": seconds,
+    }], columns=RIG_COLUMNS)
+
+    if events.empty:
+        return rig_row, pd.DataFrame(columns=CLASS_COLUMNS)
+    by_class = (
+        events.groupby("Valve Class", observed=True)
+        .agg(**{
+            "Transitions": ("Δ (gal)", "size"),
+            "Total Volume (gal)": ("Δ (gal)", "sum"),
+            "Avg Δ (gal)": ("Δ (gal)", "mean"),
+            "Avg Flow (gpm)": ("Flow Rate (gpm)", "mean"),
+            "Total Depletion (%)": ("Depletion (%)", "sum"),
+        })
+        .reset_index()
+    )
+    by_class["Valve Class"] = by_class["Valve Class"].astype(str)
+    by_class["Pressure Cycles"] = by_class["Valve Class"].map(counts).fillna(0).astype("int64")
+    by_class.insert(0, "Rig", rig)
+    return rig_row, by_class[CLASS_COLUMNS]
+
+
+def rig_tables(rig, start_date, end_date, category_windows, rare_threshold) -> tuple:
+    """Worker job: run the pipeline for one rig and summarize it."""
+    t0 = time.perf_counter()
+    tags = get_rig_tags(rig)
+    events, _, cycles, _ = event_store.load_dashboard(
+        rig, start_date, end_date, dict(category_windows), tags["valve_map"],
+        tags["per_valve_simple_map"], tags["per_valve_function_map"],
+        VALVE_CLASS_MAP, tags["vol_ext"], tags["pressure_map"],
+        tags["active_pod_tag"], FLOW_THRESHOLDS,
+    )
+    return summarize_rig(rig, events, cycles, rare_threshold, round(time.perf_counter() - t0, 2))
+
+
+def _init_worker(spec):
+    logging.basicConfig(level=logging.WARNING)
+    use_source_spec(spec)
+
+
+@contextmanager
+def _without_script_main():
+    # Streamlit runs the page script as __main__, and spawned children
+    # re-import __main__ from its file: they would run the whole app
+    main = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+def get_pool(rig) -> ProcessPoolExecutor:
+    """The rig's worker process, rebuilt when the active data source changes
+    or the process died. One process per rig, so a rig always meets its own
+    warm caches."""
+    spec = source_spec()
+    with _pool_lock:
+        pool = _pools.get(rig)
+        # _broken is set once a worker exits unexpectedly; such a pool
+        # fails every later submit
+        if pool is None or pool._broken or _pool_specs.get(rig) != spec:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            # spawn: forking the app process would copy its fetch threads' locks
+            pool = _pools[rig] = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker, initargs=(spec,),
+            )
+            _pool_specs[rig] = spec
+            # The worker process starts on the first submit
+            with _without_script_main():
+                pool.submit(int)
+        return pool
+
+
+def _drop_pool(rig, pool):
+    with _pool_lock:
+        if _pools.get(rig) is pool:
+            del _pools[rig]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(rig, fn, *args):
+    """Submit ``fn(*args)`` to the rig's worker, replacing a pool that
+    turns out to be broken once."""
+    pool = get_pool(rig)
+    try:
+        return pool.submit(fn, *args)
+    except BrokenProcessPool:
+        logger.warning(f"[FLEET] Worker for {rig} is gone, starting a new one")
+        _drop_pool(rig, pool)
+        return get_pool(rig).submit(fn, *args)
+
+
+def run_fleet(start_date, end_date, category_windows, rare_threshold, rigs=RIGS) -> tuple:
+    """(rig summary, valve-class summary, {rig: error}) for ``rigs``, each
+    in its own worker process."""
+    t0 = time.perf_counter()
+    futures = {
+        _submit(rig, rig_tables, rig, start_date, end_date, dict(category_windows), rare_threshold): rig
+        for rig in rigs
+    }
+    results, errors = {}, {}
+    for fut in as_completed(futures):
+        rig = futures[fut]
+        try:
+            results[rig] = fut.result()
+        except Exception as e:
+            logger.error(f"[FLEET] {rig} failed: {e}")
+            errors[rig] = str(e)
+    ordered = [results[r] for r in rigs if r in results]
+    rig_df = pd.concat([r[0] for r in ordered], ignore_index=True) if ordered else pd.DataFrame(columns=RIG_COLUMNS)
+    classes = [r[1] for r in ordered if len(r[1])]
+    class_df = pd.concat(classes, ignore_index=True) if classes else pd.DataFrame(columns=CLASS_COLUMNS)
+    logger.info(f"[FLEET] {len(ordered)}/{len(rigs)} rigs in {time.perf_counter() - t0:.1f}s")
+    return rig_df, class_df, errors
@@ -0,0 +1,98 @@
+# logic/ingest.py
+
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from pandas.api.types import union_categoricals
+
+# Status codes seen on the valve tags stay below this (VENT=256 ... ERROR=4096)
+STATUS_LUT_SIZE = 4097
+
+POD_CATEGORIES = ["Blue Pod", "Yellow Pod", "Unknown"]
+_POD_LUT = np.array([2, 0, 0, 1, 1], dtype=np.int8)  # ActiveSem 1/2 -> Blue, 3/4 -> Yellow
+
+EVENT_CATEGORY_COLUMNS = [
+    "valve", "prev_state", "state", "function_state", "prev_function_state",
+    "display_state", "Active Pod", "Valve Class",
+]
+# Pressures stay float64: the top-quartile means in logic.pressure are
+# threshold-based, so float32 rounding can flip which samples are included.
+EVENT_FLOAT32_COLUMNS = ["flow_rate_gpm_inst"]
+
+
+@lru_cache(maxsize=32)
+def _status_lut(items: tuple) -> tuple[np.ndarray, list]:
+    categories = sorted({label for _, label in items})
+    pos = {label: i for i, label in enumerate(categories)}
+    lut = np.full(STATUS_LUT_SIZE, -1, dtype=np.int16)
+    for code, label in items:
+        if 0 <= code < STATUS_LUT_SIZE:
+            lut[code] = pos[label]
+    return lut, categories
+
+
+def decode_status(codes, code_map: dict) -> pd.Categorical:
+    """Decode raw status codes through a NumPy lookup table instead of a
+    per-row dict ``map``. Unknown or non-integral codes come back missing."""
+    lut, categories = _status_lut(tuple(sorted(code_map.items())))
+    vals = np.asarray(codes, dtype=float)
+    ok = np.isfinite(vals) & (vals >= 0) & (vals < STATUS_LUT_SIZE)
+    idx = np.where(ok, vals, 0).astype(np.int64)
+    ok &= idx == vals
+    cat_codes = np.where(ok, lut[idx], -1)
+    return pd.Categorical.from_codes(cat_codes, categories=categories)
+
+
+def decode_active_pod(values) -> pd.Categorical:
+    """Map ActiveSem values (1/2 Blue, 3/4 Yellow, anything else Unknown)."""
+    vals = np.asarray(values, dtype=float)
+    ok = np.isfinite(vals) & (vals >= 0) & (vals < _POD_LUT.size)
+    idx = np.where(ok, vals, 0).astype(np.int64)
+    ok &= idx == vals
+    return pd.Categorical.from_codes(np.where(ok, _POD_LUT[idx], 2), categories=POD_CATEGORIES)
+
+
+def compact_status_codes(codes: pd.Series) -> pd.Series:
+    """Status codes as int16 when they are all present and integral."""
+    vals = codes.to_numpy(dtype=float, na_value=np.nan)
+    if vals.size and np.isfinite(vals).all() and (np.mod(vals, 1) == 0).all() \
+            and vals.min() >= np.iinfo(np.int16).min and vals.max() <= np.iinfo(np.int16).max:
+        return pd.Series(vals.astype(np.int16), index=codes.index, name=codes.name)
+    return codes
+
+
+def concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """``pd.concat`` that keeps categorical columns categorical by unioning
+    their categories first (plain concat falls back to object otherwise)."""
+    frames = [f for f in frames if f is not None and len(f.columns)]
+    if not frames:
+        return pd.DataFrame()
+    cat_cols = [
+        c for c in frames[0].columns
+        if all(c in f.columns and isinstance(f[c].dtype, pd.CategoricalDtype) for f in frames)
+    ]
+    if cat_cols and len(frames) > 1:
+        frames = [f.copy() for f in frames]
+        for c in cat_cols:
+            cats = union_categoricals([f[c].array for f in frames]).categories
+            for f in frames:
+                f[c] = f[c].cat.set_categories(cats)
+    return pd.concat(frames)
+
+
+def compact_events(df: pd.DataFrame) -> pd.DataFrame:
+    """Label columns to categoricals, status codes to int16 and the
+    instantaneous flow rate to float32. Gallon columns stay float64: they
+    are differences of a large non-resetting totalizer."""
+    if df.empty:
+        return df
+    df = df.copy()
+    for c in EVENT_CATEGORY_COLUMNS:
+        if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype("category")
+    if "status_code" in df.columns:
+        df["status_code"] = compact_status_codes(df["status_code"])
+    for c in EVENT_FLOAT32_COLUMNS:
+        if c in df.columns:
+            df[c] = df[c].astype(np.float32)
+    return df
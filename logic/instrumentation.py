@@ -0,0 +1,193 @@
+# logic/instrumentation.py
+#
+# Lightweight per-stage timing for the data pipeline. Stages only record
+# while a trace is active in the current context (see ``begin``); otherwise
+# ``stage`` hands back a shared no-op, so instrumented code pays one
+# ContextVar lookup when diagnostics are off.
+
+import contextvars
+import json
+import logging
+import threading
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field, asdict
+
+import config
+
+logger = logging.getLogger("instrumentation")
+
+ENABLED = config.INSTRUMENTATION
+TRACE_MEMORY = config.INSTRUMENTATION_MEMORY
+
+_current = contextvars.ContextVar("instrumentation_trace", default=None)
+
+
+@dataclass
+class StageRecord:
+    stage: str
+    tag: str | None = None
+    seconds: float = 0.0
+    rows_in: int | None = None
+    rows_out: int | None = None
+    bytes: int | None = None
+    peak_bytes: int | None = None
+    thread: str = ""
+    offset_s: float = 0.0  # start, relative to the trace start
+
+
+@dataclass
+class Trace:
+    name: str
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    started: float = field(default_factory=time.perf_counter)
+    seconds: float | None = None
+    records: list = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _local: threading.local = field(default_factory=threading.local, repr=False)
+
+    def stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def add(self, record: StageRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+        logger.info("[STAGE] " + json.dumps({"trace": self.trace_id, **asdict(record)}, default=str))
+
+    def summary(self) -> dict:
+        fetches = [r for r in self.records if r.stage == "fetch"]
+        return {
+            "trace": self.trace_id,
+            "name": self.name,
+            "seconds": self.seconds,
+            "stages": len(self.records),
+            "fetches": len(fetches),
+            "fetch_seconds": round(sum(r.seconds for r in fetches), 4),
+            "fetch_bytes": sum(r.bytes or 0 for r in fetches),
+        }
+
+
+class _Stage:
+    """Context manager returned by ``stage`` while a trace is active. Set
+    ``rows_out`` / ``bytes`` on it inside the block."""
+
+    __slots__ = ("trace", "record", "_t0", "_mem0", "_peak", "_parent")
+
+    def __init__(self, trace, name, tag, rows_in):
+        self.trace = trace
+        self.record = StageRecord(stage=name, tag=tag, rows_in=rows_in, thread=threading.current_thread().name)
+
+    @property
+    def rows_out(self):
+        return self.record.rows_out
+
+    @rows_out.setter
+    def rows_out(self, value):
+        self.record.rows_out = None if value is None else int(value)
+
+    @property
+    def bytes(self):
+        return self.record.bytes
+
+    @bytes.setter
+    def bytes(self, value):
+        self.record.bytes = None if value is None else int(value)
+
+    def __enter__(self):
+        self._mem0 = None
+        if TRACE_MEMORY and tracemalloc.is_tracing():
+            # tracemalloc keeps one process-wide peak: hand the enclosing
+            # stage what it has seen so far, then reset for this one.
+            # Figures are approximate when other threads allocate meanwhile.
+            stack = self.trace.stack()
+            current, peak = tracemalloc.get_traced_memory()
+            self._parent = stack[-1] if stack else None
+            if self._parent is not None:
+                self._parent._peak = max(self._parent._peak, peak)
+            self._mem0 = self._peak = current
+            tracemalloc.reset_peak()
+            stack.append(self)
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        self.record.seconds = round(end - self._t0, 6)
+        self.record.offset_s = round(self._t0 - self.trace.started, 6)
+        if self._mem0 is not None:
+            self.trace.stack().pop()
+            peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            self.record.peak_bytes = max(0, peak - self._mem0)
+            if self._parent is not None:
+                self._parent._peak = max(self._parent._peak, peak)
+        self.trace.add(self.record)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+    rows_out = None
+    bytes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str, tag: str | None = None, rows_in: int | None = None):
+    trace = _current.get()
+    if trace is None:
+        return _NO_STAGE
+    return _Stage(trace, name, tag, rows_in)
+
+
+def active() -> bool:
+    return _current.get() is not None
+
+
+def begin(name: str, force: bool = False):
+    """Start a trace for this context (a script run, a CLI call). Returns
+    None when instrumentation is off and not ``force``d for this run."""
+    if not (ENABLED or force):
+        _current.set(None)
+        return None
+    if TRACE_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    trace = Trace(name)
+    _current.set(trace)
+    return trace
+
+
+def end(trace):
+    if trace is None:
+        return None
+    trace.seconds = round(time.perf_counter() - trace.started, 6)
+    if _current.get() is trace:
+        _current.set(None)
+    logger.info("[TRACE] " + json.dumps(trace.summary(), default=str))
+    return trace
+
+
+def bind(fn):
+    """Run ``fn`` in a copy of the caller's context, so stages recorded from
+    worker threads land in the caller's trace."""
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.run(fn, *args, **kwargs)
+
+
+def frame_bytes(df) -> int:
+    try:
+        return int(df.memory_usage(index=True, deep=False).sum())
+    except Exception:
+        return 0
@@ -0,0 +1,428 @@
+# logic/live_tail.py
+#
+# Live-tail mode. LiveTail holds one rig's raw signals from a start date up
+# to now, polls only datapoints newer than the last one it holds for each
+# tag, and recomputes only what the new points can change:
+#   - the accumulator annotation (gap fill, active pod, flow rate) from the
+#     last sample before the new ones
+#   - events (transitions, ramp, regulator/well pressure, pod) whose windows
+#     were still open at the previous data end
+#   - "Max Well Pressure" of non-OPEN events not yet followed by an OPEN,
+#     whose window runs to the end of the series (pressure.TailWindowStats
+#     keeps these from re-reading the whole window on every poll)
+#   - pressure cycles from each valve's oldest CLOSE without a later OPEN
+# The tail is built with the same functions as load_dashboard_data, so the
+# tables after any number of refreshes equal one full computation over the
+# same range. Nothing held is copied on a poll: pressures are ChunkedSeries
+# that new samples are appended to, and the raw and annotated accumulator
+# frames are lists of chunks (the annotated one is joined for outputs()).
+
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+from logic.chunked_series import ChunkedSeries
+from logic.dashboard_data import annotate_volume, build_events, fill_minute_gaps_with_ffill
+from logic.data_loaders import fetch_frame, valve_status_frame, volume_frame
+from logic.depletion import FLOW_THRESHOLDS, VALVE_CLASS_MAP
+from logic.fetch_scheduler import run_all
+from logic.ingest import EVENT_CATEGORY_COLUMNS, concat_frames
+from logic.preprocessing import compute_transitions, to_ms
+from logic.pressure import TailWindowStats, assign_max_well_pressure
+from logic.pressure_cycles import analyze_pressure_cycles
+from logic.step_signals import StepSignal
+from logic.timeaxis import to_ns
+
+logger = logging.getLogger("live_tail")
+
+# Accumulator chunks kept before the ones after the first are merged
+_MAX_VOL_CHUNKS = 64
+_NS_MIN = np.iinfo(np.int64).min
+_BASE_COLS = ["timestamp", "valve", "state"]
+
+
+def _since(series, t):
+    """Rows of a time-indexed frame/series at or after ``t`` (a view; a
+    ChunkedSeries decodes only the chunks from ``t`` on)."""
+    if isinstance(series, ChunkedSeries):
+        return series.loc[t:]
+    return series.iloc[series.index.searchsorted(t, side="left"):]
+
+
+def _chunks_since(chunks, t):
+    """Rows at or after ``t`` of time-ordered frame chunks, as one frame."""
+    parts = []
+    for chunk in reversed(chunks):
+        parts.append(chunk)
+        if len(chunk) and chunk.index[0] <= t:
+            break
+    return _since(pd.concat(parts[::-1]), t) if parts else pd.DataFrame()
+
+
+def _merge_tail(chunks):
+    # Bounded chunk count without re-copying the (large) first chunk
+    if len(chunks) > _MAX_VOL_CHUNKS:
+        chunks[1:] = [pd.concat(chunks[1:])]
+    return chunks
+
+
+def _open_after_last_open(events, states_of_interest):
+    """Mask of rows in ``states_of_interest`` at or after their valve's last
+    OPEN, i.e. with no later OPEN to end their window or cycle."""
+    t = to_ns(events["timestamp"])
+    valves = events["valve"].to_numpy(dtype=object)
+    states = events["state"].to_numpy(dtype=object)
+    mask = np.zeros(len(events), dtype=bool)
+    for valve in pd.unique(valves):
+        m = valves == valve
+        opens = t[m & (states == "OPEN")]
+        last_open = opens.max() if opens.size else _NS_MIN
+        mask |= m & states_of_interest(states) & (t >= last_open)
+    return mask
+
+
+def _canonical_categories(df):
+    # Categories as a single batch computation leaves them: the values
+    # present, sorted (compact_events builds them with astype("category")).
+    # "Active Pod" keeps decode_active_pod's fixed categories.
+    for c in EVENT_CATEGORY_COLUMNS:
+        if c != "Active Pod" and c in df.columns and isinstance(df[c].dtype, pd.CategoricalDtype) and not df[c].cat.ordered:
+            cats = df[c].cat.remove_unused_categories()
+            df[c] = cats.cat.reorder_categories(sorted(cats.cat.categories))
+    return df
+
+
+class LiveTail:
+    def __init__(self, rig, start_date, category_windows, tags,
+                 valve_class=VALVE_CLASS_MAP, flow_thresholds=FLOW_THRESHOLDS):
+        self.rig = rig
+        self.start_date = start_date
+        self.start_ms = to_ms(start_date)
+        self.category_windows = dict(category_windows)
+        self.valve_class = valve_class
+        self.flow_thresholds = flow_thresholds
+        self.valve_map = tags["valve_map"]
+        self.simple_map = tags["per_valve_simple_map"]
+        self.function_map = tags["per_valve_function_map"]
+        self.vol_ext = tags["vol_ext"]
+        self.pressure_map = tags["pressure_map"]
+        self.active_pod_tag = tags["active_pod_tag"]
+        self.well_ext = self.pressure_map.get("Well Pressure")
+
+        # Raw signals
+        self._vol_chunks = []  # raw accumulator frames, oldest first
+        self.valves = {}  # valve -> status change points
+        self.pressures = {}  # pressure external id -> ChunkedSeries
+        self.pod = StepSignal.empty()
+        self.last_ts = {}  # poll key -> newest timestamp held
+        self._well_stats = TailWindowStats()  # windows running to the newest well sample
+
+        # Derived tables
+        self._annot_chunks = []  # annotated accumulator frames, oldest first
+        self._annot = None  # the chunks joined, until they change
+        self.events = pd.DataFrame()
+        self.cycles = pd.DataFrame()
+        self.last_refresh = None
+
+    # --- polling ---------------------------------------------------------
+    def _poll_keys(self):
+        keys = [("vol", self.vol_ext), ("pod", self.active_pod_tag)]
+        keys += [("valve", name) for name in self.valve_map]
+        keys += [("pressure", ext) for ext in dict.fromkeys(self.pressure_map.values())]
+        return keys
+
+    def _fetch(self, kind, key, start, end):
+        """New rows for one poll key and the newest raw timestamp (valve
+        status keeps change points only, so the two can differ)."""
+        ext = self.valve_map[key] if kind == "valve" else key
+        raw = fetch_frame(ext, start, end)
+        if raw.empty or raw.shape[1] == 0:
+            return None, None
+        if kind == "vol":
+            rows = volume_frame(raw)
+        elif kind == "valve":
+            rows = valve_status_frame(key, raw, self.simple_map[key], self.function_map[key])
+        else:
+            values = raw.iloc[:, 0].astype("float")
+            rows = values.rename("pressure") if kind == "pressure" else values
+        return rows, raw.index[-1]
+
+    def _poll(self, end_ms) -> dict:
+        """Fetch what is newer than the last timestamp held per tag and
+        append it; returns the new rows per poll key."""
+        keys = self._poll_keys()
+        jobs = []
+        for kind, key in keys:
+            last = self.last_ts.get((kind, key))
+            start = to_ms(last) + 1 if last is not None else self.start_ms
+            jobs.append((kind, key, start, end_ms))
+        new = {}
+        for (kind, key), result in zip(keys, run_all(self._fetch, jobs)):
+            if isinstance(result, Exception):
+                # Try again on the next poll; the tag's last timestamp is unchanged
+                logger.warning(f"[LIVE] Poll of {key} failed: {result}")
+                continue
+            rows, last = result
+            if rows is None:
+                continue
+            self.last_ts[(kind, key)] = last
+            held = self.valves.get(key) if kind == "valve" else None
+            if held is not None and len(rows) and len(held) \
+                    and rows["status_code"].iat[0] == held["status_code"].iat[-1]:
+                # Each fetch starts with a change point; drop it when it repeats
+                rows = rows.iloc[1:]
+            if not len(rows):
+                continue
+            new[(kind, key)] = rows
+            self._append(kind, key, rows)
+        return new
+
+    def _append(self, kind, key, rows):
+        if kind == "vol":
+            self._vol_chunks = _merge_tail(self._vol_chunks + [rows])
+        elif kind == "valve":
+            old = self.valves.get(key)
+            self.valves[key] = rows if old is None else concat_frames([old, rows])
+        elif kind == "pressure":
+            old = self.pressures.get(key)
+            codec = config.CHUNKED_SERIES_CODEC or None
+            self.pressures[key] = ChunkedSeries.from_series(rows, codec=codec) if old is None \
+                else old.append(rows, codec=codec)
+            if key == self.well_ext:
+                self._well_stats.extend(rows)
+        else:
+            # Same as dashboard_data.pod_signal over all samples: the held
+            # change points are already filled, so ffill/bfill the joined tail
+            values = pd.Series(np.concatenate([self.pod.values.astype(float), rows.to_numpy(dtype=float)]))
+            self.pod = StepSignal.from_samples(
+                np.concatenate([self.pod.times, to_ns(rows.index)]),
+                values.ffill().bfill().to_numpy(),
+            )
+
+    # --- derived tables --------------------------------------------------
+    def _window(self, valve) -> pd.Timedelta:
+        return pd.Timedelta(seconds=self.category_windows.get(self.valve_class.get(valve, "Pipe Ram"), 60))
+
+    def _data_end(self):
+        # Events are final once their windows end before every continuous
+        # signal's newest sample
+        ends = [self.last_ts.get(("vol", self.vol_ext))]
+        ends += [self.last_ts.get(("pressure", ext)) for ext in self.pressures]
+        ends = [t for t in ends if t is not None]
+        return min(ends) if ends else None
+
+    def pressure_series_by_valve(self, since=None) -> dict:
+        out = {}
+        for name, ext in self.pressure_map.items():
+            if ext in self.pressures:
+                out[name] = self.pressures[ext] if since is None else _since(self.pressures[ext], since)
+        return out
+
+    @property
+    def vol_annot(self):
+        """The annotated accumulator frame (None before any data)."""
+        if self._annot is None and self._annot_chunks:
+            self._annot_chunks = [pd.concat(self._annot_chunks)]
+            self._annot = self._annot_chunks[0]
+        return self._annot
+
+    def _update_volume(self, since):
+        raw_all = self._vol_chunks
+        if self._annot_chunks and since is not None:
+            # Raw samples from the last one before ``since``: it seeds the
+            # forward fill and the first flow-rate difference
+            parts = []
+            for chunk in reversed(raw_all):
+                parts.append(chunk)
+                if len(chunk) and chunk.index[0] < since:
+                    break
+            raw = pd.concat(parts[::-1])
+            pos = raw.index.searchsorted(since, side="left")
+            if pos > 0:
+                annot = annotate_volume(fill_minute_gaps_with_ffill(raw.iloc[pos - 1:]), self.pod)
+                # Drop the held rows from ``since`` on (views), then append
+                chunks = [c for c in self._annot_chunks if len(c) and c.index[0] < since]
+                chunks[-1] = chunks[-1].iloc[:chunks[-1].index.searchsorted(since, side="left")]
+                self._annot_chunks = _merge_tail(chunks + [_since(annot, since)])
+                self._annot = None
+                return
+        self._annot = None
+        raw = pd.concat(raw_all) if raw_all else pd.DataFrame()
+        if raw.empty:
+            self._annot_chunks = []
+            return
+        self._annot_chunks = [annotate_volume(fill_minute_gaps_with_ffill(raw), self.pod)]
+
+    def _transitions_since(self, cutoff):
+        # Each valve's last change point before the cutoff supplies the
+        # "previous" fields of its first transition after it
+        frames = []
+        for f in self.valves.values():
+            pos = f.index.searchsorted(cutoff, side="left")
+            frames.append(f.iloc[max(pos - 1, 0):])
+        valve_df = concat_frames(frames)
+        if valve_df.empty:
+            return pd.DataFrame()
+        trans = compute_transitions(valve_df.sort_index())
+        if trans.empty:
+            return trans
+        return trans[trans["timestamp"] >= cutoff]
+
+    def _used_windows(self, events, since):
+        recent = events[events["timestamp"] >= since]
+        used = []
+        for valve, t in zip(recent["valve"], recent["timestamp"]):
+            w = self._window(valve)
+            used.append((t - 0.8 * w, t + 0.2 * w))
+        return used
+
+    def _cycle_since(self, events, cutoff) -> dict:
+        """Per valve, the earliest CLOSE whose cycle may still change."""
+        pending = _open_after_last_open(events, lambda s: s == "CLOSE")
+        t = to_ns(events["timestamp"])
+        valves = events["valve"].to_numpy(dtype=object)
+        since = {}
+        for valve in self.valve_map:
+            closes = t[pending & (valves == valve)]
+            since[valve] = min(cutoff.value, closes.min()) if closes.size else cutoff.value
+        return since
+
+    def _update_cycles(self, since):
+        well = self.pressures.get(self.well_ext)
+        if well is None or self.events.empty or any(c not in self.events.columns for c in _BASE_COLS):
+            self.cycles = pd.DataFrame()
+            return 0
+        try:
+            if since is None:
+                self.cycles = analyze_pressure_cycles(self.events[_BASE_COLS], self.valve_map, well)
+                return len(self.cycles)
+            fresh = analyze_pressure_cycles(
+                self.events[_BASE_COLS], self.valve_map,
+                _since(well, pd.Timestamp(min(since.values()))), since=since,
+            )
+        except Exception as e:
+            logger.warning(f"[LIVE] Pressure cycles update failed: {e}")
+            return 0
+        old = self.cycles
+        if len(old):
+            limit = old["Valve"].map({v: pd.Timestamp(ns) for v, ns in since.items()})
+            old = old[old["Close Time"] < limit]
+        frames = [f for f in (old, fresh) if len(f)]
+        if not frames:
+            self.cycles = pd.DataFrame()
+            return 0
+        order = {v: i for i, v in enumerate(self.valve_map)}
+        cycles = pd.concat(frames, ignore_index=True)
+        self.cycles = (
+            cycles.assign(_order=cycles["Valve"].map(order))
+            .sort_values(["_order", "Close Time"], kind="stable")
+            .drop(columns="_order")
+            .reset_index(drop=True)
+        )
+        return len(fresh)
+
+    def refresh(self, end_ms=None) -> dict:
+        """Poll up to ``end_ms`` (default now) and update the tables. The
+        first call loads and computes everything from the start date."""
+        t0 = time.perf_counter()
+        end_ms = int(time.time() * 1000) if end_ms is None else end_ms
+        full = not self._annot_chunks
+        old_end = self._data_end()
+        old_vol_last = self.last_ts.get(("vol", self.vol_ext))
+
+        new = self._poll(end_ms)
+        n_new = sum(len(rows) for rows in new.values())
+        stats = {"at": pd.Timestamp.now(), "new_points": n_new, "events_recomputed": 0,
+                 "cycles_recomputed": 0, "full": full}
+        if not n_new and not full:
+            stats["seconds"] = round(time.perf_counter() - t0, 3)
+            self.last_refresh = stats
+            return stats
+
+        wmax = max((self._window(v) for v in self.valve_map), default=pd.Timedelta(seconds=60))
+        if full:
+            cutoff, vol_since = pd.Timestamp.min, None
+        else:
+            cutoff = old_end - 2 * wmax
+            for (kind, _), rows in new.items():
+                if kind == "valve":
+                    cutoff = min(cutoff, rows.index[0])
+            vol_since = None
+            if ("vol", self.vol_ext) in new:
+                vol_since = old_vol_last
+            if ("pod", self.active_pod_tag) in new:
+                first_pod = new[("pod", self.active_pod_tag)].index[0]
+                vol_since = first_pod if vol_since is None else min(vol_since, first_pod)
+            if vol_since is not None:
+                vol_since = vol_since.floor("min")
+                cutoff = min(cutoff, vol_since)
+
+        if full or vol_since is not None:
+            self._update_volume(vol_since)
+        if not self._annot_chunks:
+            stats["seconds"] = round(time.perf_counter() - t0, 3)
+            self.last_refresh = stats
+            return stats
+
+        # Events before the cutoff are final, except the well-pressure window
+        # of non-OPEN events that no OPEN has closed yet
+        events = self.events
+        if full or "timestamp" not in events.columns:
+            retained = events.iloc[:0]
+        else:
+            retained = events.iloc[:events["timestamp"].searchsorted(cutoff, side="left")].copy()
+
+        trans = self._transitions_since(cutoff)
+        tail = pd.DataFrame()
+        if not trans.empty:
+            # Volume rows from a minute before the first window, so the
+            # backward as-of flow rate lookups find the same row
+            vol = self.vol_annot if full else _chunks_since(self._annot_chunks, cutoff - wmax - pd.Timedelta(minutes=1))
+            tail = build_events(
+                trans, vol,
+                self.pressure_series_by_valve(since=None if full else cutoff - wmax),
+                self.pod, self.valve_class, self.category_windows, self.flow_thresholds,
+                used=self._used_windows(retained, cutoff - wmax) if len(retained) else None,
+                # The full load computes windows running to the newest well
+                # sample from _well_stats, which keeps them for the polls
+                well_open_stats=self._well_stats if full else None,
+            )
+        stats["events_recomputed"] = len(tail)
+
+        well = self.pressures.get(self.well_ext)
+        if len(retained) and well is not None:
+            pending = _open_after_last_open(retained, lambda s: s != "OPEN")
+            if pending.any():
+                probe = retained.loc[pending, _BASE_COLS]
+                if "timestamp" in tail.columns:
+                    probe = concat_frames([probe, tail[_BASE_COLS]])
+                start = retained.loc[pending, "timestamp"].min() - wmax
+                values = assign_max_well_pressure(
+                    probe, _since(well, start), self.valve_class, self.category_windows,
+                    open_stats=self._well_stats,
+                )
+                retained.loc[pending, "Max Well Pressure"] = values[:int(pending.sum())]
+
+        frames = [f for f in (retained, tail) if len(f)]
+        self.events = _canonical_categories(concat_frames(frames).reset_index(drop=True)) if frames else pd.DataFrame()
+
+        cycle_since = None if full or not len(retained) else self._cycle_since(retained, cutoff)
+        stats["cycles_recomputed"] = self._update_cycles(cycle_since)
+
+        stats["seconds"] = round(time.perf_counter() - t0, 3)
+        stats["cutoff"] = None if full else cutoff
+        self.last_refresh = stats
+        logger.info(
+            f"[LIVE] {self.rig}: {n_new} new points, {stats['events_recomputed']} events and "
+            f"{stats['cycles_recomputed']} cycles recomputed in {stats['seconds']}s"
+        )
+        return stats
+
+    def outputs(self):
+        """Same tuple as load_dashboard_data: events, annotated accumulator,
+        pressure cycles and the well pressure series."""
+        well = self.pressures.get(self.well_ext)
+        return self.events, self.vol_annot, self.cycles, well
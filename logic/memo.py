@@ -0,0 +1,368 @@
+# logic/memo.py
+#
+# Content-addressed memoization for the pure pipeline functions
+# (compute_transitions, extract_ramp, pressure assignment, cycle analysis,
+# load_and_preprocess). st.cache_data keys on the loader arguments, so a
+# reload with different arguments but identical data (another range over
+# the same months, the same rig after the TTL, an unrelated setting
+# changed) recomputes everything. @memoize keys on a fingerprint of the
+# argument *contents* instead:
+#
+# - frames, series, indexes and arrays are hashed column by column over
+#   their full buffers (shape, dtypes and names included). At ~1.5 GB/s
+#   that is a few ms per frame, and unlike sampled hashes it cannot serve
+#   a stale result for data that differs between samples;
+# - results live in a per-process LRU (MEMO_MEMORY_MB) and, when MEMO_DIR
+#   is set (off by default), as pickles there (MEMO_DISK_MB, least recently
+#   used evicted), so they survive restarts and are shared by the server
+#   processes on one host;
+# - callers get their own copy of a result, so mutating it cannot change
+#   the cached one;
+# - an argument that cannot be fingerprinted (e.g. a TailWindowStats, whose
+#   state the call updates) makes the call run uncached.
+#
+# Disk entries are keyed by the source of the function's module and of
+# every logic module it imports (directly or through other logic modules),
+# so editing any of them retires them. Bump MEMO_VERSION for changes they
+# cannot see (a dependency outside logic/ whose behaviour changed).
+
+import ast
+import functools
+import hashlib
+import importlib.util
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import config
+
+logger = logging.getLogger("memo")
+
+MEMO_VERSION = 1
+
+
+class Unfingerprintable(TypeError):
+    pass
+
+
+def _feed_array(h, arr):
+    arr = np.asarray(arr)
+    h.update(f"{arr.dtype.str}{arr.shape}".encode())
+    if arr.dtype.kind == "O":
+        try:
+            arr = pd.util.hash_array(arr.ravel())
+        except TypeError as e:
+            raise Unfingerprintable(str(e)) from e
+    h.update(np.ascontiguousarray(arr).view(np.uint8))
+
+
+def _values(obj):
+    # Series/Index data without copying: numpy array or extension array
+    return obj.to_numpy() if isinstance(obj.dtype, np.dtype) else obj.array
+
+
+def _feed_values(h, values):
+    if isinstance(values, pd.Categorical):
+        h.update(b"cat" + str(values.ordered).encode())
+        _feed(h, values.categories)
+        _feed_array(h, values.codes)
+    elif isinstance(values, np.ndarray):
+        _feed_array(h, values)
+    elif hasattr(values, "asi8"):  # tz-aware datetimes, periods
+        h.update(str(values.dtype).encode())
+        _feed_array(h, values.asi8)
+    else:  # other extension arrays (nullable, string, tz-aware)
+        h.update(str(values.dtype).encode())
+        _feed_array(h, pd.util.hash_array(np.asarray(values, dtype=object)))
+
+
+def _feed(h, obj):
+    if obj is None or isinstance(obj, (bool, int, float, str, bytes, np.generic,
+                                       pd.Timestamp, pd.Timedelta, datetime, date, timedelta)):
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+    elif isinstance(obj, pd.DataFrame):
+        h.update(f"F{obj.shape}".encode())
+        _feed(h, obj.columns)
+        _feed(h, obj.index)
+        for i in range(obj.shape[1]):
+            _feed_values(h, _values(obj.iloc[:, i]))
+    elif isinstance(obj, pd.Series):
+        h.update(b"S")
+        _feed(h, obj.name)
+        _feed(h, obj.index)
+        _feed_values(h, _values(obj))
+    elif isinstance(obj, pd.Index):
+        h.update(f"I{type(obj).__name__}".encode())
+        _feed(h, obj.names if isinstance(obj, pd.MultiIndex) else obj.name)
+        if isinstance(obj, pd.MultiIndex):
+            _feed(h, list(obj.levels))
+            for codes in obj.codes:
+                _feed_array(h, codes)
+        else:
+            _feed_values(h, _values(obj))
+    elif isinstance(obj, np.ndarray):
+        _feed_array(h, obj)
+    elif hasattr(obj, "memo_key_parts"):
+        h.update(type(obj).__name__.encode())
+        _feed(h, obj.memo_key_parts())
+    elif isinstance(obj, (tuple, list)):
+        h.update(f"{type(obj).__name__}{len(obj)}(".encode())
+        for item in obj:
+            _feed(h, item)
+        h.update(b")")
+    elif isinstance(obj, dict):
+        h.update(f"dict{len(obj)}(".encode())
+        for key in sorted(obj, key=repr):
+            _feed(h, key)
+            _feed(h, obj[key])
+        h.update(b")")
+    elif isinstance(obj, (set, frozenset)):
+        h.update(f"set{len(obj)}(".encode())
+        for part in sorted(fingerprint(item) for item in obj):
+            h.update(part.encode())
+        h.update(b")")
+    else:
+        raise Unfingerprintable(type(obj).__name__)
+
+
+def fingerprint(*objs) -> str:
+    """Content hash of ``objs``; raises Unfingerprintable for types it does
+    not know how to hash by content."""
+    h = hashlib.sha1()
+    for obj in objs:
+        _feed(h, obj)
+    return h.hexdigest()
+
+
+def _copy(result):
+    if isinstance(result, (pd.DataFrame, pd.Series, np.ndarray)):
+        return result.copy()
+    if isinstance(result, tuple):
+        return tuple(_copy(r) for r in result)
+    if result is None or isinstance(result, (bool, int, float, str, np.generic)):
+        return result
+    return pickle.loads(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _nbytes(result) -> int:
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(index=True, deep=False).sum())
+    if isinstance(result, pd.Series):
+        return int(result.memory_usage(index=True, deep=False))
+    if isinstance(result, np.ndarray):
+        return result.nbytes
+    if isinstance(result, tuple):
+        return sum(_nbytes(r) for r in result)
+    return sys.getsizeof(result)
+
+
+class MemoCache:
+    """Memory LRU in front of a directory of pickled results."""
+
+    def __init__(self, root=None, memory_bytes=None, disk_bytes=None):
+        self.root = config.MEMO_DIR if root is None else root
+        self.memory_bytes = config.MEMO_MEMORY_MB * 2**20 if memory_bytes is None else memory_bytes
+        self.disk_bytes = config.MEMO_DISK_MB * 2**20 if disk_bytes is None else disk_bytes
+        self._entries = OrderedDict()  # key -> (result, nbytes)
+        self._held = 0
+        self._lock = threading.Lock()
+        self.stats = defaultdict(lambda: {"hits": 0, "disk_hits": 0, "misses": 0, "uncached": 0})
+
+    def _path(self, key):
+        return os.path.join(self.root, key + ".pkl")
+
+    def get(self, key):
+        """(found, copy of the result, "memory" or "disk")."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return True, _copy(entry[0]), "memory"
+        if not self.root:
+            return False, None, None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+            os.utime(path, None)
+        except FileNotFoundError:
+            return False, None, None
+        except Exception as e:  # truncated or from an incompatible version
+            logger.warning(f"[MEMO] Dropping unreadable {path}: {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return False, None, None
+        self._remember(key, result)
+        return True, _copy(result), "disk"
+
+    def _remember(self, key, result):
+        size = _nbytes(result)
+        if size > self.memory_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._held -= old[1]
+            self._entries[key] = (result, size)
+            self._held += size
+            while self._held > self.memory_bytes:
+                _, (_, dropped) = self._entries.popitem(last=False)
+                self._held -= dropped
+
+    def put(self, key, result):
+        self._remember(key, _copy(result))
+        if not self.root:
+            return
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".memo.", dir=self.root)
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except Exception as e:
+            logger.warning(f"[MEMO] Cannot write {key}: {e}")
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop least recently used result files until MEMO_DISK_MB holds."""
+        try:
+            files = [(e.stat().st_mtime, e.stat().st_size, e.path)
+                     for e in os.scandir(self.root) if e.name.endswith(".pkl")]
+        except FileNotFoundError:
+            return 0
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear_memory(self):
+        with self._lock:
+            self._entries.clear()
+            self._held = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_memo_cache() -> MemoCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MemoCache()
+        return _cache
+
+
+def set_memo_cache(cache: MemoCache) -> MemoCache:
+    """Swap the process cache (tests, tools); returns the previous one."""
+    global _cache
+    with _cache_lock:
+        previous, _cache = _cache, cache
+        return previous
+
+
+PACKAGE = "logic"  # dependencies followed into the version key
+
+
+def _module_source(module):
+    path = getattr(sys.modules.get(module), "__file__", None)
+    if path is None:
+        try:
+            spec = importlib.util.find_spec(module)
+        except (ImportError, ValueError):
+            spec = None
+        path = getattr(spec, "origin", None)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except (OSError, TypeError):
+        return None
+
+
+def _package_imports(source) -> set:
+    """PACKAGE modules a module's source imports, anywhere in the file."""
+    out = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [f"{node.module}.{a.name}" for a in node.names] if node.module == PACKAGE else [node.module]
+        else:
+            continue
+        out.update(n for n in names if n.split(".")[0] == PACKAGE)
+    return out
+
+
+@functools.lru_cache(maxsize=None)
+def module_deps(module) -> tuple:
+    """``module`` and the PACKAGE modules it imports, transitively."""
+    seen, todo = set(), [module]
+    while todo:
+        name = todo.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        source = _module_source(name)
+        if source is not None:
+            todo += _package_imports(source) - seen
+    return tuple(sorted(seen))
+
+
+@functools.lru_cache(maxsize=None)
+def _module_version(module) -> str:
+    h = hashlib.sha1()
+    for name in module_deps(module):
+        h.update(name.encode() + b"\0" + (_module_source(name) or b"") + b"\0")
+    return h.hexdigest()[:12]
+
+
+def memoize(fn):
+    """Cache ``fn``'s results by the content of its arguments (see above)."""
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not config.MEMO:
+            return fn(*args, **kwargs)
+        cache = get_memo_cache()
+        stats = cache.stats[name]
+        try:
+            key = fingerprint(MEMO_VERSION, name, _module_version(fn.__module__), args, kwargs)
+        except Unfingerprintable:
+            stats["uncached"] += 1
+            return fn(*args, **kwargs)
+        found, result, where = cache.get(key)
+        if found:
+            stats["hits" if where == "memory" else "disk_hits"] += 1
+            return result
+        stats["misses"] += 1
+        result = fn(*args, **kwargs)
+        cache.put(key, result)
+        return result
+
+    return wrapper
+
+
+def memo_stats() -> dict:
+    """{function: {hits, disk_hits, misses, uncached}} of this process."""
+    cache = get_memo_cache()
+    return {name: dict(counts) for name, counts in cache.stats.items()}
@@ -4,32 +4,40 @@ import pandas as pd
 import numpy as np
 import logging
 
+from logic.memo import memoize
+
 logger = logging.getLogger("preprocessing")
 
+@memoize
 def compute_transitions(valve_df):
     if valve_df.empty:
         logger.warning("[PREPROCESS] compute_transitions: Empty valve_df")
         return pd.DataFrame()
     valve_df = valve_df.reset_index().rename(columns={"index": "timestamp"})
-    valve_df["prev_state"] = valve_df.groupby("valve")["state"].shift(1)
-    valve_df["prev_function_state"] = valve_df.groupby("valve")["function_state"].shift(1)
-    valve_df["prev_status_code"] = valve_df.groupby("valve")["status_code"].shift(1)
+    by_valve = valve_df.groupby("valve", observed=True)
+    valve_df["prev_state"] = by_valve["state"].shift(1)
+    valve_df["prev_function_state"] = by_valve["function_state"].shift(1)
+    valve_df["prev_status_code"] = by_valve["status_code"].shift(1)
     # Only actual state changes, drop rows with no transition or missing state
     result = valve_df[valve_df["state"] != valve_df["prev_state"]].dropna()
     if result.empty:
         logger.warning("[PREPROCESS] No state transitions detected.")
     return result
 
-def extract_ramp(transitions, vol_df, valve_class, category_windows):
+@memoize
+def extract_ramp(transitions, vol_df, valve_class, category_windows, used=None):
+    # ``used``: (t0, t1) windows of events already extracted before these
+    # transitions (live-tail updates), so overlaps are skipped the same way.
     rows = []
     if transitions.empty or vol_df.empty:
         logger.warning("[PREPROCESS] extract_ramp: Empty transitions or volume data")
         return pd.DataFrame()
-    vol = vol_df.copy()
-    vol.index = pd.to_datetime(vol.index)
-    trans = transitions.copy()
-    trans["timestamp"] = pd.to_datetime(trans["timestamp"])
-    used = []
+    # Both inputs come off the canonical time axis (sorted naive-UTC ns), so
+    # windows are cut by binary search instead of a full-length mask per event.
+    vol = vol_df
+    vol_index = vol.index
+    trans = transitions
+    used = list(used or [])
     skipped = 0
     for _, row in trans.iterrows():
         valve = row["valve"]
@@ -41,7 +49,9 @@ def extract_ramp(transitions, vol_df, valve_class, category_windows):
         if any((t0 <= end and t1 >= start) for start, end in used):
             skipped += 1
             continue
-        segment = vol[(vol.index >= t0) & (vol.index <= t1)].copy()
+        lo = vol_index.searchsorted(t0, side="left")
+        hi = vol_index.searchsorted(t1, side="right")
+        segment = vol.iloc[lo:hi].copy()
         if segment.empty:
             continue
         segment["delta"] = segment["accumulator"].diff()
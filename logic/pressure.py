@@ -4,11 +4,210 @@ import numpy as np
 import pandas as pd
 import logging
 
+from logic.chunked_series import ChunkedSeries, series_arrays
+from logic.memo import memoize
+from logic.timeaxis import to_ns
+
 logger = logging.getLogger("pressure")
 
+def _window_seconds(valves, valve_class: dict, category_windows: dict) -> np.ndarray:
+    per_valve = {
+        v: category_windows.get(valve_class.get(v, "Pipe Ram"), 60)
+        for v in pd.unique(np.asarray(valves, dtype=object))
+    }
+    return np.array([per_valve[v] for v in valves], dtype=float)
+
+def _seconds_to_ns(seconds: np.ndarray) -> np.ndarray:
+    return pd.to_timedelta(seconds, unit="s").asi8
+
+def _top_quartile_mean(arr: np.ndarray) -> float:
+    if len(arr) < 5:
+        return np.mean(arr)
+    thr = np.percentile(arr, 75)
+    top_vals = arr[arr >= thr]
+    return np.mean(top_vals) if top_vals.size else np.max(arr)
+
+def _window_stats(p_ns, p_vals, start_ns, end_ns) -> np.ndarray:
+    """Top-quartile mean of the samples in each inclusive [start, end] window,
+    cut by binary search on the sorted series times."""
+    lo = np.searchsorted(p_ns, start_ns, side="left")
+    hi = np.searchsorted(p_ns, end_ns, side="right")
+    out = np.full(len(start_ns), np.nan)
+    for i in range(len(start_ns)):
+        arr = p_vals[lo[i]:hi[i]]
+        arr = arr[~np.isnan(arr)]
+        if arr.size:
+            out[i] = _top_quartile_mean(arr)
+    return out
+
+def _lerp(a: float, b: float, t: float) -> float:
+    # numpy's percentile interpolation, so thresholds match np.percentile
+    diff = b - a
+    return b - diff * (1 - t) if t >= 0.5 else a + diff * t
+
+def _kth_smallest(arrays, k: int) -> float:
+    """k-th smallest value (0-based) across sorted arrays: pivot on the
+    size-weighted median of the remaining ranges' middles and drop the
+    side that cannot hold it."""
+    lo = np.zeros(len(arrays), dtype=np.int64)
+    hi = np.array([len(a) for a in arrays], dtype=np.int64)
+    while True:
+        live = np.flatnonzero(hi > lo)
+        mids = np.array([arrays[i][(lo[i] + hi[i]) // 2] for i in live])
+        order = np.argsort(mids, kind="stable")
+        weights = np.cumsum((hi - lo)[live][order])
+        pivot = mids[order[np.searchsorted(weights, weights[-1] / 2)]]
+        lt = np.array([np.searchsorted(a, pivot, side="left") for a in arrays]).clip(lo, hi)
+        le = np.array([np.searchsorted(a, pivot, side="right") for a in arrays]).clip(lo, hi)
+        n_lt = int((lt - lo).sum())
+        n_le = int((le - lo).sum())
+        if k < n_lt:
+            hi = lt
+        elif k < n_le:
+            return float(pivot)
+        else:
+            k -= n_le
+            lo = le
+
+class _QuantileBand:
+    """The values of one window ranked around its 75th percentile, with the
+    count below the band and the count and sum above it."""
+
+    __slots__ = ("lo", "hi", "values", "below", "above_n", "above_sum")
+
+    def add(self, vals):
+        self.below += int((vals < self.lo).sum())
+        above = vals[vals > self.hi]
+        self.above_n += len(above)
+        self.above_sum += above.sum()
+        mid = vals[(vals >= self.lo) & (vals <= self.hi)]
+        if len(mid):
+            self.values = np.sort(np.concatenate([self.values, mid]))
+
+    def top_quartile_mean(self):
+        n = self.below + len(self.values) + self.above_n
+        pos = (n - 1) * 0.75
+        j = int(np.floor(pos)) - self.below
+        k = min(j + 1, n - 1 - self.below)
+        if j < 0 or k >= len(self.values):
+            return None
+        thr = _lerp(self.values[j], self.values[k], pos - np.floor(pos))
+        top = self.values[np.searchsorted(self.values, thr, side="left"):]
+        return (top.sum() + self.above_sum) / (len(top) + self.above_n)
+
+class TailWindowStats:
+    """_top_quartile_mean of windows running from a start time to the newest
+    sample of a growing series, without re-reading the window on every poll.
+
+    Samples (NaNs dropped) are held in fixed-size blocks, each with a sorted
+    copy and its suffix sums, so a window's percentile is a selection across
+    the blocks. Each window asked for then keeps a band of values around
+    that percentile; new samples only update the bands, and a band is rebuilt
+    from the blocks once the percentile moves out of it. Values equal the
+    direct computation up to floating-point summation order."""
+
+    def __init__(self, block_size: int = 1 << 16, band: int = 2048):
+        self.block_size = block_size
+        self.band = band
+        self._times = []  # per block: sample times (ns), ascending
+        self._values = []  # per block: values in time order
+        self._sorted = []
+        self._suffix = []  # per block: sums of _sorted[i:]
+        self._last_ns = np.empty(0, dtype=np.int64)
+        self._bands = {}  # window start (ns) -> _QuantileBand
+
+    def __len__(self):
+        return sum(len(t) for t in self._times)
+
+    def extend(self, series: pd.Series):
+        """Append samples newer than those held."""
+        t_ns, vals = series_arrays(series)
+        keep = ~np.isnan(vals)
+        t_ns, vals = t_ns[keep], vals[keep]
+        if self._times and len(t_ns):
+            keep = t_ns > self._times[-1][-1]
+            t_ns, vals = t_ns[keep], vals[keep]
+        for start, band in self._bands.items():
+            band.add(vals[t_ns >= start])
+        while len(t_ns):
+            if self._times and len(self._times[-1]) < self.block_size:
+                room = self.block_size - len(self._times[-1])
+                times = np.concatenate([self._times.pop(), t_ns[:room]])
+                values = np.concatenate([self._values.pop(), vals[:room]])
+                self._sorted.pop()
+                self._suffix.pop()
+            else:
+                room = self.block_size
+                times, values = t_ns[:room], vals[:room]
+            t_ns, vals = t_ns[room:], vals[room:]
+            self._add_block(times, values)
+        self._last_ns = np.array([t[-1] for t in self._times], dtype=np.int64)
+
+    def _add_block(self, times, values):
+        ordered = np.sort(values)
+        self._times.append(times)
+        self._values.append(values)
+        self._sorted.append(ordered)
+        self._suffix.append(np.append(np.cumsum(ordered[::-1])[::-1], 0.0))
+
+    def _window(self, start_ns):
+        """Sorted arrays (and their suffix sums) covering [start, newest]."""
+        first = int(np.searchsorted(self._last_ns, start_ns, side="left"))
+        if first == len(self._times):
+            return [], []
+        cut = int(np.searchsorted(self._times[first], start_ns, side="left"))
+        head = np.sort(self._values[first][cut:])
+        arrays = [head] + self._sorted[first + 1:]
+        suffix = [np.append(np.cumsum(head[::-1])[::-1], 0.0)] + self._suffix[first + 1:]
+        return arrays, suffix
+
+    def _build_band(self, arrays, suffix, n):
+        j = int(np.floor((n - 1) * 0.75))
+        band = _QuantileBand()
+        band.lo = _kth_smallest(arrays, max(j - self.band, 0))
+        band.hi = _kth_smallest(arrays, min(j + 1 + self.band, n - 1))
+        band.below, band.above_n, band.above_sum = 0, 0, 0.0
+        parts = []
+        for arr, sums in zip(arrays, suffix):
+            lo = np.searchsorted(arr, band.lo, side="left")
+            hi = np.searchsorted(arr, band.hi, side="right")
+            parts.append(arr[lo:hi])
+            band.below += int(lo)
+            band.above_n += len(arr) - int(hi)
+            band.above_sum += sums[hi]
+        band.values = np.sort(np.concatenate(parts))
+        return band
+
+    def top_quartile_mean(self, start_ns: int) -> float:
+        band = self._bands.get(start_ns)
+        value = band.top_quartile_mean() if band is not None else None
+        if value is not None:
+            return value
+        arrays, suffix = self._window(start_ns)
+        n = sum(len(a) for a in arrays)
+        if n == 0:
+            return np.nan
+        if n < 5:
+            return np.mean(np.concatenate(arrays))
+        band = self._bands[start_ns] = self._build_band(arrays, suffix, n)
+        return band.top_quartile_mean()
+
+    def top_quartile_means(self, starts_ns) -> np.ndarray:
+        """top_quartile_mean per window start; bands of windows not asked
+        for are dropped (their windows have been closed)."""
+        starts_ns = [int(t) for t in starts_ns]
+        self._bands = {t: b for t, b in self._bands.items() if t in set(starts_ns)}
+        return np.array([self.top_quartile_mean(t) for t in starts_ns], dtype=float)
+
+def _series_end_ns(series) -> int:
+    if isinstance(series, ChunkedSeries):
+        return series.last_ns
+    return to_ns(series.index).max()
+
+@memoize
 def assign_max_pressure_vectorized(
     events_df: pd.DataFrame,
-    pressure_series: pd.Series,
+    pressure_series,
     valve_class: dict,
     category_windows: dict,
     pre_frac: float = 0.8,
@@ -17,68 +216,51 @@ def assign_max_pressure_vectorized(
     if events_df.empty or pressure_series.empty:
         logger.warning("[PRESSURE] assign_max_pressure_vectorized: Empty input.")
         return np.full(len(events_df), np.nan)
-    ts = pd.to_datetime(events_df["timestamp"])
-    pre_offsets = events_df["valve"].map(
-        lambda v: pd.Timedelta(seconds=category_windows.get(valve_class.get(v, "Pipe Ram"), 60) * pre_frac)
-    )
-    post_offsets = events_df["valve"].map(
-        lambda v: pd.Timedelta(seconds=category_windows.get(valve_class.get(v, "Pipe Ram"), 60) * post_frac)
-    )
-    out = np.full(len(events_df), np.nan)
-    for i, (t, pre, post) in enumerate(zip(ts, pre_offsets, post_offsets)):
-        window_slice = pressure_series.loc[t - pre : t + post].dropna()
-        arr = pd.to_numeric(window_slice, errors='coerce').dropna().values
-        if arr.size == 0:
-            continue
-        if len(arr) < 5:
-            out[i] = np.mean(arr)
-        else:
-            thr = np.percentile(arr, 75)
-            top_vals = arr[arr >= thr]
-            out[i] = np.mean(top_vals) if top_vals.size else np.max(arr)
-    return out
+    t_ns = to_ns(events_df["timestamp"])
+    w = _window_seconds(events_df["valve"].to_numpy(), valve_class, category_windows)
+    start_ns = t_ns - _seconds_to_ns(w * pre_frac)
+    end_ns = t_ns + _seconds_to_ns(w * post_frac)
+    # Only the samples (chunks, for a ChunkedSeries) the windows reach
+    p_ns, p_vals = series_arrays(pressure_series, start_ns, end_ns)
+    return _window_stats(p_ns, p_vals, start_ns, end_ns)
 
+@memoize
 def assign_max_well_pressure(
     events_df: pd.DataFrame,
-    well_pressure_series: pd.Series,
+    well_pressure_series,
     valve_class: dict,
     category_windows: dict,
+    open_stats: TailWindowStats = None,
 ) -> np.ndarray:
     if events_df.empty or well_pressure_series.empty:
         logger.warning("[PRESSURE] assign_max_well_pressure: Empty input.")
         return np.full(len(events_df), np.nan)
-    ts = pd.to_datetime(events_df["timestamp"])
-    states = events_df["state"].values
-    valves = events_df["valve"].values
-    n = len(events_df)
-    out = np.full(n, np.nan)
-    for i in range(n):
-        state = states[i]
-        t = ts[i]
-        valve = valves[i]
-        vclass = valve_class.get(valve, "Pipe Ram")
-        w = pd.Timedelta(seconds=category_windows.get(vclass, 60))
-        pre = 0.8 * w
-        if state == "OPEN":
-            post = 2.0 * w
-            start = t - pre
-            end = t + post
-        else:  # "CLOSE"
-            start = t - pre
-            mask = (valves == valve) & (ts > t) & (states == "OPEN")
-            if mask.any():
-                next_open_time = ts[mask].min()
-                end = next_open_time
-            else:
-                end = well_pressure_series.index.max()
-        window_slice = well_pressure_series.loc[start:end].dropna()
-        arr = pd.to_numeric(window_slice, errors='coerce').dropna().values
-        if arr.size == 0:
+    t_ns = to_ns(events_df["timestamp"])
+    states = events_df["state"].to_numpy(dtype=object)
+    valves = events_df["valve"].to_numpy(dtype=object)
+    w_ns = _seconds_to_ns(_window_seconds(valves, valve_class, category_windows))
+
+    # OPEN: [t - 0.8w, t + 2w]. CLOSE: from t - 0.8w up to the same valve's
+    # next OPEN, or the end of the series when it never reopens.
+    start_ns = t_ns - (0.8 * w_ns).astype(np.int64)
+    end_ns = t_ns + (2.0 * w_ns).astype(np.int64)
+    series_end = _series_end_ns(well_pressure_series)
+    open_ended = np.zeros(len(events_df), dtype=bool)
+    for valve in pd.unique(valves):
+        rows = np.flatnonzero((valves == valve) & (states != "OPEN"))
+        if rows.size == 0:
             continue
-        if len(arr) < 5:
-            out[i] = np.mean(arr)
-        else:
-            thr = np.percentile(arr, 75)
-            top_vals = arr[arr >= thr]
-            out[i] = np.mean(top_vals) if top_vals.size else np.max(arr)
+        opens = np.sort(t_ns[(valves == valve) & (states == "OPEN")])
+        nxt = np.searchsorted(opens, t_ns[rows], side="right")
+        end_ns[rows] = np.append(opens, series_end)[nxt]
+        open_ended[rows] = nxt == len(opens)
+    p_ns, p_vals = series_arrays(well_pressure_series, start_ns, end_ns)
+    if open_stats is None:
+        return _window_stats(p_ns, p_vals, start_ns, end_ns)
+    # Windows running to the end of the series come from ``open_stats``,
+    # which holds the same series (live tail)
+    out = np.full(len(events_df), np.nan)
+    closed = ~open_ended
+    out[closed] = _window_stats(p_ns, p_vals, start_ns[closed], end_ns[closed])
+    out[open_ended] = open_stats.top_quartile_means(start_ns[open_ended])
     return out
@@ -4,72 +4,89 @@
 import pandas as pd
 import numpy as np
 
-def analyze_pressure_cycles(df, valve_map, well_pressure_series):
+from logic.chunked_series import series_arrays
+from logic.memo import memoize
+from logic.timeaxis import NS_PER_S, to_ns
+
+@memoize
+def analyze_pressure_cycles(df, valve_map, well_pressure_series, since=None):
     """
     For each valve (top-to-bottom order), analyze CLOSE->OPEN intervals where
     no lower valve is closed at any point during the interval.
     For each valid cycle, report duration and well pressure statistics.
+    ``since`` (valve -> int64 ns) limits each valve to the CLOSE events at or
+    after that time; ``df`` still needs the history before it.
     """
-    # Ensure proper sort order by timestamp
     stack_order = list(valve_map.keys())
-    df = df.copy()
     df = df[df["state"].isin(["OPEN", "CLOSE"])]
-    df = df.sort_values("timestamp")
+    df = df.sort_values("timestamp", kind="stable")
+    t_all = to_ns(df["timestamp"])
+    valves_all = df["valve"].to_numpy(dtype=object)
+    states_all = df["state"].to_numpy(dtype=object)
 
-    results = []
+    # Per-valve sorted (times, states) and CLOSE times on the ns axis
+    per_valve = {}
     for valve in stack_order:
-        sub = df[df["valve"] == valve]
-        sub = sub.sort_values("timestamp")
-        state_seq = sub["state"].values
-        times = pd.to_datetime(sub["timestamp"]).values
+        m = valves_all == valve
+        times, states = t_all[m], states_all[m]
+        per_valve[valve] = (times, states, times[states == "CLOSE"])
+
+    cycles = []
+    for k, valve in enumerate(stack_order):
+        times, state_seq, _ = per_valve[valve]
+        lower_valves = stack_order[k + 1 :]
 
-        # Find all CLOSE transitions
-        close_idxs = np.where(state_seq == "CLOSE")[0]
-        for idx in close_idxs:
+        closes = np.flatnonzero(state_seq == "CLOSE")
+        if since is not None and valve in since:
+            closes = closes[times[closes] >= since[valve]]
+        for idx in closes:
             close_time = times[idx]
             # Find the next OPEN after this CLOSE for this valve
-            open_idxs = np.where((times > close_time) & (state_seq == "OPEN"))[0]
+            open_idxs = np.flatnonzero((times > close_time) & (state_seq == "OPEN"))
             if len(open_idxs) == 0:
                 continue  # No open found; incomplete cycle
             open_time = times[open_idxs[0]]
 
             # Check all lower valves: must be OPEN throughout [close_time, open_time]
-            lower_valves = stack_order[stack_order.index(valve) + 1 :]
             block = False
             for lv in lower_valves:
-                # Find the state of the lower valve at close_time
-                lower_events = df[(df["valve"] == lv) & (pd.to_datetime(df["timestamp"]) <= close_time)]
-                last_state = lower_events.sort_values("timestamp")["state"].values[-1] if not lower_events.empty else "OPEN"
-                if last_state == "CLOSE":
+                lv_times, lv_states, lv_closes = per_valve[lv]
+                pos = np.searchsorted(lv_times, close_time, side="right") - 1
+                if pos >= 0 and lv_states[pos] == "CLOSE":
                     block = True
                     break
                 # If any CLOSE event for the lower valve occurs during the interval, block
-                in_window = df[
-                    (df["valve"] == lv)
-                    & (pd.to_datetime(df["timestamp"]) > close_time)
-                    & (pd.to_datetime(df["timestamp"]) < open_time)
-                    & (df["state"] == "CLOSE")
-                ]
-                if not in_window.empty:
+                if np.searchsorted(lv_closes, close_time, side="right") < np.searchsorted(lv_closes, open_time, side="left"):
                     block = True
                     break
             if block:
                 continue  # Skip this cycle
+            cycles.append((valve, close_time, open_time))
 
-            # Get well pressure during this interval
-            interval_press = well_pressure_series.loc[close_time:open_time]
-            if interval_press.empty:
-                continue
+    # Well pressure during each cycle; a ChunkedSeries decodes only the
+    # chunks the cycles reach
+    closes_ns = np.array([c[1] for c in cycles], dtype=np.int64)
+    opens_ns = np.array([c[2] for c in cycles], dtype=np.int64)
+    p_ns, p_vals = series_arrays(well_pressure_series, closes_ns, opens_ns)
+
+    results = []
+    for valve, close_time, open_time in cycles:
+        lo = np.searchsorted(p_ns, close_time, side="left")
+        hi = np.searchsorted(p_ns, open_time, side="right")
+        if hi <= lo:
+            continue
+        seg = p_vals[lo:hi]
+        seg = seg[~np.isnan(seg)]
 
-            result = {
-                "Valve": valve,
-                "Close Time": pd.to_datetime(close_time),
-                "Open Time": pd.to_datetime(open_time),
-                "Duration (min)": round((pd.to_datetime(open_time) - pd.to_datetime(close_time)).total_seconds() / 60, 2),
-                "Min Well Pressure": round(interval_press.min(), 2),
-                "Max Well Pressure": round(interval_press.max(), 2),
-                "Avg Well Pressure": round(interval_press.mean(), 2),
-            }
-            results.append(result)
+        result = {
+            "Valve": valve,
+            "Close Time": pd.Timestamp(close_time),
+            "Open Time": pd.Timestamp(open_time),
+            "Duration (min)": round((open_time - close_time) / NS_PER_S / 60, 2),
+            "Min Well Pressure": round(seg.min(), 2) if seg.size else np.nan,
+            "Max Well Pressure": round(seg.max(), 2) if seg.size else np.nan,
+            "Avg Well Pressure": round(seg.mean(), 2) if seg.size else np.nan,
+        }
+        results.append(result)
 
     return pd.DataFrame(results)
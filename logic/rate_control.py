@@ -0,0 +1,209 @@
+# logic/rate_control.py
+#
+# Upstream rate control: classify failures, read Retry-After, and size the
+# number of concurrent upstream calls with AIMD (additive increase while calls
+# are fast and clean, multiplicative decrease on throttling or slow
+# responses). ``api_retry`` wraps every upstream call (data_loaders fetches,
+# tag_catalog extent lookups) in both.
+
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from functools import wraps
+
+import config
+
+logger = logging.getLogger("rate_control")
+
+THROTTLE_CODES = {429, 503}
+RETRIABLE_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+# Programming and data errors: retrying cannot help
+_NON_RETRIABLE_TYPES = (ValueError, TypeError, KeyError, AttributeError, NotImplementedError)
+
+
+@dataclass
+class ErrorClass:
+    retriable: bool
+    throttled: bool = False
+    retry_after: float | None = None  # seconds
+
+
+def status_code(exc) -> int | None:
+    for attr in ("code", "status_code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def _parse_retry_after(value) -> float | None:
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after(exc) -> float | None:
+    """Retry-After in seconds from an exception, its headers or its response."""
+    if getattr(exc, "retry_after", None) is not None:
+        return _parse_retry_after(exc.retry_after)
+    for holder in (exc, getattr(exc, "response", None)):
+        headers = getattr(holder, "headers", None) or {}
+        for key in ("Retry-After", "retry-after"):
+            if key in headers:
+                return _parse_retry_after(headers[key])
+    extra = getattr(exc, "extra", None) or {}
+    return _parse_retry_after(extra.get("Retry-After", extra.get("retry_after")))
+
+
+def classify_error(exc) -> ErrorClass:
+    code = status_code(exc)
+    if code is not None:
+        return ErrorClass(
+            retriable=code in RETRIABLE_CODES,
+            throttled=code in THROTTLE_CODES,
+            retry_after=retry_after(exc),
+        )
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return ErrorClass(retriable=True, retry_after=retry_after(exc))
+    if isinstance(exc, _NON_RETRIABLE_TYPES):
+        return ErrorClass(retriable=False)
+    return ErrorClass(retriable=True)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng=random) -> float:
+    """Full-jitter exponential backoff for ``attempt`` (1-based)."""
+    return rng.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class AdaptiveLimiter:
+    """Concurrency limit for upstream calls, adjusted by AIMD.
+
+    ``acquire`` blocks while ``limit`` calls are in flight or while a
+    Retry-After pause is in effect. Every ``limit`` clean, fast completions
+    raise the limit by one; a throttled or slower-than-``latency_target``
+    call halves it, at most once per ``cooldown`` seconds so one burst of
+    429s counts as a single signal.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=16, latency_target=10.0, cooldown=1.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(maximum, initial))
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.throttled = 0
+        self.decreases = 0
+        self._successes = 0
+        self._last_decrease = float("-inf")
+        self._pause_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self._pause_until - time.monotonic()
+                if wait <= 0 and self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, latency: float, error: ErrorClass | None = None):
+        with self._cond:
+            self.in_flight -= 1
+            if error is not None and error.throttled:
+                self.throttled += 1
+                if error.retry_after:
+                    self._pause_until = max(self._pause_until, time.monotonic() + error.retry_after)
+                self._decrease("throttled")
+            elif latency > self.latency_target:
+                self._decrease(f"slow call ({latency:.1f}s)")
+            elif error is None:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+    def _decrease(self, reason):
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._successes = 0
+        new = max(self.minimum, self.limit // 2)
+        if new != self.limit:
+            logger.info(f"[RATE] Concurrency {self.limit} -> {new}: {reason}")
+            self.limit = new
+            self.decreases += 1
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "throttled": self.throttled,
+                "decreases": self.decreases,
+                "paused_s": round(max(0.0, self._pause_until - time.monotonic()), 2),
+            }
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> AdaptiveLimiter:
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveLimiter(
+                initial=config.FETCH_CONCURRENCY_START,
+                maximum=config.FETCH_WORKERS,
+                latency_target=config.FETCH_LATENCY_TARGET_S,
+            )
+        return _limiter
+
+
+# Calls go through the AIMD concurrency limiter; retriable failures back off
+# with full jitter, or for Retry-After when the upstream says so, and
+# non-retriable ones are raised at once.
+def api_retry(max_attempts=3, base_delay=1, max_delay=30, limiter=None):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            lim = limiter or get_limiter()
+            for attempt in range(1, max_attempts + 1):
+                lim.acquire()
+                t0 = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    err = classify_error(e)
+                    lim.release(time.perf_counter() - t0, err)
+                    if not err.retriable:
+                        logger.error(f"[API] {func.__name__} failed with a non-retriable error: {e}")
+                        raise
+                    if attempt == max_attempts:
+                        logger.error(f"[API] {func.__name__} failed after {max_attempts} attempts.")
+                        raise
+                    delay = max(err.retry_after or 0.0, backoff_delay(attempt, base_delay, max_delay))
+                    logger.warning(f"[API] {func.__name__} failed (attempt {attempt}), retrying in {delay:.2f}s: {e}")
+                    time.sleep(delay)
+                else:
+                    lim.release(time.perf_counter() - t0)
+                    return result
+        return wrapper
+    return decorator
@@ -0,0 +1,348 @@
+# logic/rollups.py
+#
+# Multi-resolution rollups. Signals read through rollup_frame (Analog
+# Trends' long ranges, and the accumulator and pressure summaries below
+# that the Long-Range Trends page shows) get per-signal summaries at 1 minute, 1 hour and 1 day
+# (min, max, sum, count, first, last per bucket); from then on every raw
+# frame of theirs that comes through data_loaders._fetch is folded in, and
+# the fetched range is recorded as covered so overlapping fetches are not
+# counted twice. Fetches of other signals are not folded.
+# Long-range charts and summaries read the coarsest level that still gives
+# them enough points instead of holding raw data for the whole range;
+# ensure() fills uncovered spans by fetching them in chunks that are folded
+# and dropped, so a year of 1 Hz data is never held at once.
+#
+# Buckets are on the canonical naive-UTC ns axis (logic/timeaxis.py). The
+# store lives in process memory, bounded to ROLLUP_MAX_MB by dropping the
+# least recently used signals. Coverage ends ROLLUP_SETTLE_S before the time
+# of the fetch, so a range running to now is fetched again from there and
+# samples that arrive later are picked up.
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import config
+from logic.timeaxis import NS_PER_MS, NS_PER_S, ns_to_index, to_ns
+
+logger = logging.getLogger("rollups")
+
+# (name, bucket length in ns), finest first
+LEVELS = [("1min", 60 * NS_PER_S), ("1h", 3600 * NS_PER_S), ("1D", 86400 * NS_PER_S)]
+LEVEL_NS = dict(LEVELS)
+FIELDS = ["min", "max", "sum", "count", "first", "last", "first_ts", "last_ts"]
+FILL_CHUNK_DAYS = 7
+
+
+def _empty():
+    return {f: np.empty(0, dtype=np.int64 if f in ("count", "first_ts", "last_ts") else float) for f in FIELDS}
+
+
+def summarize(ts, vals, bucket_ns) -> tuple:
+    """(bucket starts, summary arrays) of raw samples sorted by time; NaNs
+    are skipped."""
+    ts = np.asarray(ts, dtype=np.int64)
+    vals = np.asarray(vals, dtype=float)
+    nan = np.isnan(vals)
+    if nan.any():
+        ts, vals = ts[~nan], vals[~nan]
+    if len(ts) == 0:
+        return np.empty(0, dtype=np.int64), _empty()
+    # Sorted input: bucket boundaries by search instead of per-sample keys
+    edges = np.arange(ts[0] - ts[0] % bucket_ns, ts[-1] + 1, bucket_ns)
+    bounds = np.searchsorted(ts, edges, side="left")
+    filled = np.diff(np.r_[bounds, len(ts)]) > 0
+    starts = bounds[filled]
+    ends = np.r_[starts[1:], len(ts)] - 1
+    return edges[filled], {
+        "min": np.minimum.reduceat(vals, starts),
+        "max": np.maximum.reduceat(vals, starts),
+        "sum": np.add.reduceat(vals, starts),
+        "count": np.diff(np.r_[starts, len(ts)]),
+        "first": vals[starts],
+        "last": vals[ends],
+        "first_ts": ts[starts],
+        "last_ts": ts[ends],
+    }
+
+
+def _sorted_by(keys, ts) -> bool:
+    dk = np.diff(keys)
+    return bool(np.all((dk > 0) | ((dk == 0) & (np.diff(ts) >= 0))))
+
+
+def _coarsen(buckets, parts, bucket_ns) -> tuple:
+    """Merge summary rows into ``bucket_ns`` buckets; rows of one bucket
+    may come in any time order (fetched raw data is already sorted, which
+    skips the sorts)."""
+    if len(buckets) == 0:
+        return np.empty(0, dtype=np.int64), _empty()
+    keys = buckets - buckets % bucket_ns
+    if not _sorted_by(keys, parts["first_ts"]):
+        order = np.lexsort((parts["first_ts"], keys))
+        keys = keys[order]
+        parts = {f: v[order] for f, v in parts.items()}
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    out = {
+        "min": np.minimum.reduceat(parts["min"], starts),
+        "max": np.maximum.reduceat(parts["max"], starts),
+        "sum": np.add.reduceat(parts["sum"], starts),
+        "count": np.add.reduceat(parts["count"], starts),
+        "first": parts["first"][starts],
+        "first_ts": parts["first_ts"][starts],
+        "last_ts": np.maximum.reduceat(parts["last_ts"], starts),
+    }
+    last = parts["last"]
+    if not _sorted_by(keys, parts["last_ts"]):
+        # Latest row per bucket for "last"
+        group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(keys)]))
+        last = last[np.lexsort((parts["last_ts"], group))]
+    out["last"] = last[ends]
+    return keys[starts], out
+
+
+def _merge(a_keys, a, b_keys, b, bucket_ns) -> tuple:
+    if len(a_keys) == 0:
+        return b_keys, b
+    if len(b_keys) == 0:
+        return a_keys, a
+    if b_keys[0] > a_keys[-1]:
+        return np.concatenate([a_keys, b_keys]), {f: np.concatenate([a[f], b[f]]) for f in FIELDS}
+    # Only buckets from the first new one on can change
+    cut = int(np.searchsorted(a_keys, b_keys[0], side="left"))
+    keys = np.concatenate([a_keys[cut:], b_keys])
+    parts = {f: np.concatenate([a[f][cut:], b[f]]) for f in FIELDS}
+    tail_keys, tail = _coarsen(keys, parts, bucket_ns)
+    return (
+        np.concatenate([a_keys[:cut], tail_keys]),
+        {f: np.concatenate([a[f][:cut], tail[f]]) for f in FIELDS},
+    )
+
+
+def _subtract(lo, hi, spans) -> list:
+    """Parts of [lo, hi) not in the sorted, disjoint ``spans``."""
+    out = []
+    for s, e in spans:
+        if e <= lo:
+            continue
+        if s >= hi:
+            break
+        if s > lo:
+            out.append((lo, s))
+        lo = max(lo, e)
+    if lo < hi:
+        out.append((lo, hi))
+    return out
+
+
+class SignalRollup:
+    def __init__(self):
+        self.covered = []  # sorted, disjoint [lo, hi) ns spans folded in
+        self.levels = {name: (np.empty(0, dtype=np.int64), _empty()) for name, _ in LEVELS}
+        self._lock = threading.Lock()
+
+    def missing(self, lo, hi) -> list:
+        with self._lock:
+            return _subtract(lo, hi, self.covered)
+
+    def add(self, ts, vals, lo, hi):
+        """Fold samples fetched for [lo, hi); the parts of it already
+        covered are skipped."""
+        with self._lock:
+            new_spans = _subtract(lo, hi, self.covered)
+            if not new_spans:
+                return
+            ts = np.asarray(ts, dtype=np.int64)
+            keep = np.zeros(len(ts), dtype=bool)
+            for s, e in new_spans:
+                keep[np.searchsorted(ts, s, side="left"):np.searchsorted(ts, e, side="left")] = True
+            keys, parts = summarize(ts[keep], np.asarray(vals, dtype=float)[keep], LEVELS[0][1])
+            for name, bucket_ns in LEVELS:
+                if bucket_ns != LEVELS[0][1]:
+                    keys, parts = _coarsen(keys, parts, bucket_ns)
+                self.levels[name] = _merge(*self.levels[name], keys, parts, bucket_ns)
+            spans = sorted(self.covered + new_spans)
+            merged = [list(spans[0])]
+            for s, e in spans[1:]:
+                if s <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], e)
+                else:
+                    merged.append([s, e])
+            self.covered = [tuple(s) for s in merged]
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(keys.nbytes + sum(v.nbytes for v in parts.values()) for keys, parts in self.levels.values())
+
+    def frame(self, level, lo=None, hi=None) -> pd.DataFrame:
+        """Buckets of ``level`` starting in [lo, hi): min, max, mean, first,
+        last and count, indexed by bucket start."""
+        with self._lock:
+            keys, parts = self.levels[level]
+        a = 0 if lo is None else int(np.searchsorted(keys, lo - lo % LEVEL_NS[level], side="left"))
+        b = len(keys) if hi is None else int(np.searchsorted(keys, hi, side="left"))
+        count = parts["count"][a:b]
+        return pd.DataFrame({
+            "min": parts["min"][a:b],
+            "max": parts["max"][a:b],
+            "mean": parts["sum"][a:b] / np.maximum(count, 1),
+            "first": parts["first"][a:b],
+            "last": parts["last"][a:b],
+            "count": count,
+        }, index=ns_to_index(keys[a:b]).rename("timestamp"))
+
+
+class RollupStore:
+    def __init__(self, max_bytes=None, settle_s=None):
+        self.max_bytes = config.ROLLUP_MAX_MB * 2**20 if max_bytes is None else max_bytes
+        self.settle_ns = int((config.ROLLUP_SETTLE_S if settle_s is None else settle_s) * NS_PER_S)
+        self._signals = OrderedDict()  # least recently used first
+        self._lock = threading.Lock()
+
+    def signal(self, external_id) -> SignalRollup:
+        """The signal's rollup, created when missing; from then on its
+        fetches are folded in."""
+        with self._lock:
+            roll = self._signals.get(external_id)
+            if roll is None:
+                roll = self._signals[external_id] = SignalRollup()
+            self._signals.move_to_end(external_id)
+            return roll
+
+    def observe(self, external_id, df, start_ms, end_ms, now_ns=None):
+        """Fold a fetched frame for the inclusive [start_ms, end_ms] range,
+        if the signal has a rollup. Coverage stops ``settle_s`` before now:
+        samples past that are left for a later fetch."""
+        with self._lock:
+            roll = self._signals.get(external_id)
+        if roll is None or (df.shape[1] == 0 and len(df)):
+            return
+        now_ns = time.time_ns() if now_ns is None else now_ns
+        lo = int(start_ms) * NS_PER_MS
+        hi = min((int(end_ms) + 1) * NS_PER_MS, now_ns - self.settle_ns)
+        if hi <= lo:
+            return
+        vals = pd.to_numeric(df.iloc[:, 0], errors="coerce").to_numpy(dtype=float) if len(df) else np.empty(0)
+        ts = to_ns(df.index) if len(df) else np.empty(0, dtype=np.int64)
+        roll.add(ts, vals, lo, hi)
+        self._evict(keep=external_id)
+
+    def _evict(self, keep):
+        with self._lock:
+            sizes = {ext: roll.nbytes for ext, roll in self._signals.items()}
+            total = sum(sizes.values())
+            for ext in list(self._signals):
+                if total <= self.max_bytes:
+                    break
+                if ext == keep:
+                    continue
+                del self._signals[ext]
+                total -= sizes[ext]
+                logger.info(f"[ROLLUP] Dropped {ext} ({sizes[ext] / 2**20:.1f} MB) to stay within {self.max_bytes / 2**20:.0f} MB")
+
+    def signals(self) -> list:
+        with self._lock:
+            return list(self._signals)
+
+
+_store = RollupStore()
+
+
+def get_rollups() -> RollupStore:
+    return _store
+
+
+def choose_level(lo, hi, min_points=1000):
+    """Coarsest level with at least ``min_points`` buckets over [lo, hi)
+    (ns); None when even 1-minute buckets are too few (use raw data)."""
+    for name, bucket_ns in reversed(LEVELS):
+        if (hi - lo) / bucket_ns >= min_points:
+            return name
+    return None
+
+
+def _fill_chunk(external_id, start_ms, end_ms):
+    # Imported here: data_loaders folds every fetch into this module
+    from logic.data_loaders import fetch_frame
+    # The raw frame is folded by the fetch and dropped here
+    return len(fetch_frame(external_id, start_ms, end_ms))
+
+
+def ensure(external_id, start_ms, end_ms, chunk_days=FILL_CHUNK_DAYS) -> int:
+    """Fetch (and fold) the parts of [start_ms, end_ms] not yet covered, in
+    chunks; returns the raw rows folded."""
+    from logic.fetch_scheduler import run_all
+
+    lo, hi = int(start_ms) * NS_PER_MS, (int(end_ms) + 1) * NS_PER_MS
+    chunk_ns = chunk_days * 86400 * NS_PER_S
+    jobs = []
+    for s, e in get_rollups().signal(external_id).missing(lo, hi):
+        for c in range(s, e, chunk_ns):
+            jobs.append((external_id, c // NS_PER_MS, min(c + chunk_ns, e) // NS_PER_MS - 1))
+    if not jobs:
+        return 0
+    rows = 0
+    for r in run_all(_fill_chunk, jobs):
+        if isinstance(r, Exception):
+            raise r
+        rows += r
+    logger.info(f"[ROLLUP] {external_id}: {len(jobs)} chunks, {rows:,} raw rows folded")
+    return rows
+
+
+def rollup_frame(external_id, start_ms, end_ms, level) -> pd.DataFrame:
+    """``level`` buckets of one signal over [start_ms, end_ms], filling
+    uncovered spans first."""
+    ensure(external_id, start_ms, end_ms)
+    lo, hi = int(start_ms) * NS_PER_MS, (int(end_ms) + 1) * NS_PER_MS
+    return get_rollups().signal(external_id).frame(level, lo, hi)
+
+
+def accumulator_usage(vol_ext, pod_tag, start_ms, end_ms, freq="1D") -> pd.DataFrame:
+    """Accumulator gallons used per ``freq`` period (rows) and pod
+    (columns), from hourly rollups. Each hour's rise of the totalizer is
+    credited to the pod active at the end of that hour; drops (totalizer
+    resets) count as nothing."""
+    from logic.data_loaders import volume_frame
+    from logic.ingest import POD_CATEGORIES, decode_active_pod
+
+    acc = rollup_frame(vol_ext, start_ms, end_ms, "1h")
+    if acc.empty:
+        return pd.DataFrame(columns=POD_CATEGORIES, dtype=float)
+    first = volume_frame(acc[["first"]])["accumulator"]
+    last = volume_frame(acc[["last"]])["accumulator"]
+    rise = last.diff()
+    rise.iloc[0] = last.iloc[0] - first.iloc[0]
+    pod = rollup_frame(pod_tag, start_ms, end_ms, "1h")["last"]
+    usage = pd.DataFrame({
+        "gallons": rise.clip(lower=0).to_numpy(),
+        "Active Pod": decode_active_pod(pod.reindex(acc.index, method="ffill")),
+    }, index=acc.index)
+    return (
+        usage.groupby([pd.Grouper(freq=freq), "Active Pod"], observed=False)["gallons"]
+        .sum()
+        .unstack("Active Pod")
+    )
+
+
+def pressure_envelope(external_id, start_ms, end_ms, freq="W", level="1D") -> pd.DataFrame:
+    """min, max, mean and sample count of one signal per ``freq`` period,
+    merged from its ``level`` rollups; periods without samples are left
+    out."""
+    df = rollup_frame(external_id, start_ms, end_ms, level)
+    if df.empty:
+        return pd.DataFrame(columns=["min", "max", "mean", "count"], dtype=float)
+    out = (
+        df.assign(total=df["mean"] * df["count"])
+        .groupby(pd.Grouper(freq=freq))
+        .agg(min=("min", "min"), max=("max", "max"), total=("total", "sum"), count=("count", "sum"))
+    )
+    out = out[out["count"] > 0]
+    out.insert(2, "mean", out.pop("total") / out["count"])
+    return out
@@ -0,0 +1,231 @@
+# logic/shared_store.py
+#
+# Cross-process store for loaded rig data. When several Streamlit server
+# processes run behind a load balancer, each would otherwise hold its own
+# st.cache_data copy (and st.cache_data hands every session a fresh copy).
+# Here a dataset is computed once, written as uncompressed Arrow IPC files
+# and memory-mapped read-only by every process and session, so RAM scales
+# with distinct datasets rather than processes x sessions.
+#
+#   {SHARED_STORE_DIR}/{key}/{name}.arrow   one file per table of a dataset
+#
+# - Writers build the dataset in a temp directory and publish it with a
+#   single rename; readers only ever see complete datasets. A per-key flock
+#   makes a second process wait for the first computation instead of
+#   repeating it.
+# - Reads map the files and convert to pandas without copying numeric
+#   columns; the resulting arrays are read-only.
+# - The store is kept under SHARED_STORE_MAX_MB by evicting the least
+#   recently read datasets. Unlinking a mapped file is safe on POSIX: the
+#   kernel keeps its pages alive until the last process using them drops
+#   its mapping, so eviction never pulls data from under a session.
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow as pa
+
+import config
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process compute lock
+    fcntl = None
+
+logger = logging.getLogger("shared_store")
+
+SERIES_NAME = b"shared_store.series"
+LOCAL_ENTRIES = 32
+
+
+def shared_key(*parts) -> str:
+    """Stable key for the arguments that determine a dataset."""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:24]
+
+
+def _to_table(value) -> pa.Table:
+    meta = {}
+    if isinstance(value, pd.Series):
+        meta[SERIES_NAME] = ("" if value.name is None else str(value.name)).encode()
+        value = value.to_frame(name="value")
+    table = pa.Table.from_pandas(value, preserve_index=True)
+    # from_pandas turns NaN into nulls, which to_pandas can only fill by
+    # copying; keep NaN as a value so float columns map without a copy
+    for i, field in enumerate(table.schema):
+        if pa.types.is_floating(field.type) and table.column(i).null_count:
+            source = value.index if field.name not in value.columns else value[field.name]
+            table = table.set_column(i, field, pa.array(source.to_numpy(), type=field.type, from_pandas=False))
+    return table.replace_schema_metadata({**table.schema.metadata, **meta})
+
+
+def _from_table(table: pa.Table):
+    # split_blocks keeps each numeric column on its mapped buffer
+    df = table.to_pandas(split_blocks=True)
+    meta = table.schema.metadata or {}
+    if SERIES_NAME in meta:
+        name = meta[SERIES_NAME].decode() or None
+        return df["value"].rename(name, copy=False)
+    return df
+
+
+def _dir_bytes(path) -> int:
+    return sum(e.stat().st_size for e in os.scandir(path) if e.is_file())
+
+
+class SharedStore:
+    def __init__(self, root=None, max_bytes=None, ttl_s=24 * 3600):
+        self.root = root or config.SHARED_STORE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else config.SHARED_STORE_MAX_MB * 2**20
+        self.ttl_s = ttl_s
+        os.makedirs(self.root, exist_ok=True)
+        self._local = OrderedDict()  # key -> (published mtime, tables); mapped, so cheap to hold
+        self._lock = threading.Lock()
+
+    def path(self, key) -> str:
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        """Tables of a published dataset ({name: frame or series}), or None."""
+        path = self.path(key)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if time.time() - mtime / 1e9 > self.ttl_s:
+            return None
+        with self._lock:
+            hit = self._local.get(key)
+            if hit is not None and hit[0] == mtime:
+                self._local.move_to_end(key)
+                self._touch(path)
+                return hit[1]
+        try:
+            tables = {}
+            for entry in os.scandir(path):
+                if entry.name.endswith(".arrow"):
+                    with pa.memory_map(entry.path, "r") as source:
+                        tables[unquote(entry.name[:-len(".arrow")])] = _from_table(pa.ipc.open_file(source).read_all())
+        except FileNotFoundError:
+            return None  # evicted while reading
+        with self._lock:
+            self._local[key] = (mtime, tables)
+            while len(self._local) > LOCAL_ENTRIES:
+                self._local.popitem(last=False)
+        self._touch(path)
+        return tables
+
+    def _touch(self, path):
+        # Last read time for eviction (the directory's mtime is the publish time)
+        try:
+            os.utime(os.path.join(path, ".read"), None)
+        except FileNotFoundError:
+            pass
+
+    def put(self, key, tables: dict):
+        """Publish ``tables`` ({name: frame or series}; None values are
+        skipped) under ``key`` and return them read back from the store."""
+        tmp = tempfile.mkdtemp(prefix=f".{key}.", dir=self.root)
+        try:
+            os.chmod(tmp, 0o755)  # readable by the other server processes
+            open(os.path.join(tmp, ".read"), "w").close()
+            for name, value in tables.items():
+                if value is None:
+                    continue
+                with pa.OSFile(os.path.join(tmp, quote(name, safe="") + ".arrow"), "wb") as sink:
+                    table = _to_table(value)
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+            target = self.path(key)
+            if os.path.exists(target):
+                shutil.rmtree(target, ignore_errors=True)  # expired
+            try:
+                os.rename(tmp, target)
+            except OSError:
+                pass  # another process published first
+        finally:
+            if os.path.exists(tmp):
+                shutil.rmtree(tmp, ignore_errors=True)
+        self.evict(keep=key)
+        return self.get(key)
+
+    def get_or_compute(self, key, compute):
+        """get(key), or compute() -> tables, published once across processes."""
+        tables = self.get(key)
+        if tables is not None:
+            return tables
+        lock_path = self.path(key) + ".lock"
+        try:
+            with open(lock_path, "w") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                tables = self.get(key)  # published while we waited
+                if tables is None:
+                    t0 = time.perf_counter()
+                    tables = self.put(key, compute())
+                    logger.info(f"[SHARED] {key} published in {time.perf_counter() - t0:.1f}s")
+        finally:
+            # Closing the file released the lock
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+        return tables
+
+    def entries(self) -> list:
+        """(last read, bytes, key) of published datasets, oldest first."""
+        out = []
+        for entry in os.scandir(self.root):
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            try:
+                read = os.path.join(entry.path, ".read")
+                last = os.stat(read).st_mtime if os.path.exists(read) else entry.stat().st_mtime
+                out.append((last, _dir_bytes(entry.path), entry.name))
+            except FileNotFoundError:
+                continue
+        return sorted(out)
+
+    def evict(self, keep=None) -> int:
+        """Drop least recently read datasets (other than ``keep``) until the
+        store fits; returns how many were removed."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                shutil.rmtree(self.path(key))
+            except OSError as e:
+                # Windows refuses to delete mapped files; retried next time
+                logger.debug(f"[SHARED] Cannot evict {key}: {e}")
+                continue
+            total -= size
+            removed += 1
+            logger.info(f"[SHARED] Evicted {key} ({size / 2**20:.1f} MB)")
+        return removed
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_shared_store():
+    """The process's SharedStore, or None when SHARED_STORE_DIR is unset."""
+    global _store
+    if not config.SHARED_STORE_DIR:
+        return None
+    with _store_lock:
+        if _store is None or _store.root != config.SHARED_STORE_DIR:
+            _store = SharedStore()
+        return _store
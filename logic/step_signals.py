@@ -0,0 +1,94 @@
+# logic/step_signals.py
+
+import numpy as np
+import pandas as pd
+
+from logic.timeaxis import to_ns
+
+
+def _change_mask(values: np.ndarray) -> np.ndarray:
+    """True where a sample differs from the one before it (first is always
+    kept). Consecutive NaNs count as unchanged."""
+    if values.size == 0:
+        return np.zeros(0, dtype=bool)
+    prev, cur = values[:-1], values[1:]
+    same = prev == cur
+    if values.dtype.kind == "f":
+        same |= np.isnan(prev) & np.isnan(cur)
+    return np.concatenate(([True], ~same))
+
+
+def change_points(values) -> np.ndarray:
+    """Positions of the samples that start a new value."""
+    return np.flatnonzero(_change_mask(np.asarray(values)))
+
+
+class StepSignal:
+    """A step signal (valve status, active pod) stored as change points only.
+
+    ``times`` are sorted int64 ns and ``values[i]`` holds from ``times[i]``
+    until ``times[i + 1]``. Lookups and transition extraction cost
+    O(log n) / O(n) in the number of changes rather than samples.
+    """
+
+    __slots__ = ("times", "values")
+
+    def __init__(self, times: np.ndarray, values: np.ndarray):
+        self.times = np.asarray(times, dtype=np.int64)
+        self.values = np.asarray(values)
+
+    @classmethod
+    def from_samples(cls, times, values) -> "StepSignal":
+        times = np.asarray(times, dtype=np.int64)
+        values = np.asarray(values)
+        if times.size and np.any(times[1:] < times[:-1]):
+            order = np.argsort(times, kind="stable")
+            times, values = times[order], values[order]
+        keep = _change_mask(values)
+        return cls(times[keep], values[keep])
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> "StepSignal":
+        times = to_ns(series.index)
+        return cls.from_samples(times, series.to_numpy())
+
+    @classmethod
+    def empty(cls) -> "StepSignal":
+        return cls(np.empty(0, dtype=np.int64), np.empty(0, dtype=float))
+
+    def __len__(self) -> int:
+        return int(self.times.size)
+
+    def asof(self, at, backfill: bool = False) -> np.ndarray:
+        """Value in force at each time in ``at`` (int64 ns). Times before the
+        first change get NaN, or the first value with ``backfill=True``."""
+        at = np.asarray(at, dtype=np.int64)
+        pos = np.searchsorted(self.times, at, side="right") - 1
+        if self.times.size == 0:
+            return np.full(at.size, np.nan)
+        out = self.values[np.clip(pos, 0, None)].astype(float, copy=True) \
+            if self.values.dtype.kind in "fiu" else self.values[np.clip(pos, 0, None)].copy()
+        if not backfill:
+            if out.dtype.kind == "f":
+                out[pos < 0] = np.nan
+            else:
+                out = out.astype(object)
+                out[pos < 0] = None
+        return out
+
+    def transitions(self) -> np.ndarray:
+        """Positions of real changes: every change point after the first
+        where neither side is missing."""
+        idx = np.arange(1, self.times.size)
+        if self.values.dtype.kind == "f":
+            idx = idx[~np.isnan(self.values[idx]) & ~np.isnan(self.values[idx - 1])]
+        return idx
+
+    def slice(self, start_ns: int, end_ns: int) -> "StepSignal":
+        """Change points with ``start_ns <= t < end_ns``."""
+        a = np.searchsorted(self.times, start_ns, side="left")
+        b = np.searchsorted(self.times, end_ns, side="left")
+        return StepSignal(self.times[a:b], self.values[a:b])
+
+    def to_series(self, name=None) -> pd.Series:
+        return pd.Series(self.values, index=pd.to_datetime(self.times), name=name)
@@ -0,0 +1,129 @@
+# logic/streaming_stats.py
+
+import numpy as np
+
+DEFAULT_CHUNK_ROWS = 262_144
+
+
+class QuantileSketch:
+    """Small mergeable quantile summary: weighted points compacted back to
+    ``size`` equal-weight buckets whenever the buffer grows past ``2 * size``."""
+
+    def __init__(self, size: int = 256):
+        self.size = size
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+
+    def update(self, values: np.ndarray, weights: np.ndarray | None = None) -> None:
+        if values.size == 0:
+            return
+        if weights is None:
+            weights = np.ones(values.size)
+        self.values = np.concatenate((self.values, values))
+        self.weights = np.concatenate((self.weights, weights))
+        if self.values.size > 2 * self.size:
+            self._compact()
+
+    def _compact(self) -> None:
+        order = np.argsort(self.values, kind="stable")
+        v, w = self.values[order], self.weights[order]
+        cum = np.cumsum(w)
+        total = cum[-1]
+        bucket = np.minimum((cum - 0.5 * w) / total * self.size, self.size - 1).astype(np.int64)
+        bw = np.bincount(bucket, weights=w, minlength=self.size)
+        bv = np.bincount(bucket, weights=v * w, minlength=self.size)
+        keep = bw > 0
+        self.values = bv[keep] / bw[keep]
+        self.weights = bw[keep]
+
+    def quantile(self, q: float) -> float:
+        if self.values.size == 0:
+            return np.nan
+        order = np.argsort(self.values, kind="stable")
+        v, w = self.values[order], self.weights[order]
+        cum = np.cumsum(w) - 0.5 * w
+        return float(np.interp(q * w.sum(), cum, v))
+
+
+class StreamingStats:
+    """One-pass count/mean/std/min/max plus an approximate median.
+
+    Chunks are folded in with Chan's parallel form of Welford's update. With
+    ``time_weighted=True`` every sample is weighted by how long it holds
+    (time to the next sample), so sparse and dense stretches count by
+    duration rather than by sample count; ``times`` must then be int64 ns.
+    """
+
+    def __init__(self, time_weighted: bool = False, sketch_size: int = 256):
+        self.time_weighted = time_weighted
+        self.count = 0
+        self.weight = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = QuantileSketch(sketch_size)
+        self._pending = None  # (time, value) still waiting for its hold duration
+
+    def _fold(self, values: np.ndarray, weights: np.ndarray) -> None:
+        w = weights.sum()
+        if w <= 0:
+            return
+        mean = float(np.dot(values, weights) / w)
+        m2 = float(np.dot(weights, (values - mean) ** 2))
+        total = self.weight + w
+        delta = mean - self.mean
+        self.mean += delta * w / total
+        self.m2 += m2 + delta * delta * self.weight * w / total
+        self.weight = total
+        self.sketch.update(values, weights)
+
+    def update(self, values: np.ndarray, times: np.ndarray | None = None) -> None:
+        values = np.asarray(values, dtype=float)
+        keep = ~np.isnan(values)
+        values = values[keep]
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if not self.time_weighted:
+            self._fold(values, np.ones(values.size))
+            return
+
+        times = np.asarray(times, dtype=np.int64)[keep]
+        if self._pending is not None:
+            times = np.concatenate(([self._pending[0]], times))
+            values = np.concatenate(([self._pending[1]], values))
+        self._pending = (times[-1], values[-1])
+        durations = np.diff(times).astype(float) / 1e9
+        self._fold(values[:-1], durations)
+
+    def result(self) -> dict:
+        if self.count == 0:
+            return {"Mean": np.nan, "Median": np.nan, "Max": np.nan, "Min": np.nan, "Std": np.nan, "Count": 0}
+        if self.time_weighted:
+            if self.weight > 0:
+                mean, std = self.mean, float(np.sqrt(self.m2 / self.weight))
+            else:
+                # a single held sample has no duration yet
+                mean, std = float(self._pending[1]), 0.0
+        else:
+            mean = self.mean
+            std = float(np.sqrt(self.m2 / (self.weight - 1))) if self.weight > 1 else np.nan
+        return {
+            "Mean": float(mean),
+            "Median": self.sketch.quantile(0.5) if self.weight > 0 else mean,
+            "Max": self.max,
+            "Min": self.min,
+            "Std": std,
+            "Count": self.count,
+        }
+
+
+def channel_stats(ts: np.ndarray, values: np.ndarray, time_weighted: bool = False, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> dict:
+    """Summary statistics of one channel's raw samples, streamed in chunks."""
+    acc = StreamingStats(time_weighted=time_weighted)
+    for i in range(0, len(values), chunk_rows):
+        acc.update(values[i:i + chunk_rows], ts[i:i + chunk_rows] if time_weighted else None)
+    return acc.result()
@@ -0,0 +1,285 @@
+# logic/synthetic.py
+#
+# Deterministic synthetic BOP rig for benchmarks, profiling and offline runs.
+# ``SyntheticRig.fetch`` answers with the same frame shape as
+# data_loaders.fetch_timeseries_df, for every tag that get_rig_tags knows.
+
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from logic.depletion import DEFAULT_CATEGORY_WINDOWS, VALVE_CLASS_MAP, FLOW_THRESHOLDS
+from logic.eds import EDS_CHANNELS, POD_CHANNEL_MAP, eds_progress_tag
+from logic.tag_maps import get_rig_tags
+from logic.timeaxis import NS_PER_MS, NS_PER_S
+
+NS_PER_DAY = 86_400 * NS_PER_S
+NOISE_CHUNK = 86_400  # analog samples per seeded noise block
+RECOVER_NS = 60 * NS_PER_S
+
+OPEN_CODES, OPEN_P = [513, 515, 1025, 1027], [0.7, 0.1, 0.15, 0.05]
+CLOSE_CODES, CLOSE_P = [514, 516, 1026, 1028], [0.7, 0.1, 0.15, 0.05]
+VENT, ERROR = 256, 4096
+EDS_SHEAR_VALVES = ["Upper Blind Shear", "Casing Shear Ram"]
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    rig: str = "TransoceanDPS"
+    start: str = "2024-01-01"
+    days: float = 7.0
+    sample_hz: float = 0.1            # accumulator / pressures, at most 1 Hz
+    status_heartbeat_s: float = 60.0   # repeated status samples between changes
+    ops_per_valve_day: float = 4.0
+    pod_switches_per_day: float = 0.5
+    eds_per_day: float = 0.1
+    pressure_test_frac: float = 0.15  # ram closes that see elevated well pressure
+    seed: int = 0
+
+
+def _crc(text: str) -> int:
+    return zlib.crc32(text.encode())
+
+
+def _to_ms(ns: np.ndarray) -> np.ndarray:
+    # Cognite timestamps have millisecond resolution
+    return (ns // NS_PER_MS) * NS_PER_MS
+
+
+class SyntheticRig:
+    """Ground-truth events are drawn once per rig; samples for any fetch
+    window are derived from them, so overlapping fetches agree exactly."""
+
+    def __init__(self, config: SyntheticConfig = SyntheticConfig()):
+        if not 0 < config.sample_hz <= 1:
+            raise ValueError("sample_hz must be in (0, 1]")
+        self.config = config
+        self.tags = get_rig_tags(config.rig)
+        self.t0 = pd.Timestamp(config.start).value
+        self.t1 = self.t0 + int(config.days * NS_PER_DAY)
+        self.step_ns = int(NS_PER_S / config.sample_hz)
+        rng = np.random.default_rng(config.seed)
+
+        self.pod_times, self.pod_values = self._draw_pod(rng)
+        self.eds_times, self.eds_channels = self._draw_eds(rng)
+        self.valve_changes = self._draw_valves(rng)
+        self.consumption = self._draw_consumption(rng)
+        self.pressure_tests = self._draw_pressure_tests(rng)
+
+        self._kinds = {self.tags["vol_ext"]: ("acc", None), self.tags["active_pod_tag"]: ("pod", None)}
+        for name, ext in self.tags["valve_map"].items():
+            self._kinds[ext] = ("valve", name)
+        for ch in EDS_CHANNELS:
+            self._kinds[eds_progress_tag(config.rig, self.tags["eds_base_tag"], ch)] = ("eds", ch)
+        well_ext = self.tags["pressure_map"]["Well Pressure"]
+        for name, ext in self.tags["pressure_map"].items():
+            if ext != well_ext:
+                self._kinds.setdefault(ext, ("regulator", set()))[1].add(name)
+        self._kinds[well_ext] = ("well", None)
+
+    @property
+    def start_date(self):
+        return pd.Timestamp(self.t0).date()
+
+    @property
+    def end_date(self):
+        return pd.Timestamp(self.t1 - 1).date()
+
+    def external_ids(self) -> list:
+        return list(self._kinds)
+
+    # --- ground truth ---------------------------------------------------
+    def _poisson_times(self, rng, per_day):
+        n = rng.poisson(per_day * (self.t1 - self.t0) / NS_PER_DAY)
+        return np.sort(_to_ms(rng.integers(self.t0, self.t1, size=n)))
+
+    def _draw_pod(self, rng):
+        times = np.concatenate(([self.t0], self._poisson_times(rng, self.config.pod_switches_per_day)))
+        values = [int(rng.integers(1, 5))]
+        for _ in times[1:]:
+            values.append(int(rng.choice([v for v in (1, 2, 3, 4) if v != values[-1]])))
+        return times, np.array(values, dtype=float)
+
+    def _draw_eds(self, rng):
+        times = self._poisson_times(rng, self.config.eds_per_day)
+        pos = np.searchsorted(self.pod_times, times, side="right") - 1
+        return times, [POD_CHANNEL_MAP[int(v)] for v in self.pod_values[pos]]
+
+    def _draw_valves(self, rng):
+        out = {}
+        forced = np.sort(self.eds_times + rng.integers(20, 60, size=self.eds_times.size) * NS_PER_S)
+        for name in self.tags["valve_map"]:
+            sub = np.random.default_rng([self.config.seed, _crc(name)])
+            times = self._poisson_times(sub, self.config.ops_per_valve_day)
+            close_at = set(forced.tolist()) if name in EDS_SHEAR_VALVES else set()
+            times = np.unique(np.concatenate((times, list(close_at)))).astype(np.int64)
+            ts, codes, is_open = [self.t0], [int(sub.choice(OPEN_CODES, p=OPEN_P))], True
+            for t in times:
+                if t in close_at:
+                    if not is_open:
+                        continue
+                    is_open = False
+                else:
+                    is_open = not is_open
+                if sub.random() < 0.02:
+                    # brief vent / error glitch ahead of the real change
+                    ts.append(int(t) - 5 * NS_PER_S)
+                    codes.append(VENT if sub.random() < 0.7 else ERROR)
+                ts.append(int(t))
+                codes.append(int(sub.choice(OPEN_CODES, p=OPEN_P) if is_open else sub.choice(CLOSE_CODES, p=CLOSE_P)))
+            ts = np.array(ts, dtype=np.int64)
+            order = np.argsort(ts, kind="stable")
+            out[name] = (ts[order], np.array(codes, dtype=float)[order])
+        return out
+
+    def _draw_consumption(self, rng):
+        """(start_ns, end_ns, gallons, valve) for every real status change,
+        ramping over the tail of the window extract_ramp will measure."""
+        rows = []
+        for name, (ts, codes) in self.valve_changes.items():
+            vclass = VALVE_CLASS_MAP.get(name, "Pipe Ram")
+            low, high = FLOW_THRESHOLDS.get(vclass, (5, 10))
+            w_ns = DEFAULT_CATEGORY_WINDOWS.get(vclass, 60) * NS_PER_S
+            real = np.flatnonzero(np.isin(codes, OPEN_CODES + CLOSE_CODES))[1:]
+            gallons = rng.lognormal(np.log((low + high) / 2), 0.5, size=real.size)
+            for i, g in zip(real, gallons):
+                rows.append((ts[i] - int(0.6 * w_ns), ts[i], g, name))
+        rows.sort()
+        return rows
+
+    def _draw_pressure_tests(self, rng):
+        """(start_ns, end_ns, psi) spans of elevated well pressure while a ram
+        or annular is closed."""
+        out = []
+        for name, (ts, codes) in self.valve_changes.items():
+            if "Connector" in name:
+                continue
+            closes = np.flatnonzero(np.isin(codes, CLOSE_CODES))
+            for i in closes:
+                nxt = np.flatnonzero(np.isin(codes[i + 1:], OPEN_CODES))
+                if nxt.size == 0 or rng.random() >= self.config.pressure_test_frac:
+                    continue
+                a, b = ts[i] + 30 * NS_PER_S, ts[i + 1 + nxt[0]] - 30 * NS_PER_S
+                if b > a:
+                    out.append((a, b, float(rng.uniform(2_000, 9_000))))
+        out.sort()
+        return out
+
+    # --- sampling -------------------------------------------------------
+    def _grid(self, ext, start_ns, end_ns, step_ns):
+        phase = _crc(ext) % step_ns
+        first = max(0, -(-(start_ns - self.t0 - phase) // step_ns))
+        last = (min(end_ns, self.t1) - self.t0 - phase) // step_ns
+        idx = np.arange(first, last + 1, dtype=np.int64)
+        return idx, _to_ms(self.t0 + phase + idx * step_ns)
+
+    def _noise(self, ext, idx):
+        out = np.empty(idx.size)
+        chunks = idx // NOISE_CHUNK
+        for c in np.unique(chunks):
+            m = chunks == c
+            block = np.random.default_rng([self.config.seed, _crc(ext), int(c)]).standard_normal(NOISE_CHUNK)
+            out[m] = block[idx[m] % NOISE_CHUNK]
+        return out
+
+    def _step_samples(self, ext, change_ts, change_vals, start_ns, end_ns):
+        """Change points plus heartbeat repeats, as a historian stores them."""
+        _, beats = self._grid(ext, start_ns, end_ns, int(self.config.status_heartbeat_s * NS_PER_S))
+        inside = change_ts[(change_ts >= start_ns) & (change_ts <= end_ns)]
+        times = np.union1d(inside, beats)
+        pos = np.searchsorted(change_ts, times, side="right") - 1
+        keep = pos >= 0
+        return times[keep], change_vals[pos[keep]]
+
+    def _ramp_sum(self, times, spans):
+        """Sum over (a, b, amount, valve) spans of ``amount`` times the elapsed
+        fraction of [a, b] at each time. Each span only touches its own slice."""
+        total = np.zeros(times.size)
+        steps = np.zeros(times.size + 1)
+        for a, b, amount, _ in spans:
+            lo = np.searchsorted(times, a, side="right")
+            hi = np.searchsorted(times, b, side="left")
+            total[lo:hi] += amount * (times[lo:hi] - a) / max(b - a, 1)
+            steps[hi] += amount
+        return total + np.cumsum(steps)[:-1]
+
+    def _accumulator(self, ext, start_ns, end_ns):
+        idx, times = self._grid(ext, start_ns, end_ns, self.step_ns)
+        if times.size == 0:
+            return times, np.empty(0)
+        done = [g for a, b, g, _ in self.consumption if b < times[0]]
+        active = [r for r in self.consumption if r[1] >= times[0] and r[0] <= times[-1]]
+        drift = (times - self.t0) / NS_PER_DAY * 25.0  # slow top-up / leakage
+        gallons = 100_000.0 + sum(done) + drift + self._ramp_sum(times, active)
+        return times, np.round(gallons * 10)  # raw counts; accumulator = raw / 10
+
+    def _pressure(self, ext, start_ns, end_ns, base, sigma, spans):
+        idx, times = self._grid(ext, start_ns, end_ns, self.step_ns)
+        values = base + sigma * self._noise(ext, idx)
+        if times.size and spans:
+            lift = np.zeros(times.size)  # overlapping spans do not stack
+            for a, b, psi in spans:
+                lo, hi = np.searchsorted(times, [a, b])
+                np.maximum(lift[lo:hi], psi, out=lift[lo:hi])
+            values += lift
+        return times, values
+
+    def _regulator(self, ext, start_ns, end_ns, valves):
+        """Supply pressure dips while one of its valves strokes and recovers
+        over the following minute."""
+        times, values = self._pressure(ext, start_ns, end_ns, 1_500.0, 15.0, [])
+        if times.size:
+            near = [r for r in self.consumption
+                    if r[3] in valves and r[1] + RECOVER_NS >= times[0] and r[0] <= times[-1]]
+            # one pass so finished dip/recovery pairs cancel exactly
+            spans = [(a, b, 200.0, n) for a, b, _, n in near] + [(b, b + RECOVER_NS, -200.0, n) for _, b, _, n in near]
+            values -= self._ramp_sum(times, spans)
+        return times, values
+
+    def _samples(self, ext, start_ns, end_ns):
+        kind, arg = self._kinds.get(ext, ("analog", None))
+        if kind == "valve":
+            ts, codes = self.valve_changes[arg]
+            return self._step_samples(ext, ts, codes, start_ns, end_ns)
+        if kind == "pod":
+            return self._step_samples(ext, self.pod_times, self.pod_values, start_ns, end_ns)
+        if kind == "eds":
+            starts = self.eds_times[np.array([ch == arg for ch in self.eds_channels], dtype=bool)]
+            steps = np.arange(11, dtype=np.int64) * 5 * NS_PER_S
+            ts = np.concatenate(([self.t0], (starts[:, None] + steps).ravel()))
+            vals = np.concatenate(([0.0], np.tile(np.append(np.arange(1.0, 11.0), 0.0), starts.size)))
+            return self._step_samples(ext, ts, vals, start_ns, end_ns)
+        if kind == "acc":
+            return self._accumulator(ext, start_ns, end_ns)
+        if kind == "well":
+            return self._pressure(ext, start_ns, end_ns, 150.0, 5.0, self.pressure_tests)
+        if kind == "regulator":
+            return self._regulator(ext, start_ns, end_ns, arg)
+        base = 100.0 + _crc(ext) % 3_000
+        return self._pressure(ext, start_ns, end_ns, base, base * 0.01, [])
+
+    def extent(self, external_id) -> tuple:
+        """(first ms, last ms, sample spacing s) bounding ``fetch``."""
+        kind, arg = self._kinds.get(external_id, ("analog", None))
+        last_ns = self.t1
+        # Change points drawn near the end can fall past it
+        if kind == "valve":
+            changes = self.valve_changes[arg][0]
+        elif kind == "pod":
+            changes = self.pod_times
+        elif kind == "eds":
+            changes = self.eds_times[np.array([ch == arg for ch in self.eds_channels], dtype=bool)] + 50 * NS_PER_S
+        else:
+            changes = np.empty(0, dtype=np.int64)
+        if changes.size:
+            last_ns = max(last_ns, int(changes.max()))
+        step_s = self.config.status_heartbeat_s if kind in ("valve", "pod", "eds") else self.step_ns / NS_PER_S
+        return self.t0 // NS_PER_MS, -(-last_ns // NS_PER_MS), step_s
+
+    def fetch(self, external_id, start, end) -> pd.DataFrame:
+        """Drop-in for fetch_timeseries_df: ``start``/``end`` in epoch ms,
+        both inclusive; one column named after the external id."""
+        times, values = self._samples(external_id, int(start) * NS_PER_MS, int(end) * NS_PER_MS)
+        return pd.DataFrame({external_id: values}, index=pd.DatetimeIndex(times.astype("datetime64[ns]")))
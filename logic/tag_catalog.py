@@ -0,0 +1,143 @@
+# logic/tag_catalog.py
+#
+# Per-tag data extents (existence, first/last datapoint, sample spacing) of
+# the active data source, so loaders stop paying a full retrieval and a
+# "No data" warning to learn that a tag is dead or a range predates it:
+#
+# - data_loaders._fetch asks ``plan`` first: requests that cannot hold data
+#   are skipped and the rest are clipped to the tag's extent. A tag not
+#   looked up yet is fetched as requested;
+# - lookups run in the background on the fetch scheduler at PREFETCH
+#   priority, for every tag a fetch touches and for whole tag sets handed
+#   to ``refresh`` (a rig's tags, the analog channels), and again once
+#   older than TAG_CATALOG_TTL_S;
+# - Analog Trends hides the channels the catalog knows have no data.
+#
+# A lookup is several upstream calls (CogniteSource.extent); it runs under
+# api_retry like any fetch, so it holds a slot of the adaptive limiter and
+# throttling is counted and backed off.
+#
+# Extents describe the source as of their lookup time. Nothing is clipped
+# past that time, so live polls for new datapoints always reach the source.
+
+import logging
+import threading
+import time
+
+import config
+from logic.data_sources import get_data_source
+from logic.fetch_scheduler import PREFETCH, get_scheduler
+from logic.rate_control import api_retry
+
+logger = logging.getLogger("tag_catalog")
+
+GROUP = "tag_catalog"
+
+
+class TagCatalog:
+    def __init__(self, source, ttl_s=None):
+        self.source = source
+        self.ttl_s = config.TAG_CATALOG_TTL_S if ttl_s is None else ttl_s
+        self._extents = {}  # external_id -> (looked up at, TagExtent or None)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.skipped = 0
+        self.clipped = 0
+
+    def _stale(self, external_id) -> bool:
+        entry = self._extents.get(external_id)
+        return entry is None or time.time() - entry[0] > self.ttl_s
+
+    @api_retry()
+    def _read_extent(self, external_id):
+        return self.source.extent(external_id)
+
+    def lookup(self, external_id):
+        """Read the tag's extent from the source now (blocking)."""
+        try:
+            extent = self._read_extent(external_id)
+        except Exception as e:
+            logger.warning(f"[CATALOG] Extent lookup failed for {external_id}: {e}")
+            extent = None
+        with self._lock:
+            self._extents[external_id] = (time.time(), extent)
+            self._pending.discard(external_id)
+        return extent
+
+    def refresh(self, external_ids, wait=False):
+        """Look up the tags not known yet (or stale), in the background
+        unless ``wait``."""
+        with self._lock:
+            todo = [e for e in dict.fromkeys(external_ids) if e not in self._pending and self._stale(e)]
+            self._pending.update(todo)
+        if not todo:
+            return
+        scheduler = get_scheduler()
+        futures = [scheduler.submit(self.lookup, e, priority=PREFETCH, group=GROUP) for e in todo]
+        if wait:
+            for f in futures:
+                f.result()
+
+    def get(self, external_id):
+        """Cached TagExtent (None when unknown); schedules a lookup when
+        missing or stale."""
+        self.refresh([external_id])
+        entry = self._extents.get(external_id)
+        return entry[1] if entry is not None else None
+
+    def plan(self, external_id, start, end):
+        """(start, end) to fetch, or None when the tag holds nothing there."""
+        extent = self.get(external_id)
+        if extent is None:
+            return start, end
+        span = extent.clip(start, end)
+        with self._lock:
+            if span is None:
+                self.skipped += 1
+            elif span != (start, end):
+                self.clipped += 1
+        return span
+
+    def has_data(self, external_id) -> bool:
+        """False only for tags known to be missing or empty."""
+        extent = self.get(external_id)
+        return extent is None or extent.has_data
+
+    def stats(self) -> dict:
+        with self._lock:
+            known = [e for _, e in self._extents.values() if e is not None]
+            return {
+                "tags": len(known),
+                "dead": sum(not e.has_data for e in known),
+                "pending": len(self._pending),
+                "skipped": self.skipped,
+                "clipped": self.clipped,
+            }
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_tag_catalog():
+    """The active source's TagCatalog, or None when TAG_CATALOG is off."""
+    global _catalog
+    if not config.TAG_CATALOG:
+        return None
+    source = get_data_source()
+    with _catalog_lock:
+        if _catalog is None or _catalog.source is not source:
+            _catalog = TagCatalog(source)
+        return _catalog
+
+
+def rig_external_ids(rig) -> list:
+    """Every tag the dashboard pages fetch for ``rig``."""
+    from logic.eds import EDS_CHANNELS, eds_progress_tag
+    from logic.tag_maps import get_rig_tags
+
+    tags = get_rig_tags(rig)
+    return list(dict.fromkeys([
+        tags["vol_ext"], tags["active_pod_tag"], *tags["valve_map"].values(), *tags["pressure_map"].values(),
+        *(eds_progress_tag(rig, tags["eds_base_tag"], ch) for ch in EDS_CHANNELS),
+    ]))
@@ -2,6 +2,10 @@
 
 from functools import lru_cache
 
+RIGS = ["TransoceanDPS", "TransoceanDTH", "TransoceanDPT", "Drillmax"]
+# Display names used across the UI
+RIG_LABELS = dict(zip(RIGS, ["Doom", "Thanos", "Venom", "Drillmax"]))
+
 @lru_cache(maxsize=8)
 def get_rig_tags(rig):
     if rig == "Drillmax":
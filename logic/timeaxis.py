@@ -0,0 +1,52 @@
+# logic/timeaxis.py
+#
+# One time representation for everything behind data_loaders: a sorted,
+# naive-UTC datetime64[ns] index (int64 ns underneath, see ``to_ns``).
+# Conversion to tz-aware / display time happens only at render time.
+
+import numpy as np
+import pandas as pd
+
+NS_PER_S = 1_000_000_000
+NS_PER_MS = 1_000_000
+
+
+def canonical_index(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce a fetched frame's index to sorted naive-UTC datetime64[ns].
+
+    Cognite returns naive UTC already, so this is normally a no-op; epoch
+    integers are read as milliseconds (the API's unit), tz-aware indexes are
+    converted to UTC and made naive.
+    """
+    idx = df.index
+    if not isinstance(idx, pd.DatetimeIndex):
+        if len(idx) and pd.api.types.is_numeric_dtype(idx):
+            idx = pd.to_datetime(idx, unit="ms")
+        else:
+            idx = pd.DatetimeIndex(pd.to_datetime(idx))
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    idx = idx.as_unit("ns")
+    if idx is not df.index:
+        df = df.set_axis(idx)
+    if not idx.is_monotonic_increasing:
+        df = df.sort_index(kind="stable")
+    return df
+
+
+def to_ns(times) -> np.ndarray:
+    """int64 UTC nanoseconds for an index, Series or array of timestamps that
+    already follow the canonical axis (no parsing, no unit guessing)."""
+    if isinstance(times, pd.Series):
+        times = times.array
+    idx = pd.DatetimeIndex(times)
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    return idx.as_unit("ns").asi8
+
+
+def ns_to_index(ns, utc: bool = False) -> pd.DatetimeIndex:
+    """DatetimeIndex over int64 ns; ``utc=True`` gives the tz-aware form used
+    for display on Analog Trends."""
+    idx = pd.DatetimeIndex(np.asarray(ns, dtype="datetime64[ns]"))
+    return idx.tz_localize("UTC") if utc else idx
@@ -0,0 +1,11 @@
+import pytest
+
+from logic.memo import MemoCache, set_memo_cache
+
+
+@pytest.fixture(autouse=True)
+def memo_cache(tmp_path_factory):
+    """Memoized results go to a per-test directory, never MEMO_DIR."""
+    previous = set_memo_cache(MemoCache(str(tmp_path_factory.mktemp("memo"))))
+    yield
+    set_memo_cache(previous)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from logic import aligned_table
+from logic.aligned_table import AlignedTable, MergedTimes, asof_values, channel_arrays
+from logic.timeaxis import NS_PER_S, to_ns
+
+
+def _raw():
+    ts = pd.to_datetime(
+        ["2024-01-01 00:00:00.5", "2024-01-01 00:00:02.0", "2024-01-01 00:00:02.0", "2024-01-01 00:00:01.0"],
+        utc=True,
+    )
+    return pd.DataFrame({"timestamp": ts, "value": [1.0, 2.0, 4.0, 10.0], "channel": ["a", "a", "a", "b"]})
+
+
+def test_aligned_page_matches_full_pivot():
+    raw = _raw()
+    expected = (
+        raw.pivot_table(index="timestamp", columns="channel", values="value", aggfunc="mean")
+        .sort_index().ffill().bfill()
+    )
+    table = AlignedTable(channel_arrays(raw))
+    assert len(table) == len(expected)
+    page = table.page(1, 2).set_index("timestamp")
+    pd.testing.assert_frame_equal(page, expected.iloc[1:3], check_names=False, check_freq=False)
+
+
+def test_grid_rows_respect_time_filter():
+    start = pd.Timestamp("2024-01-01", tz="UTC")
+    table = AlignedTable(channel_arrays(_raw()), mode="grid", start=start, end=start + pd.Timedelta(seconds=5))
+    assert len(table) == 6
+    page = table.page(0, 10, t_from=start + pd.Timedelta(seconds=1.5))
+    assert page["timestamp"].iloc[0] == start + pd.Timedelta(seconds=2)
+    assert page["a"].tolist() == [3.0, 3.0, 3.0, 3.0]
+
+
+def test_pages_come_from_blocks_not_the_full_union(monkeypatch):
+    rng = np.random.default_rng(0)
+    channels = {
+        ch: (np.unique(rng.integers(0, 50_000, size=n)) * NS_PER_S, rng.normal(size=n))
+        for ch, n in [("a", 3000), ("b", 500), ("c", 4000)]
+    }
+    channels = {ch: (ts, vals[:ts.size]) for ch, (ts, vals) in channels.items()}
+    union = np.unique(np.concatenate([ts for ts, _ in channels.values()]))
+
+    built = []
+    union_of = MergedTimes._union
+    monkeypatch.setattr(MergedTimes, "_union", lambda self, lo, hi: built.append(union_of(self, lo, hi)) or built[-1])
+    monkeypatch.setattr(aligned_table, "MERGE_BLOCK", 64)
+    table = AlignedTable(channels)
+    assert len(table) == union.size
+
+    t_from, t_to = pd.Timestamp(10_000, unit="s", tz="UTC"), pd.Timestamp(30_000, unit="s", tz="UTC")
+    lo, hi = table.row_range(t_from, t_to)
+    assert (lo, hi) == (np.searchsorted(union, t_from.value, side="left"), np.searchsorted(union, t_to.value, side="right"))
+    page = table.page(150, 400, t_from, t_to)
+    assert (to_ns(page["timestamp"]) == union[lo + 150:lo + 550]).all()
+    for ch, (ts, vals) in channels.items():
+        np.testing.assert_array_equal(page[ch], asof_values(ts, vals, union[lo + 150:lo + 550]))
+    # Never more than a block per channel merged at once
+    assert max(b.size for b in built) <= 3 * 64
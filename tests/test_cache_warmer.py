@@ -0,0 +1,14 @@
+from datetime import date, datetime
+
+from logic.cache_warmer import default_window, next_run
+
+
+def test_next_run_picks_the_next_slot():
+    now = datetime(2024, 3, 10, 9, 0)
+    assert next_run(now, ["05:30", "12:00"]) == datetime(2024, 3, 10, 12, 0)
+    assert next_run(now, ["05:30"]) == datetime(2024, 3, 11, 5, 30)
+    assert next_run(now, []) is None
+
+
+def test_default_window_matches_sidebar():
+    assert default_window(datetime(2024, 3, 10, 9, 0)) == (date(2024, 1, 10), date(2024, 3, 10))
@@ -0,0 +1,74 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from logic.chunked_series import ChunkedSeries, concat_series, series_arrays
+from logic.pressure import assign_max_well_pressure
+from logic.pressure_cycles import analyze_pressure_cycles
+
+
+def _series(n=10_000):
+    index = pd.date_range("2024-01-01", periods=n, freq="500ms")
+    values = np.round(2000 + 300 * np.sin(np.arange(n) / 500), 2)
+    values[::97] = np.nan
+    return pd.Series(values, index=index, name="Well Pressure")
+
+
+def test_round_trip_and_slicing_match_pandas():
+    s = _series()
+    for codec in (None, "lz4", "zstd"):
+        c = pickle.loads(pickle.dumps(ChunkedSeries.from_series(s, chunk_size=1000, codec=codec)))
+        assert len(c) == len(s) and c.name == "Well Pressure"
+        pd.testing.assert_series_equal(c.to_series(), s, check_freq=False, check_exact=True)
+        t0, t1 = pd.Timestamp("2024-01-01 00:20:00.5"), pd.Timestamp("2024-01-01 00:40")
+        pd.testing.assert_series_equal(c.loc[t0:t1], c.to_series().loc[t0:t1], check_freq=False)
+        assert c.loc[pd.Timestamp("2023-01-01"):pd.Timestamp("2023-02-01")].empty
+
+
+def test_irregular_times_are_exact():
+    ts = np.cumsum(np.random.default_rng(1).integers(1, 5_000_000_000_000, 500)).astype(np.int64)
+    c = ChunkedSeries.from_arrays(ts, np.ones(500), chunk_size=64, codec="lz4")
+    assert np.array_equal(c.arrays()[0], ts)
+
+
+def test_windows_decode_only_touched_chunks():
+    s = _series()
+    c = ChunkedSeries.from_series(s, chunk_size=1000)
+    starts = np.array([s.index[1500].value, s.index[7200].value])
+    p_ns, _ = series_arrays(c, starts, starts + 10**9)
+    assert len(p_ns) == 2000  # chunks 1 and 7
+
+
+def test_concat_mixes_parts():
+    s = _series()
+    out = concat_series([ChunkedSeries.from_series(s.iloc[:4000], codec="lz4"), s.iloc[4000:]])
+    assert isinstance(out, ChunkedSeries) and len(out) == len(s)
+    assert concat_series([None]) is None
+
+
+def test_pressure_and_cycles_accept_chunked():
+    s = _series()
+    c = ChunkedSeries.from_series(s, chunk_size=1000)
+    events = pd.DataFrame({
+        "timestamp": s.index[[1000, 3000, 6000, 8000]],
+        "valve": ["Upper Annular"] * 4,
+        "state": ["CLOSE", "OPEN", "CLOSE", "OPEN"],
+    })
+    args = ({"Upper Annular": "Annular"}, {"Annular": 30})
+    np.testing.assert_array_equal(assign_max_well_pressure(events, c, *args), assign_max_well_pressure(events, s, *args))
+    valve_map = {"Upper Annular": "tag"}
+    pd.testing.assert_frame_equal(
+        analyze_pressure_cycles(events, valve_map, c), analyze_pressure_cycles(events, valve_map, s),
+    )
+
+
+def test_append_keeps_full_chunks_and_shares_old_ones():
+    s = _series()
+    c = ChunkedSeries.from_series(s.iloc[:2500], chunk_size=1000, codec="lz4")
+    first = c._chunks[0]
+    for i in range(2500, len(s), 70):
+        c = c.append(s.iloc[i:i + 70], codec="lz4", chunk_size=1000)
+    assert c._chunks[0] is first
+    assert [ch.n for ch in c._chunks] == [1000] * 10
+    pd.testing.assert_series_equal(c.to_series(), s, check_freq=False, check_exact=True)
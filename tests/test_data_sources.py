@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from logic.data_sources import FaultInjectingSource, InjectedFailure, ReplaySource, write_replay
+
+
+def test_replay_source_slices_recorded_series(tmp_path):
+    ext = "pi-no:Rig.BOP.CBM.Valve_Status1"
+    idx = pd.date_range("2024-01-01", periods=5, freq="min")
+    write_replay(tmp_path, ext, pd.DataFrame({ext: [513.0, 514.0, 513.0, 514.0, 513.0]}, index=idx))
+
+    source = ReplaySource(tmp_path)
+    start_ms = int(idx[1].timestamp() * 1000)
+    end_ms = int(idx[3].timestamp() * 1000)
+    df = source.retrieve(ext, start_ms, end_ms)
+
+    assert list(df.columns) == [ext]
+    assert df.index.tolist() == list(idx[1:4])
+    assert source.retrieve("pi-no:Rig.missing", start_ms, end_ms).empty
+
+
+def test_fault_injection_is_seeded(tmp_path):
+    def outcomes(seed):
+        source = FaultInjectingSource(ReplaySource(tmp_path), failure_rate=0.5, seed=seed)
+        out = []
+        for _ in range(20):
+            try:
+                source.retrieve("x", 0, 1)
+                out.append(True)
+            except InjectedFailure:
+                out.append(False)
+        return out
+
+    assert outcomes(3) == outcomes(3)
+    assert 0 < sum(outcomes(3)) < 20
+    with pytest.raises(ConnectionError):
+        FaultInjectingSource(ReplaySource(tmp_path), failure_rate=1.0).retrieve("x", 0, 1)
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from logic.eds import analyze_eds_windows
+from logic.step_signals import StepSignal
+
+
+def _ns(ts):
+    return pd.DatetimeIndex(pd.to_datetime(ts)).as_unit("ns").asi8
+
+
+def test_analyze_eds_windows_reslices_cached_signals():
+    t0 = pd.Timestamp("2024-01-01 00:00:00")
+    triggers = pd.DataFrame({
+        "Event #": [1],
+        "Channel": ["Ba"],
+        "EDS Command Time": [t0],
+        "Pod at Command": ["Blue Pod"],
+        "EDS Command Value": [1],
+    })
+    valve_ts = _ns([t0, t0 + pd.Timedelta(seconds=20), t0 + pd.Timedelta(seconds=600)])
+    vol_ts = _ns([t0, t0 + pd.Timedelta(seconds=30), t0 + pd.Timedelta(seconds=700)])
+    signals = {
+        "triggers": triggers,
+        "vol": (vol_ts, np.array([100.0, 150.0, 300.0])),
+        "valves": {"Upper Annular": [StepSignal.from_samples(valve_ts, np.array([513.0, 514.0, 513.0]))]},
+    }
+    smap = {"Upper Annular": {513: "OPEN", 514: "CLOSE"}}
+
+    trig, events = analyze_eds_windows(signals, smap, smap, window_seconds=60)
+    assert events["Valve Event"].tolist() == ["CLOSE"]
+    assert trig["Total Volume (gal)"].tolist() == [5.0]
+
+    trig, events = analyze_eds_windows(signals, smap, smap, window_seconds=900)
+    assert events["Seconds After Command"].tolist() == [20, 600]
+    assert trig["Total Volume (gal)"].tolist() == [20.0]
@@ -0,0 +1,106 @@
+from datetime import date
+
+import pandas as pd
+
+import config
+from logic.dashboard_data import compute_dashboard_data
+from logic.data_sources import SyntheticSource, set_data_source
+from logic.depletion import DEFAULT_CATEGORY_WINDOWS, FLOW_THRESHOLDS, VALVE_CLASS_MAP
+from logic.event_store import (
+    TABLES, EventStore, _load_dashboard, _slice, is_settled, materialize, params_key, plan_range, stitch_eds,
+)
+from logic.tag_maps import get_rig_tags
+
+
+def _events(start, periods):
+    times = pd.date_range(start, periods=periods, freq="12h")
+    return pd.DataFrame({
+        "timestamp": times,
+        "valve": pd.Categorical(["Upper Annular"] * periods),
+        "Δ (gal)": range(periods),
+    })
+
+
+def _store(tmp_path, months, params="p"):
+    store = EventStore(str(tmp_path))
+    entries = []
+    for month in months:
+        # Padded computations hand in rows outside the month; only its own are kept
+        rows = store.write_partition("Rig", month, {"events": _events(pd.Period(month).start_time - pd.Timedelta(days=2), 70)})
+        entries.append({"rig": "Rig", "month": month, "params": params, "rows": rows})
+    store.record(entries)
+    return store
+
+
+def test_partitions_hold_their_own_month(tmp_path):
+    store = _store(tmp_path, ["2024-01", "2024-02"])
+    jan = store.read("events", "Rig", ["2024-01"])
+    assert jan["timestamp"].min() == pd.Timestamp("2024-01-01")
+    assert jan["timestamp"].max() == pd.Timestamp("2024-01-31 12:00")
+    both = store.read("events", "Rig", ["2024-01", "2024-02"], pd.Timestamp("2024-01-20"), pd.Timestamp("2024-02-03"))
+    assert len(both) == 28
+    assert both["timestamp"].is_monotonic_increasing
+    assert isinstance(both["valve"].dtype, pd.CategoricalDtype)
+
+
+def test_plan_reads_leading_stored_months(tmp_path):
+    store = _store(tmp_path, ["2024-01", "2024-03"])
+    plan = store.plan("Rig", date(2024, 1, 10), date(2024, 3, 20), params="p")
+    assert plan.months == ["2024-01"]
+    assert plan.live_start == date(2024, 2, 1)
+
+    plan = store.plan("Rig", date(2024, 2, 10), date(2024, 3, 20), params="p")
+    assert plan.months == [] and plan.live_start == date(2024, 2, 10)
+
+    plan = store.plan("Rig", date(2024, 1, 10), date(2024, 1, 20), params="other")
+    assert plan.months == [] and plan.live_start == date(2024, 1, 10)
+
+    plan = store.plan("Rig", date(2024, 3, 1), date(2024, 3, 31))
+    assert plan.months == ["2024-03"] and plan.live_start is None
+
+
+def test_params_key_and_settled_months():
+    assert params_key({"Annular": 30}) == params_key({"Annular": 30})
+    assert params_key({"Annular": 30}) != params_key({"Annular": 31})
+    assert is_settled("2024-01", pad_days=2, now=pd.Timestamp("2024-02-03"))
+    assert not is_settled("2024-01", pad_days=2, now=pd.Timestamp("2024-02-02 23:00"))
+
+
+def test_stitch_eds_renumbers_commands():
+    stored = (pd.DataFrame({"EDS Command Time": [pd.Timestamp("2024-01-05")]}), pd.DataFrame())
+    live = (pd.DataFrame({"Event #": [1, 2], "EDS Command Time": pd.to_datetime(["2024-02-01", "2024-02-03"])}),
+            pd.DataFrame())
+    triggers, events = stitch_eds(stored, live)
+    assert triggers["Event #"].tolist() == [1, 2, 3]
+    assert events.empty and "Valve Name" in events.columns
+
+
+def test_stitched_range_matches_one_computation_past_the_boundary(tmp_path, monkeypatch):
+    # The live part is padded like a stored month, so the first transitions,
+    # ramps and cycles after the boundary still see their neighbours
+    monkeypatch.setattr(config, "EVENT_STORE_DIR", str(tmp_path))
+    previous = set_data_source(SyntheticSource(start="2023-12-20", days=70, sample_hz=0.05))
+    try:
+        rig = "TransoceanDPS"
+        tags = get_rig_tags(rig)
+        EventStore(str(tmp_path)).record([materialize(rig, "2024-01", str(tmp_path))])
+        args = (dict(DEFAULT_CATEGORY_WINDOWS), tags["valve_map"], tags["per_valve_simple_map"],
+                tags["per_valve_function_map"], VALVE_CLASS_MAP, tags["vol_ext"], tags["pressure_map"],
+                tags["active_pod_tag"], FLOW_THRESHOLDS)
+        start, end = date(2024, 1, 10), date(2024, 2, 20)
+        plan = plan_range(rig, start, end, params_key(args[0]))
+        assert plan.months == ["2024-01"]
+        stitched = _load_dashboard(rig, start, end, plan, args, compute_dashboard_data)
+        full = compute_dashboard_data(rig, start, end, *args)
+    finally:
+        set_data_source(previous)
+
+    boundary = pd.Timestamp(plan.live_start)
+    for table, got, want in zip(("events", "vol", "cycles"), stitched, full):
+        got, want = (_slice(df, TABLES[table], boundary, None) for df in (got, want))
+        assert len(got)
+        if table == "vol":
+            pd.testing.assert_frame_equal(got, want, check_freq=False)
+        else:
+            pd.testing.assert_frame_equal(got.reset_index(drop=True), want.reset_index(drop=True))
+    pd.testing.assert_series_equal(stitched[3].loc[boundary:], full[3].loc[boundary:], check_freq=False)
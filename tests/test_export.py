@@ -0,0 +1,12 @@
+import io
+
+import pandas as pd
+
+from logic.export import write_chunks
+
+
+def test_csv_header_written_once_after_empty_chunks():
+    buf = io.BytesIO()
+    chunks = [pd.DataFrame({"a": pd.Series([], dtype=int)}), pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [3]})]
+    assert write_chunks(chunks, buf, "csv") == 3
+    assert buf.getvalue().decode().splitlines() == ["a", "1", "2", "3"]
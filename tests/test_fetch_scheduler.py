@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from logic.fetch_scheduler import PREFETCH, VISIBLE, FetchScheduler, run_all
+
+
+def _block(sched, group):
+    """Occupy the single worker until the returned event is set."""
+    started, gate = threading.Event(), threading.Event()
+    future = sched.submit(lambda: started.set() or gate.wait(), group=group)
+    started.wait(5)
+    return gate, future
+
+
+def test_priority_then_round_robin_across_groups():
+    sched = FetchScheduler(max_workers=1)
+    gate, _ = _block(sched, "warmup")
+    order = []
+    futures = [sched.submit(order.append, "prefetch", priority=PREFETCH, group="a")]
+    futures += [sched.submit(order.append, f"a{i}", priority=VISIBLE, group="a") for i in range(3)]
+    futures += [sched.submit(order.append, "b0", priority=VISIBLE, group="b")]
+    assert sched.stats()["queued"] == 5
+    gate.set()
+    for f in futures:
+        f.result(timeout=5)
+    assert order == ["a0", "b0", "a1", "a2", "prefetch"]
+    sched.shutdown()
+
+
+def test_cancel_drops_queued_jobs_only():
+    sched = FetchScheduler(max_workers=1)
+    gate, running = _block(sched, "s")
+    queued = [sched.submit(lambda: None, group="s") for _ in range(3)]
+    other = sched.submit(lambda: "kept", group="t")
+    assert sched.cancel("s") == 3
+    gate.set()
+    assert running.result(timeout=5) is True
+    assert all(f.cancelled() for f in queued)
+    assert other.result(timeout=5) == "kept"
+    sched.shutdown()
+
+
+def test_run_all_keeps_job_order_and_returns_errors():
+    def job(x):
+        if x == 2:
+            raise ValueError("bad")
+        return x * 10
+
+    results = run_all(job, [(i,) for i in range(4)])
+    assert results[:2] == [0, 10] and results[3] == 30
+    with pytest.raises(ValueError):
+        raise results[2]
+
+
+def test_cancel_on_change_drops_the_sessions_queued_jobs(monkeypatch):
+    from logic import fetch_scheduler
+
+    sched = FetchScheduler(max_workers=1)
+    monkeypatch.setattr(fetch_scheduler, "_scheduler", sched)
+    state = {}
+    assert fetch_scheduler.cancel_on_change(state, ("rig", "Dashboard"), group="s") == 0
+    gate, running = _block(sched, "s")
+    queued = [sched.submit(lambda: None, priority=p, group="s") for p in (VISIBLE, VISIBLE, PREFETCH)]
+    other = sched.submit(lambda: "kept", group="t")
+    assert fetch_scheduler.cancel_on_change(state, ("rig", "Dashboard"), group="s") == 0
+    assert fetch_scheduler.cancel_on_change(state, ("rig", "EDS Cycles"), group="s") == 3
+    gate.set()
+    assert running.result(timeout=5) is True
+    assert all(f.cancelled() for f in queued)
+    assert other.result(timeout=5) == "kept"
+    sched.shutdown()
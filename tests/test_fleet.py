@@ -0,0 +1,60 @@
+import os
+import signal
+import time
+
+import pandas as pd
+
+from logic import fleet
+from logic.data_sources import ReplaySource, SyntheticSource, source_spec
+from logic.fleet import CLASS_COLUMNS, RIG_COLUMNS, summarize_rig
+
+
+def test_summarize_rig_per_rig_and_valve_class():
+    events = pd.DataFrame({
+        "Valve Class": pd.Categorical(["Annular", "Annular", "Pipe Ram"]),
+        "Δ (gal)": [4.0, 6.0, 10.0],
+        "Flow Rate (gpm)": [5.0, 7.0, 9.0],
+        "Depletion (%)": [0.5, 0.5, 1.25],
+    })
+    cycles = pd.DataFrame({
+        "Valve": ["Upper Annular", "Upper Pipe Ram", "Upper Pipe Ram"],
+        "Max Well Pressure": [3000.0, 2600.0, 900.0],
+    })
+    rig_row, by_class = summarize_rig("Drillmax", events, cycles, rare_threshold=2500, seconds=1.5)
+
+    assert list(rig_row.columns) == RIG_COLUMNS
+    row = rig_row.iloc[0]
+    assert row["Transitions"] == 3 and row["Total Volume (gal)"] == 20.0
+    assert row["Pressure Cycles"] == 2 and row["Max Well Pressure (psi)"] == 3000.0
+
+    assert list(by_class.columns) == CLASS_COLUMNS
+    by_class = by_class.set_index("Valve Class")
+    assert by_class.loc["Annular", "Avg Δ (gal)"] == 5.0
+    assert by_class.loc["Pipe Ram", "Pressure Cycles"] == 1
+
+
+def test_summarize_rig_without_events():
+    rig_row, by_class = summarize_rig("Drillmax", pd.DataFrame(), pd.DataFrame(), 2500)
+    assert rig_row.iloc[0]["Transitions"] == 0
+    assert by_class.empty
+
+
+def test_source_spec_rebuilds_in_workers():
+    assert source_spec(ReplaySource("/tmp/replay")) == ("replay", "/tmp/replay")
+    kind, arg = source_spec(SyntheticSource(start="2024-01-01", days=5, sample_hz=0.5))
+    assert kind == "synthetic" and SyntheticSource(**arg).days == 5
+
+
+def test_dead_worker_is_replaced():
+    pool = fleet.get_pool("test-rig")
+    try:
+        pid = pool.submit(os.getpid).result(timeout=60)
+        os.kill(pid, signal.SIGKILL)
+        deadline = time.monotonic() + 30
+        while not pool._broken and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert pool._broken
+        assert fleet._submit("test-rig", os.getpid).result(timeout=60) != pid
+        assert fleet.get_pool("test-rig") is not pool
+    finally:
+        fleet._drop_pool("test-rig", fleet.get_pool("test-rig"))
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from logic.ingest import concat_frames, decode_active_pod, decode_status
+
+
+def test_decode_status_matches_dict_map():
+    smap = {256: "VENT", 513: "OPEN", 514: "CLOSE", 4096: "ERROR"}
+    codes = pd.Series([513.0, 514.0, np.nan, 999.0, 513.5, 4096.0])
+    decoded = decode_status(codes, smap)
+    expected = codes.map(smap)
+    assert list(pd.Series(decoded).astype(object).where(pd.notna(decoded), None)) == \
+        list(expected.astype(object).where(expected.notna(), None))
+
+
+def test_decode_active_pod_and_categorical_concat():
+    pods = decode_active_pod([1, 2, 3, 4, 0, np.nan])
+    assert list(pods) == ["Blue Pod", "Blue Pod", "Yellow Pod", "Yellow Pod", "Unknown", "Unknown"]
+
+    a = pd.DataFrame({"valve": pd.Categorical(["A"]), "state": pd.Categorical(["OPEN"])})
+    b = pd.DataFrame({"valve": pd.Categorical(["B"]), "state": pd.Categorical(["LATCH"])})
+    out = concat_frames([a, b])
+    assert isinstance(out["valve"].dtype, pd.CategoricalDtype)
+    assert list(out["state"]) == ["OPEN", "LATCH"]
@@ -0,0 +1,34 @@
+import threading
+
+import pandas as pd
+
+from logic import instrumentation
+
+
+def test_stage_is_noop_without_trace():
+    instrumentation.begin("off")  # disabled by default -> no trace
+    assert not instrumentation.active()
+    with instrumentation.stage("x") as s:
+        s.rows_out = 3
+    assert s.rows_out is None
+
+
+def test_trace_records_stages_and_worker_threads():
+    trace = instrumentation.begin("test", force=True)
+
+    def work():
+        with instrumentation.stage("fetch", tag="t1") as s:
+            s.rows_out = 2
+            s.bytes = instrumentation.frame_bytes(pd.DataFrame({"a": [1.0, 2.0]}))
+
+    with instrumentation.stage("outer", rows_in=5):
+        t = threading.Thread(target=instrumentation.bind(work))
+        t.start()
+        t.join()
+
+    assert instrumentation.end(trace) is trace
+    assert not instrumentation.active()
+    assert [r.stage for r in trace.records] == ["fetch", "outer"]
+    summary = trace.summary()
+    assert summary["fetches"] == 1 and summary["fetch_bytes"] > 0
+    assert trace.records[1].rows_in == 5
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from logic.data_sources import SyntheticSource, set_data_source
+from logic.depletion import DEFAULT_CATEGORY_WINDOWS
+from logic.live_tail import LiveTail
+from logic.synthetic import SyntheticConfig, SyntheticRig
+from logic.tag_maps import get_rig_tags
+
+RIG = "TransoceanDPS"
+
+
+@pytest.fixture
+def synthetic_rig():
+    rig = SyntheticRig(SyntheticConfig(rig=RIG, days=4, sample_hz=0.1, ops_per_valve_day=12, seed=3))
+    previous = set_data_source(SyntheticSource(rigs=[rig]))
+    yield rig
+    set_data_source(previous)
+
+
+def _tail():
+    return LiveTail(RIG, pd.Timestamp("2024-01-01"), DEFAULT_CATEGORY_WINDOWS, get_rig_tags(RIG))
+
+
+def test_refreshes_match_a_full_computation(synthetic_rig):
+    ms = lambda t: int(pd.Timestamp(t).timestamp() * 1000)
+    end = "2024-01-03 18:00"
+
+    live = _tail()
+    live.refresh(ms("2024-01-02 09:00"))
+    for t in pd.date_range("2024-01-02 09:00", end, freq="133min")[1:].append(pd.DatetimeIndex([end])):
+        stats = live.refresh(ms(t))
+        assert not stats["full"]
+    once = _tail()
+    once.refresh(ms(end))
+
+    events, vol, cycles, well = live.outputs()
+    f_events, f_vol, f_cycles, f_well = once.outputs()
+    assert len(events) > 50 and len(cycles) > 3
+    pd.testing.assert_frame_equal(events, f_events)
+    pd.testing.assert_frame_equal(vol, f_vol)
+    pd.testing.assert_frame_equal(cycles, f_cycles)
+    pd.testing.assert_series_equal(well.to_series(), f_well.to_series())
+
+
+def test_refresh_only_recomputes_the_tail(synthetic_rig):
+    ms = lambda t: int(pd.Timestamp(t).timestamp() * 1000)
+    live = _tail()
+    first = live.refresh(ms("2024-01-03 12:00"))
+    assert first["full"] and first["events_recomputed"] == len(live.events)
+
+    stats = live.refresh(ms("2024-01-03 12:01"))
+    assert 0 < stats["new_points"] < 100
+    assert stats["events_recomputed"] < len(live.events) / 10
+    assert live.refresh(ms("2024-01-03 12:01"))["new_points"] == 0
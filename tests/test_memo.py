@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from logic.memo import MemoCache, fingerprint, memo_stats, memoize, module_deps, set_memo_cache
+from logic.pressure import TailWindowStats
+
+
+def _frame():
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=5, freq="min"),
+        "valve": pd.Categorical(["Upper Annular", "Test Ram"] * 2 + ["Test Ram"]),
+        "state": ["OPEN", "CLOSE", "CLOSE", "OPEN", "OPEN"],
+        "value": np.arange(5, dtype=float),
+    })
+
+
+def test_fingerprint_follows_content():
+    df = _frame()
+    assert fingerprint(df) == fingerprint(df.copy())
+    changed = df.copy()
+    changed.loc[4, "value"] = 4.5
+    assert fingerprint(changed) != fingerprint(df)
+    renamed = df.rename(columns={"value": "other"})
+    assert fingerprint(renamed) != fingerprint(df)
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+
+
+def test_memoize_hits_memory_then_disk(tmp_path):
+    calls = []
+
+    @memoize
+    def double(df, factor=2):
+        calls.append(1)
+        return df.assign(value=df["value"] * factor)
+
+    previous = set_memo_cache(MemoCache(str(tmp_path)))
+    try:
+        first = double(_frame())
+        first["value"] = 0.0  # the caller's copy, not the cached one
+        again = double(_frame())
+        assert again["value"].tolist() == [0.0, 2.0, 4.0, 6.0, 8.0]
+        set_memo_cache(MemoCache(str(tmp_path)))  # a restarted process
+        pd.testing.assert_frame_equal(double(_frame()), again)
+        double(_frame(), factor=3)
+        counts = memo_stats()[f"{__name__}.test_memoize_hits_memory_then_disk.<locals>.double"]
+        assert len(calls) == 2
+        assert counts["hits"] == 0 and counts["disk_hits"] == 1 and counts["misses"] == 1
+    finally:
+        set_memo_cache(previous)
+
+
+def test_unfingerprintable_arguments_run_uncached(tmp_path):
+    calls = []
+
+    @memoize
+    def count(stats):
+        calls.append(1)
+        return len(stats)
+
+    previous = set_memo_cache(MemoCache(str(tmp_path)))
+    try:
+        count(TailWindowStats())
+        count(TailWindowStats())
+        assert len(calls) == 2
+    finally:
+        set_memo_cache(previous)
+
+
+def test_disk_eviction_keeps_budget(tmp_path):
+    cache = MemoCache(str(tmp_path), disk_bytes=0)
+    cache.put("a", np.zeros(1000))
+    assert not list(tmp_path.glob("*.pkl"))
+    assert cache.get("a")[0]  # still held in memory
+
+
+def test_version_key_follows_logic_imports():
+    deps = module_deps("logic.pressure")
+    assert "logic.chunked_series" in deps and "logic.timeaxis" in deps
+    assert "logic.memo" in module_deps("logic.preprocessing")
@@ -0,0 +1,28 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from ui.pages import PAGES, lazy_import, needs_rig_data, page_renderer
+
+
+def test_every_page_resolves_to_its_renderer():
+    for page, spec in PAGES.items():
+        assert callable(page_renderer(page))
+        assert spec.module in sys.modules
+
+
+def test_lazy_import_returns_loaded_module():
+    assert lazy_import("ui.pages") is sys.modules["ui.pages"]
+
+
+def test_pages_with_their_own_data():
+    assert not needs_rig_data("Analog Trends") and not needs_rig_data("Fleet")
+    assert needs_rig_data("Valve Analytics")
+
+
+def test_concurrent_first_imports_wait_for_the_module(tmp_path, monkeypatch):
+    (tmp_path / "slow_page.py").write_text("import time\ntime.sleep(0.3)\n\ndef render():\n    return 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    with ThreadPoolExecutor(4) as pool:
+        renders = list(pool.map(lambda _: lazy_import("slow_page").render, range(4)))
+    assert all(render() == 1 for render in renders)
+    sys.modules.pop("slow_page", None)
@@ -24,3 +24,23 @@ def test_assign_max_pressure_vectorized():
 
     expected = np.array([1.0, 9.0])
     np.testing.assert_allclose(result, expected)
+
+
+def test_tail_window_stats_match_direct_computation():
+    from logic.pressure import TailWindowStats, _top_quartile_mean
+
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2020-01-01", periods=5000, freq="s")
+    values = rng.integers(0, 50, len(times)).astype(float)
+    values[::97] = np.nan
+    series = pd.Series(values, index=times)
+
+    stats = TailWindowStats(block_size=256, band=16)
+    starts = times[[0, 300, 4000]].asi8
+    for pos in range(1000, len(times) + 1, 125):
+        stats.extend(series.iloc[:pos])
+        got = stats.top_quartile_means(starts)
+        for start, value in zip(starts, got):
+            window = series.iloc[times.searchsorted(pd.Timestamp(start)):pos].dropna().to_numpy()
+            expected = _top_quartile_mean(window) if window.size else np.nan
+            np.testing.assert_allclose(value, expected)
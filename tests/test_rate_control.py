@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from logic.data_loaders import api_retry
+from logic.data_sources import DataSource, FaultInjectingSource, InjectedFailure, InjectedThrottle
+from logic.rate_control import AdaptiveLimiter, classify_error
+
+
+class _Http(Exception):
+    def __init__(self, code, headers=None):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+        self.headers = headers or {}
+
+
+class _Tiny(DataSource):
+    name = "tiny"
+
+    def retrieve(self, external_id, start, end):
+        return pd.DataFrame({external_id: [1.0]}, index=pd.DatetimeIndex([pd.Timestamp(start, unit="ms")]))
+
+
+def test_classify_error():
+    throttled = classify_error(_Http(429, {"Retry-After": "2"}))
+    assert throttled.retriable and throttled.throttled and throttled.retry_after == 2.0
+    assert classify_error(_Http(503)).throttled
+    assert not classify_error(_Http(404)).retriable
+    assert not classify_error(ValueError("bad tag")).retriable
+    assert classify_error(InjectedFailure("flaky")).retriable
+    assert classify_error(InjectedThrottle("slow down", 0.5)).retry_after == 0.5
+
+
+def _hammer(limiter, calls=80):
+    source = FaultInjectingSource(_Tiny(), latency_ms=5, max_concurrent=3, retry_after_s=0.005)
+    fetch = api_retry(max_attempts=20, base_delay=0.001, max_delay=0.01, limiter=limiter)(source.retrieve)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        frames = list(pool.map(lambda i: fetch(f"tag{i}", i, i + 1), range(calls)))
+    return source, frames
+
+
+def test_aimd_backs_off_under_throttling():
+    fixed = AdaptiveLimiter(initial=8, minimum=8, maximum=8)
+    fixed_source, _ = _hammer(fixed)
+
+    adaptive = AdaptiveLimiter(initial=8, maximum=8, cooldown=0.005)
+    source, frames = _hammer(adaptive)
+    assert len(frames) == 80 and all(len(f) == 1 for f in frames)
+    assert adaptive.decreases >= 1
+    assert source.throttled < fixed_source.throttled
+    assert adaptive.in_flight == 0
+
+
+def test_non_retriable_errors_are_not_retried():
+    calls = []
+
+    def broken(*args):
+        calls.append(args)
+        raise ValueError("unknown external id")
+
+    with pytest.raises(ValueError):
+        api_retry(max_attempts=5, base_delay=0, limiter=AdaptiveLimiter())(broken)("x", 0, 1)
+    assert len(calls) == 1
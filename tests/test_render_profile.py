@@ -0,0 +1,41 @@
+import pandas as pd
+import plotly.graph_objects as go
+
+from ui_components import render_profile
+
+
+class _Target:
+    def __init__(self):
+        self.calls = []
+
+    def plotly_chart(self, fig, **kwargs):
+        self.calls.append(("chart", kwargs.get("key")))
+
+    def dataframe(self, data, **kwargs):
+        self.calls.append(("table", kwargs.get("key")))
+
+
+def test_wrappers_pass_through_without_profile():
+    render_profile.begin("off", enabled=False)
+    target = _Target()
+    render_profile.plotly_chart(target, go.Figure(), key="a")
+    render_profile.dataframe(target, pd.DataFrame({"x": [1]}), key="b")
+    assert target.calls == [("chart", "a"), ("table", "b")]
+
+
+def test_profile_records_sections_and_payloads():
+    profile = render_profile.begin("page", enabled=True)
+    target = _Target()
+    fig = go.Figure([go.Scatter(x=list(range(50)), y=list(range(50))), go.Bar(x=["a", "b"], y=[1, 2])])
+    with render_profile.section("Page"):
+        with render_profile.section("Charts"):
+            render_profile.plotly_chart(target, fig, key="scatter")
+        render_profile.dataframe(target, pd.DataFrame({"x": range(10)}))
+    render_profile.end(profile)
+
+    sections, widgets = render_profile.summary_frames(profile)
+    assert set(sections["section"]) == {"Page", "Page / Charts"}
+    chart = widgets[widgets["name"] == "scatter"].iloc[0]
+    assert chart["section"] == "Page / Charts" and chart["traces"] == 2 and chart["points"] == 52
+    table = widgets[widgets["kind"] == "dataframe"].iloc[0]
+    assert table["rows"] == 10 and table["kb"] > 0
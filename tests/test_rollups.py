@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from logic.rollups import RollupStore, SignalRollup, choose_level
+from logic.timeaxis import NS_PER_MS, NS_PER_S
+
+
+def _series(n=3 * 86400, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = pd.Timestamp("2024-01-01").value + np.arange(n, dtype=np.int64) * 7 * NS_PER_S
+    vals = rng.normal(100, 10, n)
+    vals[::53] = np.nan
+    return ts, vals
+
+
+def _expected(ts, vals, freq):
+    s = pd.Series(vals, index=pd.DatetimeIndex(ts)).dropna()
+    g = s.groupby(s.index.floor(freq))
+    return g.agg(["min", "max", "mean", "first", "last", "count"])
+
+
+def test_incremental_overlapping_fetches_match_one_pass():
+    ts, vals = _series()
+    lo, hi = int(ts[0]), int(ts[-1]) + 1
+    roll = SignalRollup()
+    # Out of order, overlapping fetches; covered parts are not counted twice
+    for a, b in [(0.5, 0.8), (0.0, 0.3), (0.2, 0.6), (0.75, 1.0), (0.1, 0.9)]:
+        s, e = lo + int(a * (hi - lo)), lo + int(b * (hi - lo))
+        i, j = np.searchsorted(ts, [s, e])
+        roll.add(ts[i:j], vals[i:j], s, e)
+    assert roll.covered == [(lo, hi)]
+    assert roll.missing(lo, hi) == []
+
+    for level, freq in [("1min", "1min"), ("1h", "1h"), ("1D", "1D")]:
+        got = roll.frame(level)
+        exp = _expected(ts, vals, freq)
+        np.testing.assert_array_equal(got.index, exp.index)
+        for col in ["min", "max", "mean", "first", "last", "count"]:
+            np.testing.assert_allclose(got[col].to_numpy(float), exp[col].to_numpy(float), err_msg=f"{level} {col}")
+
+
+def test_frame_slices_and_missing_spans():
+    ts, vals = _series(n=86400)
+    roll = SignalRollup()
+    mid = int(ts[len(ts) // 2])
+    roll.add(ts[ts < mid], vals[ts < mid], int(ts[0]), mid)
+    assert roll.missing(int(ts[0]), int(ts[-1]) + 1) == [(mid, int(ts[-1]) + 1)]
+    day = pd.Timestamp("2024-01-02").value
+    hours = roll.frame("1h", day, day + 6 * 3600 * NS_PER_S)
+    assert len(hours) == 6 and hours.index[0] == pd.Timestamp("2024-01-02")
+
+
+def test_choose_level_picks_coarsest_with_enough_points():
+    day = 86400 * NS_PER_S
+    assert choose_level(0, 365 * day, 1000) == "1h"
+    assert choose_level(0, 3 * 365 * day, 1000) == "1D"
+    assert choose_level(0, 7 * day, 1000) == "1min"
+    assert choose_level(0, day // 2, 1000) is None
+
+
+def _frame(ts, vals):
+    return pd.DataFrame({"v": vals}, index=pd.DatetimeIndex(ts))
+
+
+def test_store_folds_registered_signals_up_to_the_settle_time():
+    ts, vals = _series(n=86400)
+    store = RollupStore(settle_s=300)
+    start_ms, end_ms = int(ts[0]) // NS_PER_MS, int(ts[-1]) // NS_PER_MS
+    store.observe("other", _frame(ts, vals), start_ms, end_ms)
+    assert store.signals() == []  # nothing reads it as rollups
+
+    roll = store.signal("tag")
+    now = int(ts[len(ts) // 2])
+    store.observe("tag", _frame(ts, vals), start_ms, end_ms, now_ns=now)
+    settled = now - 300 * NS_PER_S
+    assert roll.covered == [(int(ts[0]), settled)]
+    assert roll.frame("1min")["count"].sum() == np.count_nonzero(~np.isnan(vals[ts < settled]))
+    # A later fetch picks up the rest
+    store.observe("tag", _frame(ts, vals), start_ms, end_ms, now_ns=int(ts[-1]) + 3600 * NS_PER_S)
+    assert roll.missing(int(ts[0]), int(ts[-1]) + 1) == []
+    assert roll.frame("1min")["count"].sum() == np.count_nonzero(~np.isnan(vals))
+
+
+def test_store_drops_least_recently_used_signals():
+    ts, vals = _series(n=86400)
+    start_ms, end_ms = int(ts[0]) // NS_PER_MS, int(ts[-1]) // NS_PER_MS
+    store = RollupStore(max_bytes=2**40, settle_s=0)
+    for ext in ("a", "b"):
+        store.signal(ext)
+        store.observe(ext, _frame(ts, vals), start_ms, end_ms)
+    store.max_bytes = store.signal("b").nbytes * 1.5
+    store.signal("c")
+    store.observe("c", _frame(ts, vals), start_ms, end_ms)
+    assert store.signals() == ["c"]
+
+
+def test_accumulator_usage_and_pressure_envelope_match_raw():
+    from logic.data_loaders import fetch_frame
+    from logic.data_sources import SyntheticSource, set_data_source
+    from logic.ingest import decode_active_pod
+    from logic.rollups import accumulator_usage, pressure_envelope
+    from logic.tag_maps import get_rig_tags
+
+    tags = get_rig_tags("TransoceanDPS")
+    sm, em = pd.Timestamp("2024-01-01").value // NS_PER_MS, pd.Timestamp("2024-01-15").value // NS_PER_MS - 1
+    previous = set_data_source(SyntheticSource(start="2024-01-01", days=14, sample_hz=0.1))
+    try:
+        usage = accumulator_usage(tags["vol_ext"], tags["active_pod_tag"], sm, em, "1D")
+        envelope = pressure_envelope(tags["pressure_map"]["Well Pressure"], sm, em, "W", "1D")
+        acc = fetch_frame(tags["vol_ext"], sm, em).iloc[:, 0] / 10
+        pod = fetch_frame(tags["active_pod_tag"], sm, em).iloc[:, 0]
+        well = fetch_frame(tags["pressure_map"]["Well Pressure"], sm, em).iloc[:, 0].dropna()
+    finally:
+        set_data_source(previous)
+
+    # Hourly rises of the raw totalizer, credited to the pod at the hour's end
+    hours = acc.groupby(acc.index.floor("1h"))
+    rise = hours.last().diff().fillna(hours.last().iloc[0] - hours.first().iloc[0]).clip(lower=0)
+    pods = decode_active_pod(pod.groupby(pod.index.floor("1h")).last().reindex(rise.index, method="ffill"))
+    expected = rise.groupby([rise.index.floor("1D"), pods], observed=False).sum().unstack()
+    np.testing.assert_allclose(usage.to_numpy(), expected.to_numpy(), atol=1e-6)
+    assert usage.to_numpy().sum() == pytest.approx(acc.iloc[-1] - acc.iloc[0])
+
+    weeks = well.groupby(pd.Grouper(freq="W"))
+    np.testing.assert_allclose(envelope["min"], weeks.min())
+    np.testing.assert_allclose(envelope["max"], weeks.max())
+    np.testing.assert_allclose(envelope["mean"], weeks.mean())
+    assert envelope["count"].tolist() == weeks.count().tolist()
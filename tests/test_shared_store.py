@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from logic.shared_store import SharedStore, shared_key
+
+
+def _tables(n=1000):
+    index = pd.date_range("2024-01-01", periods=n, freq="s")
+    values = np.arange(n, dtype=float)
+    values[::7] = np.nan
+    frame = pd.DataFrame({
+        "value": values,
+        "pod": pd.Categorical(np.where(np.arange(n) % 2, "Blue Pod", "Yellow Pod")),
+        "rate": np.ones(n, dtype="float32"),
+    }, index=index)
+    return {"frame": frame, "series": pd.Series(values, index=index, name="pressure"), "missing": None}
+
+
+def test_round_trip_is_read_only_and_zero_copy(tmp_path):
+    store = SharedStore(str(tmp_path))
+    tables = _tables()
+    out = store.put(shared_key("a", 1), tables)
+
+    assert set(out) == {"frame", "series"}
+    pd.testing.assert_frame_equal(out["frame"], tables["frame"], check_freq=False)
+    pd.testing.assert_series_equal(out["series"], tables["series"], check_freq=False)
+    assert not out["frame"]["value"].to_numpy().flags.writeable
+    assert not out["series"].to_numpy().flags.writeable
+
+
+def test_computed_once_across_processes(tmp_path):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return _tables()
+
+    key = shared_key("dashboard", "Rig")
+    first = SharedStore(str(tmp_path)).get_or_compute(key, compute)
+    # A second process sees the published dataset
+    second = SharedStore(str(tmp_path)).get_or_compute(key, compute)
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first["frame"], second["frame"])
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".lock") or f.startswith(".")]
+
+
+def test_eviction_keeps_store_bounded(tmp_path):
+    store = SharedStore(str(tmp_path), max_bytes=0)
+    held = store.put("old", _tables())
+    os.utime(os.path.join(tmp_path, "old", ".read"), (1, 1))
+    store.put("new", _tables())
+
+    assert [key for _, _, key in store.entries()] == ["new"]
+    # Mappings held by readers stay valid after the files are removed
+    assert held["frame"]["value"].iloc[1] == 1.0
+
+
+def test_expired_datasets_are_not_served(tmp_path):
+    store = SharedStore(str(tmp_path), ttl_s=60)
+    store.put("k", _tables())
+    os.utime(os.path.join(tmp_path, "k"), (0, 0))
+    assert store.get("k") is None
@@ -0,0 +1,18 @@
+import numpy as np
+
+from logic.step_signals import StepSignal, change_points
+
+
+def test_step_signal_keeps_change_points_only():
+    times = np.arange(8, dtype=np.int64) * 1_000
+    values = np.array([1.0, 1.0, 3.0, 3.0, np.nan, np.nan, 3.0, 1.0])
+    sig = StepSignal.from_samples(times, values)
+
+    assert sig.times.tolist() == [0, 2_000, 4_000, 6_000, 7_000]
+    assert change_points(values).tolist() == [0, 2, 4, 6, 7]
+    # changes into/out of a gap are not transitions
+    assert sig.transitions().tolist() == [1, 4]
+
+    at = np.array([-5, 0, 2_500, 7_500], dtype=np.int64)
+    assert np.array_equal(sig.asof(at), [np.nan, 1.0, 3.0, 1.0], equal_nan=True)
+    assert sig.asof(at, backfill=True)[0] == 1.0
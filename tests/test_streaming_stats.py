@@ -0,0 +1,28 @@
+import numpy as np
+
+from logic.streaming_stats import channel_stats
+
+
+def test_channel_stats_matches_numpy_across_chunks():
+    rng = np.random.default_rng(0)
+    values = rng.normal(100, 15, 50_001)
+    ts = np.arange(values.size, dtype=np.int64) * 1_000_000_000
+
+    stats = channel_stats(ts, values, chunk_rows=4096)
+
+    assert stats["Count"] == values.size
+    np.testing.assert_allclose(stats["Mean"], values.mean())
+    np.testing.assert_allclose(stats["Std"], values.std(ddof=1))
+    assert stats["Min"] == values.min() and stats["Max"] == values.max()
+    assert abs(stats["Median"] - np.median(values)) < 0.5
+
+
+def test_time_weighted_stats_weight_by_hold_duration():
+    ts = np.array([0, 1, 2, 30], dtype=np.int64) * 1_000_000_000
+    values = np.array([1.0, 1.0, 10.0, 0.0])
+
+    stats = channel_stats(ts, values, time_weighted=True, chunk_rows=2)
+
+    # 1.0 holds for 2 s, 10.0 for 28 s; the last sample has no duration yet
+    np.testing.assert_allclose(stats["Mean"], (2 * 1.0 + 28 * 10.0) / 30)
+    assert stats["Count"] == 4
@@ -0,0 +1,124 @@
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+from logic import data_sources, rate_control
+from logic.data_loaders import fetch_frame
+from logic.data_sources import InjectedThrottle, ReplaySource, SyntheticSource, TagExtent, set_data_source, write_replay
+from logic.rate_control import AdaptiveLimiter
+from logic.tag_catalog import TagCatalog, get_tag_catalog
+from logic.tag_maps import get_rig_tags
+
+
+def test_clip_keeps_ranges_past_the_lookup():
+    extent = TagExtent(True, checked_ms=10_000, first_ms=1_000, last_ms=5_000, sample_s=1.0)
+    assert extent.clip(0, 500) is None
+    assert extent.clip(0, 2_000) == (1_000, 2_000)
+    assert extent.clip(6_000, 9_000) is None  # looked up after: nothing there
+    assert extent.clip(6_000, 20_000) == (6_000, 20_000)  # may have new data
+    assert TagExtent(False, checked_ms=0).clip(0, 1) is None
+
+
+class CountingReplay(ReplaySource):
+    def __init__(self, root):
+        super().__init__(root)
+        self.calls = []
+
+    def retrieve(self, external_id, start, end):
+        self.calls.append((external_id, start, end))
+        return super().retrieve(external_id, start, end)
+
+
+def test_fetches_skip_dead_tags_and_clip_to_extent(tmp_path):
+    index = pd.date_range("2024-01-02", periods=100, freq="min")
+    write_replay(str(tmp_path), "live", pd.DataFrame({"live": range(100)}, index=index))
+    source = CountingReplay(str(tmp_path))
+    previous = set_data_source(source)
+    try:
+        catalog = get_tag_catalog()
+        catalog.refresh(["live", "dead"], wait=True)
+        assert not catalog.has_data("dead") and catalog.has_data("live")
+
+        day1, day3 = pd.Timestamp("2024-01-01").value // 10**6, pd.Timestamp("2024-01-03").value // 10**6
+        assert fetch_frame("dead", day1, day3).empty
+        assert fetch_frame("live", day1 - 10**6, day1).empty
+        assert len(fetch_frame("live", day1, day3)) == 100
+        assert source.calls == [("live", index[0].value // 10**6, index[-1].value // 10**6)]
+        assert catalog.stats()["skipped"] == 2
+    finally:
+        set_data_source(previous)
+
+
+def test_synthetic_extent_bounds_its_samples():
+    source = SyntheticSource(start="2024-01-01", days=3, sample_hz=0.1)
+    for ext in [get_rig_tags("TransoceanDPS")["vol_ext"], *get_rig_tags("TransoceanDPS")["valve_map"].values()]:
+        extent = source.extent(ext)
+        df = source.retrieve(ext, 0, 2**42)
+        assert extent.first_ms <= df.index[0].value // 10**6
+        assert df.index[-1].value // 10**6 <= extent.last_ms
+
+
+class ThrottledOnce(ReplaySource):
+    def __init__(self, root):
+        super().__init__(root)
+        self.lookups = 0
+
+    def extent(self, external_id):
+        self.lookups += 1
+        if self.lookups == 1:
+            raise InjectedThrottle("slow down", retry_after=0.01)
+        return super().extent(external_id)
+
+
+def test_lookup_is_throttled_and_retried_by_the_limiter(tmp_path, monkeypatch):
+    limiter = AdaptiveLimiter()
+    monkeypatch.setattr(rate_control, "_limiter", limiter)
+    monkeypatch.setattr(rate_control, "backoff_delay", lambda *args: 0.0)
+    write_replay(str(tmp_path), "live", pd.DataFrame({"live": [1.0]}, index=pd.DatetimeIndex(["2024-01-02"])))
+    source = ThrottledOnce(str(tmp_path))
+    extent = TagCatalog(source).lookup("live")
+    assert extent is not None and extent.has_data
+    assert source.lookups == 2
+    assert limiter.throttled == 1 and limiter.in_flight == 0
+
+
+def _mock_cognite(known, first_ms, last_ms, counts):
+    from cognite.client._sync_api.datapoints import SyncDatapointsAPI
+    from cognite.client._sync_api.time_series import SyncTimeSeriesAPI
+    from cognite.client.data_classes.datapoints import Datapoints, LatestDatapoint
+
+    # Autospecced on the installed SDK, so unsupported kwargs raise TypeError
+    client = mock.Mock()
+    client.time_series = mock.create_autospec(SyncTimeSeriesAPI, instance=True)
+    client.time_series.data = mock.create_autospec(SyncDatapointsAPI, instance=True)
+    client.time_series.retrieve.side_effect = (
+        lambda external_id=None, **kw: mock.Mock(external_id=external_id) if external_id in known else None
+    )
+
+    def retrieve(external_id=None, aggregates=None, **kw):
+        if aggregates == "count":
+            return Datapoints(id=1, is_string=False, is_step=False, type="numeric", external_id=external_id,
+                              timestamp=list(range(len(counts))), count=counts)
+        return Datapoints(id=1, is_string=False, is_step=False, type="numeric", external_id=external_id,
+                          timestamp=[first_ms], value=[1.0])
+
+    client.time_series.data.retrieve.side_effect = retrieve
+    client.time_series.data.retrieve_latest.return_value = LatestDatapoint._load({
+        "id": 1, "externalId": "live", "isString": False, "isStep": False, "type": "numeric",
+        "datapoints": [{"timestamp": last_ms, "value": 2.0}],
+    })
+    return client
+
+
+def test_cognite_extent_with_the_installed_sdk(monkeypatch):
+    first_ms, last_ms = 1_700_000_000_000, 1_700_100_000_123
+    client = _mock_cognite({"live"}, first_ms, last_ms, counts=[360] * 24)
+    monkeypatch.setattr(data_sources, "get_cognite_client", lambda: client)
+    catalog = TagCatalog(data_sources.CogniteSource())
+
+    extent = catalog.lookup("live")
+    assert (extent.first_ms, extent.last_ms) == (first_ms, last_ms)
+    assert extent.sample_s == pytest.approx(86_400 / (360 * 24 - 1))
+    dead = catalog.lookup("dead")
+    assert dead is not None and not dead.exists
@@ -0,0 +1,19 @@
+import pandas as pd
+
+from logic.timeaxis import canonical_index, ns_to_index, to_ns
+
+
+def test_canonical_index_sorts_and_drops_tz():
+    idx = pd.DatetimeIndex(["2024-01-01 02:00", "2024-01-01 01:00"], tz="Europe/Oslo")
+    df = canonical_index(pd.DataFrame({"v": [2.0, 1.0]}, index=idx))
+
+    assert df.index.tz is None and df.index.is_monotonic_increasing
+    assert df["v"].tolist() == [1.0, 2.0]
+    assert str(df.index[0]) == "2024-01-01 00:00:00"
+
+
+def test_epoch_index_is_milliseconds_and_round_trips():
+    df = canonical_index(pd.DataFrame({"v": [1.0]}, index=[1_704_067_200_000]))
+    ns = to_ns(df.index)
+    assert ns[0] == 1_704_067_200_000 * 1_000_000
+    assert str(ns_to_index(ns, utc=True)[0]) == "2024-01-01 00:00:00+00:00"
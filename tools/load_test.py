@@ -0,0 +1,277 @@
+# tools/load_test.py
+#
+# Concurrent-session load test: drives app.py headlessly with Streamlit's
+# AppTest against a replay (or synthetic) data source and reports rerun
+# latency percentiles, peak RSS and upstream fetch counts.
+#
+#   python -m tools.load_test --replay replay_data --sessions 20
+#   python -m tools.load_test --synthetic --sessions 10 --latency-ms 50 --json
+#
+# Each session opens the app on its rig/page (the landing run, with the
+# sidebar's default dates), picks its own date range (the load run) and then
+# reruns --reruns times without changing anything. Sessions share one
+# process, so st.cache_data and the fetch caches behave as on a server;
+# caches are cleared first unless --warm is given. Landing runs error out when
+# a replay set does not cover the sidebar's default range (last 60 days);
+# those errors are counted separately from the load and rerun phases.
+
+import argparse
+import contextlib
+import glob
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test
+from streamlit.testing.v1.util import patch_config_options
+
+from logic.data_sources import FaultInjectingSource, ReplaySource, SyntheticSource, set_data_source
+from logic.rate_control import get_limiter
+from ui.pages import PAGES as APP_PAGES
+
+logger = logging.getLogger("load_test")
+
+APP = str(Path(__file__).resolve().parent.parent / "app.py")
+
+# Query-param codes app.py understands, by rig name
+RIG_CODES = {
+    "TransoceanDPS": "TODPS",
+    "TransoceanDTH": "TODTH",
+    "TransoceanDPT": "TODPT",
+    "Drillmax": "STDMX",
+}
+PAGES = list(APP_PAGES)
+
+
+@dataclass
+class SessionPlan:
+    session: int
+    rig: str
+    page: str
+    start: pd.Timestamp
+    end: pd.Timestamp
+
+
+@dataclass
+class SessionResult:
+    plan: SessionPlan
+    timings: dict = field(default_factory=dict)  # phase -> [seconds]
+    errors: dict = field(default_factory=dict)  # phase -> exception count
+
+
+def replay_extent(root):
+    """(first, last) timestamp over all replay files, for picking ranges."""
+    lo, hi = None, None
+    for path in glob.glob(os.path.join(root, "*.parquet")):
+        ts = pd.read_parquet(path, columns=["timestamp"])["timestamp"]
+        if ts.empty:
+            continue
+        lo = ts.min() if lo is None else min(lo, ts.min())
+        hi = ts.max() if hi is None else max(hi, ts.max())
+    if lo is None:
+        raise SystemExit(f"No replay files under {root}")
+    return pd.Timestamp(lo), pd.Timestamp(hi)
+
+
+def plan_sessions(n, rigs, pages, extent, span_days, seed) -> list[SessionPlan]:
+    rng = np.random.default_rng(seed)
+    first, last = extent[0].normalize(), extent[1].normalize()
+    plans = []
+    for i in range(n):
+        days = int(rng.choice(span_days))
+        latest = max(first, last - pd.Timedelta(days=days - 1))
+        offset = int(rng.integers(0, (latest - first).days + 1))
+        start = first + pd.Timedelta(days=offset)
+        end = min(last, start + pd.Timedelta(days=days - 1))
+        plans.append(SessionPlan(i, str(rng.choice(rigs)), str(rng.choice(pages)), start, end))
+    return plans
+
+
+def _timed_run(at, result, phase):
+    t0 = time.perf_counter()
+    at.run()
+    result.timings.setdefault(phase, []).append(time.perf_counter() - t0)
+    result.errors[phase] = result.errors.get(phase, 0) + len(at.exception)
+
+
+def run_session(plan: SessionPlan, reruns: int, timeout: float) -> SessionResult:
+    result = SessionResult(plan)
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.query_params["rig"] = RIG_CODES[plan.rig]
+    at.query_params["page"] = plan.page
+    _timed_run(at, result, "landing")
+    at.date_input[0].set_value(plan.start.date())
+    at.date_input[1].set_value(plan.end.date())
+    _timed_run(at, result, "load")
+    for _ in range(reruns):
+        _timed_run(at, result, "rerun")
+    return result
+
+
+@contextlib.contextmanager
+def shared_runtime():
+    """One stand-in Runtime for all sessions, as on a real server.
+
+    AppTest installs its own mock Runtime as the process-wide singleton for
+    each run and clears it afterwards, so concurrent runs pull it out from
+    under each other. Point AppTest's writes at a throwaway subclass and
+    keep a single shared stand-in installed on the real class instead. The
+    same goes for the ``global.appTest`` option each run patches and
+    restores: hold it on for the whole test.
+    """
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    previous = Runtime._instance
+    Runtime._instance = runtime
+    try:
+        with patch_config_options({"global.appTest": True}), \
+                patch.object(app_test, "Runtime", type("_AppTestRuntime", (Runtime,), {})):
+            yield runtime
+    finally:
+        Runtime._instance = previous
+
+
+class RssSampler(threading.Thread):
+    """Samples this process's resident set size every ``interval`` seconds."""
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = self.start_rss = current_rss()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.peak = max(self.peak, current_rss())
+
+
+def current_rss() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Non-Linux: ru_maxrss (KiB on Linux, bytes on macOS) is the best we have
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+def summarize(results, source, wall, sampler) -> dict:
+    phases = {}
+    for phase in ("landing", "load", "rerun"):
+        values = [t for r in results for t in r.timings.get(phase, [])]
+        if values:
+            phases[phase] = {
+                "runs": len(values),
+                "p50_s": round(float(np.percentile(values, 50)), 3),
+                "p95_s": round(float(np.percentile(values, 95)), 3),
+                "max_s": round(max(values), 3),
+                "errors": sum(r.errors.get(phase, 0) for r in results),
+            }
+    return {
+        "sessions": len(results),
+        "wall_s": round(wall, 2),
+        "phases": phases,
+        "rss_start_mb": round(sampler.start_rss / 2**20, 1),
+        "rss_peak_mb": round(sampler.peak / 2**20, 1),
+        "upstream_fetches": source.calls,
+        "upstream_failures": source.failures,
+        "upstream_throttled": source.throttled,
+        "upstream_peak_in_flight": source.peak_in_flight,
+        "concurrency_limit_end": get_limiter().stats()["limit"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive concurrent app sessions with AppTest and report latency and memory.")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--replay", metavar="DIR", help="replay directory (see tools.make_replay)")
+    src.add_argument("--synthetic", action="store_true", help="generate data with logic/synthetic.py")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, help="sessions in flight at once (default: all)")
+    parser.add_argument("--reruns", type=int, default=3, help="unchanged reruns per session after loading")
+    parser.add_argument("--rigs", nargs="+", default=["TransoceanDPS"], choices=list(RIG_CODES))
+    parser.add_argument("--pages", nargs="+", default=PAGES, choices=PAGES)
+    parser.add_argument("--span-days", nargs="+", type=int, default=[1, 7, 14], help="date-range lengths to mix")
+    parser.add_argument("--synthetic-days", type=float, default=30)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added per-fetch latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrent", type=int, help="simulated API rate limit: 429 beyond this many calls in flight")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Retry-After (s) sent with simulated 429s")
+    parser.add_argument("--timeout", type=float, default=600, help="per-run AppTest timeout (s)")
+    parser.add_argument("--warm", action="store_true", help="keep st.cache_data from earlier runs in this process")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.replay:
+        inner = ReplaySource(args.replay)
+        extent = replay_extent(args.replay)
+    else:
+        # Cover the sidebar's default range too, so landing runs find data
+        days = max(args.synthetic_days, 61)
+        start = pd.Timestamp.today().normalize() - pd.Timedelta(days=60)
+        inner = SyntheticSource(start=str(start.date()), days=days, seed=args.seed)
+        extent = (start, start + pd.Timedelta(days=days - 1))
+    source = FaultInjectingSource(
+        inner, args.latency_ms, args.jitter_ms, args.failure_rate, args.seed,
+        max_concurrent=args.max_concurrent, retry_after_s=args.retry_after,
+    )
+    previous = set_data_source(source)
+
+    plans = plan_sessions(args.sessions, args.rigs, args.pages, extent, args.span_days, args.seed)
+    sampler = RssSampler()
+    sampler.start()
+    t0 = time.perf_counter()
+    try:
+        with shared_runtime(), ThreadPoolExecutor(max_workers=args.concurrency or args.sessions) as pool:
+            if not args.warm:
+                st.cache_data.clear()
+            results = list(pool.map(lambda p: run_session(p, args.reruns, args.timeout), plans))
+    finally:
+        wall = time.perf_counter() - t0
+        sampler.stop()
+        set_data_source(previous)
+
+    summary = summarize(results, source, wall, sampler)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    print(f"{summary['sessions']} sessions in {summary['wall_s']} s "
+          f"(concurrency {args.concurrency or args.sessions}, {args.reruns} reruns each)")
+    print(f"{'phase':<8} {'runs':>5} {'p50 s':>8} {'p95 s':>8} {'max s':>8} {'errors':>7}")
+    for phase, s in summary["phases"].items():
+        print(f"{phase:<8} {s['runs']:>5} {s['p50_s']:>8.3f} {s['p95_s']:>8.3f} {s['max_s']:>8.3f} {s['errors']:>7}")
+    print(f"RSS {summary['rss_start_mb']} MB at start, {summary['rss_peak_mb']} MB peak")
+    print(f"Upstream fetches {summary['upstream_fetches']} ({summary['upstream_failures']} failed, "
+          f"{summary['upstream_throttled']} throttled, peak {summary['upstream_peak_in_flight']} in flight, "
+          f"concurrency limit {summary['concurrency_limit_end']} at the end)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+# tools/make_replay.py
+#
+# Record a replay set (one Parquet file per external id) for DATA_SOURCE=replay.
+#
+#   python -m tools.make_replay --rig TransoceanDPS --start 2024-01-01 --end 2024-01-31 --out replay_data
+#   python -m tools.make_replay --rig TransoceanDPS --synthetic --days 30 --out replay_data
+#
+# Without --synthetic the tags are pulled from CDF with the usual credentials,
+# so a slow page can be captured once and reproduced offline.
+
+import argparse
+import logging
+import sys
+
+import pandas as pd
+
+from logic.data_sources import CogniteSource, SyntheticSource, write_replay
+from logic.tag_catalog import rig_external_ids
+
+logger = logging.getLogger("make_replay")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a replay data set for DATA_SOURCE=replay.")
+    parser.add_argument("--rig", required=True)
+    parser.add_argument("--out", default="replay_data")
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--end", help="inclusive end date (live capture)")
+    parser.add_argument("--synthetic", action="store_true", help="generate with logic/synthetic.py instead of CDF")
+    parser.add_argument("--days", type=float, default=30, help="synthetic range length")
+    parser.add_argument("--hz", type=float, default=0.1, help="synthetic analog sample rate")
+    parser.add_argument("--extra", nargs="*", default=[], help="additional external ids (e.g. analog channels)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    start = pd.Timestamp(args.start)
+    if args.synthetic:
+        source = SyntheticSource(start=args.start, days=args.days, sample_hz=args.hz)
+        end = start + pd.Timedelta(days=args.days)
+    else:
+        if not args.end:
+            parser.error("--end is required for a live capture")
+        source = CogniteSource()
+        end = pd.Timestamp(args.end) + pd.Timedelta(days=1)
+    sm, em = int(start.timestamp() * 1000), int(end.timestamp() * 1000) - 1
+
+    for ext in rig_external_ids(args.rig) + args.extra:
+        df = source.retrieve(ext, sm, em)
+        if df.empty or df.shape[1] == 0:
+            logger.warning(f"[REPLAY] No data for {ext}, skipped")
+            continue
+        path = write_replay(args.out, ext, df)
+        logger.info(f"[REPLAY] {len(df):>9,} rows -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
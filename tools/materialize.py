@@ -0,0 +1,108 @@
+# tools/materialize.py
+#
+# Batch job for the materialized analytics store (logic/event_store.py): runs
+# the dashboard pipeline, pressure series and EDS analysis per rig and month
+# in a process pool and writes the Parquet partitions and the manifest.
+#
+#   python -m tools.materialize --from 2024-01 --to 2024-06
+#   python -m tools.materialize --rigs Drillmax --from 2024-03 --to 2024-03 --force
+#   python -m tools.materialize --synthetic --from 2024-01 --to 2024-02 --store /tmp/store
+#
+# Months already in the manifest (for the same parameters) are skipped unless
+# --force is given, and months whose padded range reaches into the future
+# are never written: the app computes those live. Workers only write their
+# own partition files; the manifest is updated by this process as they
+# finish, so an interrupted run keeps what completed.
+
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from logic.data_sources import use_source_spec
+from logic.depletion import DEFAULT_CATEGORY_WINDOWS
+from logic.event_store import DEFAULT_PAD_DAYS, EventStore, is_settled, materialize, months_between, params_key
+from logic.tag_maps import RIGS
+
+logger = logging.getLogger("materialize")
+
+
+def _init_worker(source_spec):
+    # Each worker builds its own source (spawned workers do not inherit it)
+    logging.basicConfig(level=logging.WARNING)
+    use_source_spec(source_spec)
+
+
+def plan_jobs(store, rigs, months, pad_days, force=False, now=None):
+    """(rig, month) pairs to compute, and the months skipped as unsettled."""
+    params = params_key(DEFAULT_CATEGORY_WINDOWS)
+    jobs, unsettled = [], []
+    for month in months:
+        if not is_settled(month, pad_days, now):
+            unsettled.append(month)
+            continue
+        for rig in rigs:
+            entry = store.entry(rig, month)
+            if force or entry is None or entry.get("params") != params:
+                jobs.append((rig, month))
+    return jobs, unsettled
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute rig analytics into the Parquet event store.")
+    parser.add_argument("--from", dest="first", required=True, help="first month (YYYY-MM)")
+    parser.add_argument("--to", dest="last", required=True, help="last month (YYYY-MM), inclusive")
+    parser.add_argument("--rigs", nargs="+", default=RIGS, choices=RIGS)
+    parser.add_argument("--store", help="store directory (default: EVENT_STORE_DIR)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--pad-days", type=int, default=DEFAULT_PAD_DAYS,
+                        help="days computed on each side of a month for boundary windows")
+    parser.add_argument("--force", action="store_true", help="recompute months already in the manifest")
+    src = parser.add_mutually_exclusive_group()
+    src.add_argument("--replay", metavar="DIR", help="read a replay directory instead of DATA_SOURCE")
+    src.add_argument("--synthetic", action="store_true", help="generate data with logic/synthetic.py")
+    parser.add_argument("--synthetic-start", default="2024-01-01")
+    parser.add_argument("--synthetic-days", type=float, default=90)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.replay:
+        source_spec = ("replay", args.replay)
+    elif args.synthetic:
+        source_spec = ("synthetic", {"start": args.synthetic_start, "days": args.synthetic_days})
+    else:
+        source_spec = ("config", None)
+
+    store = EventStore(args.store)
+    jobs, unsettled = plan_jobs(store, args.rigs, months_between(args.first, args.last), args.pad_days, args.force)
+    if unsettled:
+        logger.info(f"[STORE] Skipping {', '.join(unsettled)}: data not final yet (computed live by the app)")
+    if not jobs:
+        logger.info("[STORE] Nothing to do")
+        return 0
+
+    t0 = time.perf_counter()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(source_spec,)) as pool:
+        futures = {
+            pool.submit(materialize, rig, month, args.store, args.pad_days): (rig, month)
+            for rig, month in jobs
+        }
+        for fut in as_completed(futures):
+            rig, month = futures[fut]
+            try:
+                entry = fut.result()
+            except Exception as e:
+                failed += 1
+                logger.error(f"[STORE] {rig} {month} failed: {e}")
+                continue
+            store.record([entry])
+            rows = ", ".join(f"{k} {v:,}" for k, v in entry["rows"].items())
+            logger.info(f"[STORE] {rig} {month} in {entry['seconds']}s: {rows}")
+    logger.info(f"[STORE] {len(jobs) - failed}/{len(jobs)} partitions in {time.perf_counter() - t0:.1f}s -> {store.root}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
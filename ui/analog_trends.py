@@ -1,4 +1,8 @@
 # ui/analog_trends.py
+import os
+import tempfile
+import weakref
+
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -6,8 +10,16 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 from utils.themes import get_plotly_template
-from logic.analog_trends_loader import load_analog_map, build_tag
-from logic.data_loaders import get_raw_df
+from config import ANALOG_RAW_MAX_DAYS, ROLLUP_MIN_POINTS, ROLLUPS
+from logic.analog_trends_loader import get_analog_catalog
+from logic.data_loaders import get_raw_dfs
+from logic.aligned_table import AlignedTable, channel_arrays
+from logic.export import export_aligned, export_long
+from logic.rollups import choose_level, rollup_frame
+from logic.streaming_stats import channel_stats
+from logic.tag_catalog import get_tag_catalog
+from logic.timeaxis import NS_PER_MS, ns_to_index, to_ns
+from ui_components import render_profile
 
 
 # ---------- helpers ----------
@@ -22,50 +34,72 @@ def _to_ms_utc(ts):
     t = t.tz_localize("UTC") if t.tzinfo is None else t.tz_convert("UTC")
     return int(t.timestamp() * 1000)
 
-def _normalize_timeseries_df(obj) -> pd.DataFrame:
-    if obj is None:
+def _channel_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    """get_raw_df output (canonical naive-UTC index) as a timestamp/value
+    frame with UTC-aware timestamps for display."""
+    if raw is None or raw.empty:
         return pd.DataFrame(columns=["timestamp", "value"])
-    if isinstance(obj, pd.Series):
-        df = pd.DataFrame({
-            "timestamp": pd.to_datetime(obj.index, utc=True, errors="coerce"),
-            "value": pd.to_numeric(obj.values, errors="coerce"),
-        })
-        return df.dropna(subset=["timestamp", "value"]).sort_values("timestamp")
+    df = pd.DataFrame({
+        "timestamp": ns_to_index(to_ns(raw.index), utc=True),
+        "value": pd.to_numeric(raw["value"], errors="coerce").to_numpy(),
+    })
+    return df.dropna(subset=["value"])
 
-    df = obj.copy()
-    if df.empty:
-        return pd.DataFrame(columns=["timestamp", "value"])
 
-    if pd.api.types.is_datetime64_any_dtype(df.index):
-        df = df.reset_index().rename(columns={df.index.name or "index": "timestamp"})
-
-    lower = {c.lower(): c for c in df.columns}
-    ts_col = next((lower[c] for c in ("timestamp","time","datetime","date","ts") if c in lower), None)
-    if ts_col is None:
-        ts_col = next((c for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])), None)
-    if ts_col is None:
-        ts_col = next((c for c in df.columns if "time" in c.lower() or "date" in c.lower()), None)
-    if ts_col is None:
-        return pd.DataFrame(columns=["timestamp","value"])
-
-    val_col = next((lower[c] for c in ("value","val","y","v") if c in lower), None)
-    if val_col is None:
-        val_col = next((c for c in df.columns if c != ts_col and pd.api.types.is_numeric_dtype(df[c])), None)
-    if val_col is None:
-        return pd.DataFrame(columns=["timestamp","value"])
-
-    d = df[[ts_col, val_col]].rename(columns={ts_col:"timestamp", val_col:"value"})
-
-    if pd.api.types.is_numeric_dtype(d["timestamp"]):
-        s = pd.to_numeric(d["timestamp"], errors="coerce")
-        m = s.max()
-        unit = "ns" if m>1e16 else "ms" if m>1e12 else "s" if m>1e10 else "ms"
-        d["timestamp"] = pd.to_datetime(s, unit=unit, utc=True, errors="coerce")
-    else:
-        d["timestamp"] = pd.to_datetime(d["timestamp"], utc=True, errors="coerce")
+# ---------- rollups ----------
+RESOLUTIONS = {"Auto": "auto", "Raw": None, "1 min": "1min", "1 h": "1h", "1 day": "1D"}
+ROLLUP_STATS = ["Mean", "Max", "Min", "First", "Last", "Count"]
 
-    d["value"] = pd.to_numeric(d["value"], errors="coerce")
-    return d.dropna(subset=["timestamp","value"]).sort_values("timestamp")
+
+def _resolution_level(choice: str, sm: int, em: int):
+    """Rollup level for the selected resolution; None means raw samples."""
+    level = RESOLUTIONS[choice]
+    if level != "auto":
+        return level
+    if not ROLLUPS or em - sm < ANALOG_RAW_MAX_DAYS * 86_400_000:
+        return None
+    return choose_level(sm * NS_PER_MS, (em + 1) * NS_PER_MS, ROLLUP_MIN_POINTS) or "1min"
+
+
+def _rollup_frames(tags: dict, sm: int, em: int, level: str) -> dict:
+    out = {}
+    for label, tag in tags.items():
+        df = rollup_frame(tag, sm, em, level)
+        if not df.empty:
+            df.index = ns_to_index(to_ns(df.index), utc=True)
+            out[label] = df
+    return out
+
+
+def _rollup_stats(rollups: dict) -> pd.DataFrame:
+    rows = []
+    for label, df in rollups.items():
+        count = int(df["count"].sum())
+        rows.append({
+            "channel": label,
+            "Mean": float((df["mean"] * df["count"]).sum() / count) if count else np.nan,
+            "Max": df["max"].max(), "Min": df["min"].min(),
+            "First": df["first"].iloc[0], "Last": df["last"].iloc[-1],
+            "Count": count,
+        })
+    return pd.DataFrame(rows, columns=["channel"] + ROLLUP_STATS)
+
+
+def _add_rollup_traces(fig, rollups: dict, right_set: set, graph_type: str) -> None:
+    # Mean line with the bucket min/max as a shaded band
+    for name, df in rollups.items():
+        use_right = name in right_set
+        x = df.index
+        fig.add_trace(go.Scatter(x=x, y=df["max"], mode="lines", line=dict(width=0),
+                                 legendgroup=name, showlegend=False, hoverinfo="skip"),
+                      row=1, col=1, secondary_y=use_right)
+        fig.add_trace(go.Scatter(x=x, y=df["min"], mode="lines", line=dict(width=0), fill="tonexty",
+                                 legendgroup=name, showlegend=False, name=f"{name} (min/max)", opacity=0.3),
+                      row=1, col=1, secondary_y=use_right)
+        fig.add_trace(go.Scatter(x=x, y=df["mean"], name=name, legendgroup=name,
+                                 mode=("lines+markers" if graph_type == "Scatter" else "lines"),
+                                 connectgaps=False),
+                      row=1, col=1, secondary_y=use_right)
 
 
 # ---------- LTTB downsampling ----------
@@ -111,40 +145,225 @@ def _downsample_lttb(df: pd.DataFrame, channel_col: str, max_pts: int = 15000) -
 
 
 # ---------- tables & summary ----------
-def _table_align_timestamps(raw_df: pd.DataFrame) -> pd.DataFrame:
+STAT_COLUMNS = ["Mean", "Median", "Max", "Min", "Std", "Count"]
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _channel_summary(tag: str, sm: int, em: int, time_weighted: bool, n: int, last: int,
+                     _ts: np.ndarray, _values: np.ndarray) -> dict:
+    # Keyed on (tag, range) plus the sample count and last timestamp, so new
+    # samples in a range ending today refresh it; the arrays are not hashed
+    return channel_stats(_ts, _values, time_weighted=time_weighted)
+
+
+def _summary_full_range(channels: dict, tags: dict, sm: int, em: int, time_weighted: bool) -> pd.DataFrame:
+    rows = []
+    for label, (ts, vals) in channels.items():
+        last = int(ts[-1]) if len(ts) else 0
+        stats = _channel_summary(tags[label], sm, em, time_weighted, len(ts), last, ts, vals)
+        rows.append({"channel": label, **stats})
+    return pd.DataFrame(rows, columns=["channel"] + STAT_COLUMNS)
+
+
+def _cached_channels(raw_df: pd.DataFrame, table_key: tuple) -> dict:
+    cached = st.session_state.get("analog_channel_arrays")
+    if cached is None or cached[0] != table_key:
+        cached = (table_key, channel_arrays(raw_df))
+        st.session_state["analog_channel_arrays"] = cached
+    return cached[1]
+
+
+def _cached_aligned(channels: dict, mode: str, table_key: tuple, day_start: pd.Timestamp, day_end: pd.Timestamp) -> AlignedTable:
+    cache_key = (mode,) + table_key
+    cached = st.session_state.get("analog_aligned_table")
+    if cached is None or cached[0] != cache_key:
+        aligned = AlignedTable(
+            channels, mode=mode,
+            start=day_start.tz_localize("UTC"), end=day_end.tz_localize("UTC"),
+        )
+        cached = (cache_key, aligned)
+        st.session_state["analog_aligned_table"] = cached
+    return cached[1]
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class _ExportFile:
+    """Temp file of a prepared export, held in the session state. It is
+    removed when replaced, when the session (the only holder) ends and is
+    collected, or at exit."""
+
+    def __init__(self, suffix, file_name):
+        fd, self.path = tempfile.mkstemp(prefix="analog_export_", suffix=suffix)
+        os.close(fd)
+        self.file_name = file_name
+        self.rows = 0
+        self.remove = weakref.finalize(self, _remove_file, self.path)
+
+
+def _render_export(channels: dict, aligned: AlignedTable, t_from, t_to) -> None:
+    st.markdown("#### Export")
+    e1, e2, e3 = st.columns([0.2, 0.2, 0.6])
+    with e1:
+        layout = st.selectbox("Layout", ["Aligned", "Raw (long)"], key="analog_export_layout")
+    with e2:
+        fmt = st.selectbox("Format", ["Parquet", "CSV"], key="analog_export_format").lower()
+    with e3:
+        st.write("")
+        prepare = st.button("Prepare export", key="analog_export_prepare")
+
+    if prepare:
+        prev = st.session_state.pop("analog_export_file", None)
+        if prev is not None:
+            prev.remove()
+        # Chunks go straight to disk, so the full aligned frame never exists
+        # in memory. The download button still reads the finished file whole
+        # (st.download_button takes bytes or a file, not a stream).
+        export = _ExportFile(f".{fmt}", f"analog_trends_{layout.split()[0].lower()}.{fmt}")
+        with open(export.path, "wb") as fh:
+            if layout == "Aligned":
+                export.rows = export_aligned(aligned, fh, fmt=fmt, t_from=t_from, t_to=t_to)
+            else:
+                export.rows = export_long(channels, fh, fmt=fmt, t_from=t_from, t_to=t_to)
+        st.session_state["analog_export_file"] = export
+
+    export = st.session_state.get("analog_export_file")
+    if export is not None and os.path.exists(export.path):
+        with open(export.path, "rb") as fh:
+            st.download_button(
+                f"Download {export.file_name} ({export.rows:,} rows)",
+                data=fh,
+                file_name=export.file_name,
+                mime="text/csv" if export.file_name.endswith(".csv") else "application/octet-stream",
+                key="analog_export_download",
+            )
+
+
+def _render_table(raw_df: pd.DataFrame, table_key: tuple, day_start: pd.Timestamp, day_end: pd.Timestamp) -> None:
+    align_choice = st.selectbox(
+        "Table Alignment",
+        options=["Align to timestamps", "Resample to 1s (ffill/bfill)", "No alignment"],
+        index=0,
+    )
     if raw_df.empty:
-        return pd.DataFrame()
-    wide = (
-        raw_df.pivot_table(index="timestamp", columns="channel", values="value", aggfunc="mean")
-        .sort_index()
+        render_profile.dataframe(st, pd.DataFrame(columns=["timestamp"]), use_container_width=True, hide_index=True)
+        return
+
+    c1, c2, c3 = st.columns([0.2, 0.2, 0.6])
+    with c1:
+        page_size = st.selectbox("Rows per page", [100, 500, 1000, 5000], index=1, key="analog_table_page_size")
+    with c3:
+        use_filter = st.checkbox("Filter by time", value=False, key="analog_table_filter")
+        t_from = t_to = None
+        if use_filter:
+            t_from, t_to = st.slider(
+                "Time range (UTC)",
+                min_value=day_start.to_pydatetime(),
+                max_value=day_end.to_pydatetime(),
+                value=(day_start.to_pydatetime(), day_end.to_pydatetime()),
+                step=pd.Timedelta(seconds=1).to_pytimedelta(),
+                format="YYYY-MM-DD HH:mm:ss",
+                key="analog_table_time_range",
+            )
+            t_from, t_to = pd.Timestamp(t_from, tz="UTC"), pd.Timestamp(t_to, tz="UTC")
+
+    channels = _cached_channels(raw_df, table_key)
+    mode = "grid" if align_choice.startswith("Resample to 1s") else "timestamps"
+    aligned = _cached_aligned(channels, mode, table_key, day_start, day_end)
+
+    if align_choice.startswith("No alignment"):
+        long_df = raw_df.sort_values("timestamp", kind="stable")
+        if use_filter:
+            long_df = long_df[(long_df["timestamp"] >= t_from) & (long_df["timestamp"] <= t_to)]
+        n_rows = len(long_df)
+    else:
+        lo, hi = aligned.row_range(t_from, t_to)
+        n_rows = hi - lo
+
+    n_pages = max(1, -(-n_rows // page_size))
+    # A narrower selection can leave the stored page past the end
+    if st.session_state.get("analog_table_page", 1) > n_pages:
+        st.session_state["analog_table_page"] = 1
+    with c2:
+        page_no = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key="analog_table_page")
+    offset = (min(int(page_no), n_pages) - 1) * page_size
+
+    if align_choice.startswith("No alignment"):
+        page_df = long_df.iloc[offset:offset + page_size]
+    else:
+        page_df = aligned.page(offset, page_size, t_from, t_to)
+
+    st.caption(f"{n_rows:,} rows · page {min(int(page_no), n_pages)} of {n_pages:,}")
+    render_profile.dataframe(st, page_df, use_container_width=True, hide_index=True)
+
+    _render_export(channels, aligned, t_from, t_to)
+
+
+def _show_figure(fig, tpl, use_dual_y: bool) -> None:
+    fig.update_layout(
+        template=tpl,
+        height=620,
+        margin=dict(l=44, r=60, t=36, b=36),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0),
+        uirevision="analog-trends",
+    )
+    fig.update_xaxes(title_text="timestamp", rangeslider_visible=False)
+    fig.update_yaxes(
+        title_text="Value (Left)", secondary_y=False,
+        showline=True, ticks="outside", automargin=True, title_standoff=12
+    )
+    if use_dual_y:
+        fig.update_yaxes(
+            title_text="Value (Right)", secondary_y=True,
+            showline=True, ticks="outside", automargin=True, title_standoff=12,
+            showticklabels=True
+        )
+
+    render_profile.plotly_chart(
+        st,
+        fig,
+        use_container_width=True,
+        config={"scrollZoom": True, "doubleClick": "reset"},
     )
-    wide = wide.ffill().bfill()
-    return wide.reset_index()
 
-def _table_align_1s(raw_df: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
-    if raw_df.empty:
-        return pd.DataFrame()
-    full = pd.date_range(start=start, end=end, freq="1s", tz="UTC")
-    wide = None
-    for ch, g in raw_df.groupby("channel", dropna=False):
-        s = g.set_index("timestamp")["value"].sort_index()
-        s = s.reindex(full).ffill().bfill()
-        col = s.rename(ch).to_frame()
-        wide = col if wide is None else wide.join(col, how="outer")
-    wide = wide.ffill().bfill()
-    return wide.reset_index().rename(columns={"index": "timestamp"})
-
-def _summary_full_range(wide_df: pd.DataFrame) -> pd.DataFrame:
-    if wide_df is None or wide_df.empty:
-        return pd.DataFrame(columns=["channel", "Mean", "Median", "Max", "Min", "Std", "Count"])
-    df = wide_df.copy()
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
-    cols = [c for c in df.columns if c != "timestamp" and pd.api.types.is_numeric_dtype(df[c])]
-    if not cols:
-        return pd.DataFrame(columns=["channel", "Mean", "Median", "Max", "Min", "Std", "Count"])
-    stats = df[cols].agg(["mean", "median", "max", "min", "std", "count"]).T.reset_index()
-    stats.columns = ["channel", "Mean", "Median", "Max", "Min", "Std", "Count"]
-    return stats
+
+def _render_rollups(container, tags: dict, sm: int, em: int, level: str, graph_type: str,
+                    use_dual_y: bool, right_labels: list, template) -> None:
+    """Chart, metrics and table from rollup buckets; raw samples for the
+    range are never held."""
+    with container:
+        with st.spinner("Loading rollups…"):
+            rollups = _rollup_frames(tags, sm, em, level)
+        label = next(k for k, v in RESOLUTIONS.items() if v == level)
+        st.caption(f"Showing {label} rollups: mean line, min/max band. Select Raw resolution for sample-level data.")
+
+        fig = make_subplots(rows=1, cols=1, specs=[[{"secondary_y": True}]])
+        right_set = set(right_labels) if use_dual_y else set()
+        _add_rollup_traces(fig, rollups, right_set, graph_type)
+        _show_figure(fig, template or get_plotly_template(), use_dual_y)
+
+        st.markdown("### Key Metrics")
+        stats = _rollup_stats(rollups)
+        if stats.empty:
+            st.info("No data available for the selected date range.")
+            return
+        for c in ROLLUP_STATS[:-1]:
+            stats[c] = pd.to_numeric(stats[c], errors="coerce").round(3)
+        render_profile.dataframe(st, stats, use_container_width=True, hide_index=True)
+
+        st.markdown("---")
+        st.markdown(f"### Table ({label} buckets)")
+        table = pd.concat(
+            [df.assign(channel=name).rename_axis("timestamp").reset_index() for name, df in rollups.items()],
+            ignore_index=True,
+        )
+        render_profile.dataframe(st, table[["timestamp", "channel", "mean", "min", "max", "first", "last", "count"]],
+                                 use_container_width=True, hide_index=True)
 
 
 # ---------- page ----------
@@ -194,6 +413,10 @@ def render_analog_trends(rig: str, default_start=None, default_end=None, templat
         sm, em = _to_ms_utc(day_start), _to_ms_utc(day_end)
 
         graph_type = st.selectbox("Graph Type", ["Line", "Scatter", "Area"], index=0, key="graph_type_main")
+        resolution = st.selectbox(
+            "Resolution", list(RESOLUTIONS), index=0, key="analog_resolution",
+            help=f"Auto plots raw samples up to {ANALOG_RAW_MAX_DAYS} days and min/mean/max rollups beyond.",
+        )
         use_dual_y = st.checkbox("Use Dual Y Axes", value=False, key="dual_main")
 
         # Keys for axis widgets
@@ -205,34 +428,27 @@ def render_analog_trends(rig: str, default_start=None, default_end=None, templat
             st.session_state.pop(left_key, None)
             st.session_state.pop(right_key, None)
 
-        # Build labels (full)
-        analog_map = load_analog_map(rig)
-        have_map = analog_map is not None and len(analog_map) > 0
-        label_to_channel: dict[str, int] = {}
-
-        if have_map:
-            analog_map = analog_map.copy()
-
-            def _label_row(r):
-                ch = int(r["Ch"])
-                name = r.get("Analog Name")
-                units = r.get("Units")
-                name_str = "" if (name is None or (isinstance(name, float) and pd.isna(name))) else str(name)
-                units_str = "" if (units is None or (isinstance(units, float) and pd.isna(units))) else str(units)
-                base = f"{ch} · {name_str}" if name_str else f"{ch} · Channel"
-                return f"{base} [{units_str}]" if units_str else base
-
-            analog_map["full_label"] = analog_map.apply(_label_row, axis=1)
-            for _, r in analog_map.iterrows():
-                label_to_channel[r["full_label"]] = int(r["Ch"])
-            all_labels = analog_map["full_label"].tolist()
-        else:
+        catalog = get_analog_catalog(rig)
+        if not catalog.has_map:
             st.info("No analog channel map found — select channels directly.")
-            all_labels = [f"Ch {n}" for n in range(1, 100)]
-            label_to_channel = {lbl: int(lbl.split()[-1]) for lbl in all_labels}
+        all_labels = catalog.labels
 
-        # Main selection
+        # Hide channels the tag catalog knows have no data (looked up in
+        # the background; unknown ones stay listed). Keep current picks.
         sel_key = "select_analogs"
+        tag_catalog = get_tag_catalog()
+        if tag_catalog is not None:
+            tag_catalog.refresh(catalog.tag_for_label(lbl) for lbl in all_labels)
+            picked = set(st.session_state.get(sel_key, []))
+            live_labels = [
+                lbl for lbl in all_labels
+                if lbl in picked or tag_catalog.has_data(catalog.tag_for_label(lbl))
+            ]
+            if len(live_labels) < len(all_labels):
+                st.caption(f"{len(all_labels) - len(live_labels)} channels without data hidden")
+            all_labels = live_labels
+
+        # Main selection
         selected_labels = st.multiselect(
             "Select Analogs",
             options=all_labels,
@@ -278,21 +494,24 @@ def render_analog_trends(rig: str, default_start=None, default_end=None, templat
             st.info("Select one or more analogs to plot.")
         return
 
+    tags = {lbl: catalog.tag_for_label(lbl) for lbl in selected_labels}
+    level = _resolution_level(resolution, sm, em)
+    if level is not None:
+        _render_rollups(right, tags, sm, em, level, graph_type, use_dual_y, right_labels, template)
+        return
+
     # Fetch data
-    fetch_list = [(label_to_channel[lbl], lbl) for lbl in selected_labels]
     frames = []
-    for ch, label in fetch_list:
-        tag = build_tag(rig, int(ch))
-        raw = get_raw_df(tag, sm, em)
-        norm = _normalize_timeseries_df(raw)
+    raws = get_raw_dfs((tag, sm, em) for tag in tags.values())
+    for label, raw in zip(tags, raws):
+        norm = _channel_frame(raw)
         if not norm.empty:
             norm["channel"] = label
             frames.append(norm)
     raw_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["timestamp","value","channel"])
 
-    # Table & metrics
-    display_df = _table_align_timestamps(raw_df) if not raw_df.empty else pd.DataFrame(columns=["timestamp"])
-    full_stats = _summary_full_range(display_df)
+    table_key = (rig, sm, em, tuple(selected_labels))
+    channels = _cached_channels(raw_df, table_key)
 
     with right:
         tpl = template or get_plotly_template()
@@ -315,54 +534,21 @@ def render_analog_trends(rig: str, default_start=None, default_end=None, templat
                 row=1, col=1, secondary_y=use_right
             )
 
-        fig.update_layout(
-            template=tpl,
-            height=620,
-            margin=dict(l=44, r=60, t=36, b=36),
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0),
-            uirevision="analog-trends",
-        )
-        fig.update_xaxes(title_text="timestamp", rangeslider_visible=False)
-        fig.update_yaxes(
-            title_text="Value (Left)", secondary_y=False,
-            showline=True, ticks="outside", automargin=True, title_standoff=12
-        )
-        if use_dual_y:
-            fig.update_yaxes(
-                title_text="Value (Right)", secondary_y=True,
-                showline=True, ticks="outside", automargin=True, title_standoff=12,
-                showticklabels=True
-            )
-
-        st.plotly_chart(
-            fig,
-            use_container_width=True,
-            config={"scrollZoom": True, "doubleClick": "reset"},
-        )
+        _show_figure(fig, tpl, use_dual_y)
 
         st.markdown("### Key Metrics")
+        time_weighted = st.checkbox(
+            "Time-weighted", value=False, key="analog_stats_time_weighted",
+            help="Weight each sample by how long it holds until the next one.",
+        )
+        full_stats = _summary_full_range(channels, tags, sm, em, time_weighted)
         if not full_stats.empty:
-            num_cols = ["Mean", "Median", "Max", "Min", "Std", "Count"]
-            for c in num_cols:
-                if c in full_stats.columns:
-                    full_stats[c] = pd.to_numeric(full_stats[c], errors="coerce").round(3)
-            st.dataframe(full_stats, use_container_width=True, hide_index=True)
+            for c in STAT_COLUMNS:
+                full_stats[c] = pd.to_numeric(full_stats[c], errors="coerce").round(3)
+            render_profile.dataframe(st, full_stats, use_container_width=True, hide_index=True)
         else:
             st.info("No data available for the selected date range.")
 
         st.markdown("---")
         st.markdown("### Table")
-        align_choice = st.selectbox(
-            "Table Alignment",
-            options=["Align to timestamps", "Resample to 1s (ffill/bfill)", "No alignment"],
-            index=0,
-        )
-        if not raw_df.empty:
-            if align_choice.startswith("Align to timestamps"):
-                display_df = _table_align_timestamps(raw_df)
-            elif align_choice.startswith("Resample to 1s"):
-                display_df = _table_align_1s(raw_df, day_start.tz_localize("UTC"), day_end.tz_localize("UTC"))
-            else:
-                display_df = _table_align_timestamps(raw_df)
-
-        st.dataframe(display_df, use_container_width=True, hide_index=True)
+        _render_table(raw_df, table_key, day_start, day_end)
@@ -11,6 +11,35 @@ from ui_components.charts import (
     plot_accumulator,
 )
 from ui_components.tables import generate_statistics_table, generate_details_table
+from logic.export import frame_to_bytes
+from logic.memo import fingerprint
+from ui_components import render_profile
+
+
+def _render_details_export(details_table, pod_name):
+    # The file is serialized only when asked for, and dropped once the
+    # table it was built from changes
+    state_key = f"{pod_name}_details_export"
+    d1, d2, d3, _ = st.columns([1, 1, 2, 2])
+    fmt = d1.selectbox(
+        "Format", ["CSV", "Parquet"], key=f"{pod_name}_details_format", label_visibility="collapsed",
+    ).lower()
+    if d2.button("Prepare export", key=f"{pod_name}_details_prepare"):
+        st.session_state[state_key] = (fingerprint(details_table), fmt, frame_to_bytes(details_table, fmt))
+    prepared = st.session_state.get(state_key)
+    if prepared is not None and prepared[0] != fingerprint(details_table):
+        del st.session_state[state_key]
+        prepared = None
+    if prepared is not None:
+        _, fmt, data = prepared
+        slug = pod_name.lower().replace(" ", "_")
+        d3.download_button(
+            f"Download {fmt.upper()}",
+            data=data,
+            file_name=f"valve_event_details_{slug}.{fmt}",
+            mime="text/csv" if fmt == "csv" else "application/octet-stream",
+            key=f"{pod_name}_details_download",
+        )
 
 def _render_kpi(label: str, value: str):
     st.markdown(
@@ -74,7 +103,7 @@ def render_dashboard(
     shared_key = "selected_valve"
 
     for pod_name, tab in zip(pod_names, tabs):
-        with tab:
+        with tab, render_profile.section(pod_name):
             if pod_name == "Composite":
                 st.subheader("Composite – Valve Analytics")
                 pod_events = df.copy()
@@ -152,60 +181,68 @@ def render_dashboard(
             with kcols[6]:
                 _render_kpi(f"Wet Close (>{wet_threshold} psi)", f"{wet_close}")
 
-            st.subheader("Pressure and Flow Distribution by Flow Category")
-            c1, c2, c3, c4 = st.columns(4)
-            po, bo, pc, bc = plot_open_close_pie_bar(sub, flow_colors)
-            c1.plotly_chart(po, use_container_width=True, key=f"{pod_name}_pie_open")
-            c2.plotly_chart(bo, use_container_width=True, key=f"{pod_name}_bar_open")
-            c3.plotly_chart(pc, use_container_width=True, key=f"{pod_name}_pie_close")
-            c4.plotly_chart(bc, use_container_width=True, key=f"{pod_name}_bar_close")
-
-            b1, b2, b3, b4 = st.columns(4)
-            bd_o, bd_c = plot_boxplots(sub, flow_colors, plotly_template)
-            bp_o, bp_c = plot_pressure_boxplots(sub, flow_colors, plotly_template)
-            b1.plotly_chart(bd_o, use_container_width=True, key=f"{pod_name}_bd_open")
-            b2.plotly_chart(bp_o, use_container_width=True, key=f"{pod_name}_bp_open")
-            b3.plotly_chart(bd_c, use_container_width=True, key=f"{pod_name}_bd_close")
-            b4.plotly_chart(bp_c, use_container_width=True, key=f"{pod_name}_bp_close")
-
-            s1, s2, s3, s4 = st.columns(4)
-            scatter_figs = plot_scatter_by_flowcategory(
-                sub, flow_colors, flow_category_order, plotly_template
-            )
-            s1.plotly_chart(scatter_figs[0], use_container_width=True, key=f"{pod_name}_fr_open")
-            s2.plotly_chart(scatter_figs[1], use_container_width=True, key=f"{pod_name}_d_open")
-            s3.plotly_chart(scatter_figs[2], use_container_width=True, key=f"{pod_name}_fr_close")
-            s4.plotly_chart(scatter_figs[3], use_container_width=True, key=f"{pod_name}_d_close")
+            with render_profile.section("Distributions"):
+                st.subheader("Pressure and Flow Distribution by Flow Category")
+                c1, c2, c3, c4 = st.columns(4)
+                po, bo, pc, bc = plot_open_close_pie_bar(sub, flow_colors)
+                render_profile.plotly_chart(c1, po, use_container_width=True, key=f"{pod_name}_pie_open")
+                render_profile.plotly_chart(c2, bo, use_container_width=True, key=f"{pod_name}_bar_open")
+                render_profile.plotly_chart(c3, pc, use_container_width=True, key=f"{pod_name}_pie_close")
+                render_profile.plotly_chart(c4, bc, use_container_width=True, key=f"{pod_name}_bar_close")
+
+                b1, b2, b3, b4 = st.columns(4)
+                bd_o, bd_c = plot_boxplots(sub, flow_colors, plotly_template)
+                bp_o, bp_c = plot_pressure_boxplots(sub, flow_colors, plotly_template)
+                render_profile.plotly_chart(b1, bd_o, use_container_width=True, key=f"{pod_name}_bd_open")
+                render_profile.plotly_chart(b2, bp_o, use_container_width=True, key=f"{pod_name}_bp_open")
+                render_profile.plotly_chart(b3, bd_c, use_container_width=True, key=f"{pod_name}_bd_close")
+                render_profile.plotly_chart(b4, bp_c, use_container_width=True, key=f"{pod_name}_bp_close")
+
+                s1, s2, s3, s4 = st.columns(4)
+                scatter_figs = plot_scatter_by_flowcategory(
+                    sub, flow_colors, flow_category_order, plotly_template
+                )
+                render_profile.plotly_chart(s1, scatter_figs[0], use_container_width=True, key=f"{pod_name}_fr_open")
+                render_profile.plotly_chart(s2, scatter_figs[1], use_container_width=True, key=f"{pod_name}_d_open")
+                render_profile.plotly_chart(s3, scatter_figs[2], use_container_width=True, key=f"{pod_name}_fr_close")
+                render_profile.plotly_chart(s4, scatter_figs[3], use_container_width=True, key=f"{pod_name}_d_close")
 
-            st.subheader("Pressure and Flow Over Time")
-            ts_fig = plot_time_series(sub, plotly_template, oc_colors)
-            st.plotly_chart(ts_fig, use_container_width=True, key=f"{pod_name}_time")
+            with render_profile.section("Time series"):
+                st.subheader("Pressure and Flow Over Time")
+                ts_fig = plot_time_series(sub, plotly_template, oc_colors)
+                render_profile.plotly_chart(st, ts_fig, use_container_width=True, key=f"{pod_name}_time")
 
-            st.subheader("Accumulator Totalizer")
-            fig_acc = plot_accumulator(vol_df, plotly_template)
-            st.plotly_chart(fig_acc, use_container_width=True, key=f"{pod_name}_acc")
+            with render_profile.section("Accumulator"):
+                st.subheader("Accumulator Totalizer")
+                fig_acc = plot_accumulator(vol_df, plotly_template)
+                render_profile.plotly_chart(st, fig_acc, use_container_width=True, key=f"{pod_name}_acc")
 
             st.markdown("---")
-            st.subheader("Valve Event Statistics")
-            stats_table = generate_statistics_table(pod_events)
-            if stats_table.empty:
-                st.info("No statistics available for this selection.")
-            else:
-                st.dataframe(
-                    stats_table,
-                    use_container_width=True,
-                    hide_index=True,
-                    key=f"{pod_name}_stats"
-                )
-
-            st.subheader("Valve Event Details")
-            details_table = generate_details_table(pod_events)
-            if details_table.empty:
-                st.info("No event details available for this selection.")
-            else:
-                st.dataframe(
-                    details_table,
-                    use_container_width=True,
-                    hide_index=True,
-                    key=f"{pod_name}_details"
-                )
+            with render_profile.section("Statistics table"):
+                st.subheader("Valve Event Statistics")
+                stats_table = generate_statistics_table(pod_events)
+                if stats_table.empty:
+                    st.info("No statistics available for this selection.")
+                else:
+                    render_profile.dataframe(
+                        st,
+                        stats_table,
+                        use_container_width=True,
+                        hide_index=True,
+                        key=f"{pod_name}_stats"
+                    )
+
+            with render_profile.section("Details table"):
+                st.subheader("Valve Event Details")
+                details_table = generate_details_table(pod_events)
+                if details_table.empty:
+                    st.info("No event details available for this selection.")
+                else:
+                    render_profile.dataframe(
+                        st,
+                        details_table,
+                        use_container_width=True,
+                        hide_index=True,
+                        key=f"{pod_name}_details"
+                    )
+                    _render_details_export(details_table, pod_name)
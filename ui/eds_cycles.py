@@ -2,135 +2,60 @@
 
 import streamlit as st
 import pandas as pd
-from logic.dashboard_data import get_timeseries_data
-from datetime import timedelta
+from logic.eds import cached_eds_signals, analyze_eds_windows, WINDOW_OPTIONS
+from logic import event_store
+from logic.instrumentation import stage
+from ui_components import render_profile
 
-EDS_CHANNELS = ["Ba", "Bb", "Ya", "Yb"]
-POD_CHANNEL_MAP = {1: "Ba", 2: "Bb", 3: "Ya", 4: "Yb"}
 
-def get_eds_triggers_and_valve_events(
-    rig, start, end, valve_map, simple_map, function_map, vol_ext, active_pod_tag, eds_base_tag, window_seconds=900
-):
-    all_triggers = []
-    all_valve_events = []
-    pod_tag = active_pod_tag
-    pod_df = get_timeseries_data(pod_tag, start, end)
-    pod_df["timestamp"] = pd.to_datetime(pod_df["timestamp"])
-    pod_df = pod_df.sort_values("timestamp")
-    vol_df = get_timeseries_data(vol_ext, start, end)
-    if not vol_df.empty:
-        vol_df['timestamp_dt'] = pd.to_datetime(vol_df['timestamp'])
-        vol_df = vol_df.sort_values('timestamp_dt')
-
-    trigger_list = []
-    for ch in EDS_CHANNELS:
-        if rig == "Drillmax":
-            eds_tag = f"{eds_base_tag}{ch}EDSProgress"
-        else:
-            eds_tag = f"{eds_base_tag}{ch}.{ch}EDSProgress"
-        
-        prog_df = get_timeseries_data(eds_tag, start, end)
-        if prog_df.empty:
-            continue
-        prog_df['timestamp_dt'] = pd.to_datetime(prog_df['timestamp'])
-        prog_df = prog_df.sort_values('timestamp_dt')
-        prog_df['prev_value'] = prog_df['value'].shift(1).fillna(0)
-        triggers = prog_df[(prog_df['prev_value'] == 0) & (prog_df['value'] > 0)].reset_index(drop=True)
-
-        for _, trig_row in triggers.iterrows():
-            trigger_time = trig_row['timestamp_dt']
-            trigger_val = trig_row['value']
-            pod_row = pod_df[pod_df['timestamp'] <= trigger_time]
-            if not pod_row.empty:
-                pod_val = int(pod_row.iloc[-1]['value'])
-                pod = 'Blue Pod' if pod_val in [1, 2] else 'Yellow Pod'
-            else:
-                pod_val = None
-                pod = 'Unknown'
-            if pod_val in POD_CHANNEL_MAP and POD_CHANNEL_MAP[pod_val] == ch:
-                trig_val_display = int(trigger_val) if int(trigger_val) == trigger_val else trigger_val
-                trigger_list.append({
-                    "Channel": ch,
-                    "EDS Command Time": trigger_time,
-                    "Pod at Command": pod,
-                    "EDS Command Value": trig_val_display,
-                })
-
-    triggers_df = pd.DataFrame(trigger_list)
-    if triggers_df.empty:
-        return pd.DataFrame(), pd.DataFrame()
-
-    triggers_df = triggers_df.sort_values("EDS Command Time").reset_index(drop=True)
-    triggers_df.insert(0, "Event #", triggers_df.index + 1)
+def _format_window(seconds):
+    if seconds < 60:
+        return f"{seconds} s"
+    if seconds < 3600:
+        return f"{seconds // 60} min"
+    return f"{seconds // 3600} h"
 
-    total_vols = []
-    for i, row in triggers_df.iterrows():
-        this_time = row["EDS Command Time"]
-        if i + 1 < len(triggers_df):
-            next_time = triggers_df.iloc[i + 1]["EDS Command Time"]
-            window_end = min(this_time + timedelta(seconds=window_seconds), next_time)
-        else:
-            window_end = this_time + timedelta(seconds=window_seconds)
-
-        total_vol = None
-        if not vol_df.empty:
-            vol_window = vol_df[
-                (vol_df['timestamp_dt'] >= this_time) &
-                (vol_df['timestamp_dt'] < window_end)
-            ]
-            if not vol_window.empty:
-                vol_min = vol_window['value'].min()
-                vol_max = vol_window['value'].max()
-                total_vol = round((vol_max - vol_min) / 10, 2)
-        total_vols.append(total_vol)
-
-        for valve_name, tag in valve_map.items():
-            valve_df = get_timeseries_data(tag, this_time, window_end)
-            if valve_df.empty:
-                continue
-            valve_df = valve_df.sort_values('timestamp')
-            valve_df['prev_value'] = valve_df['value'].shift(1)
-            transitions = valve_df[valve_df['value'] != valve_df['prev_value']].dropna().reset_index(drop=True)
-            for _, vrow in transitions.iterrows():
-                event_time = pd.to_datetime(vrow['timestamp'])
-                seconds_after = (event_time - this_time).total_seconds()
-                if 0 <= seconds_after < (window_end - this_time).total_seconds():
-                    raw_code = int(vrow['value'])
-                    # Use per-valve mappings
-                    event_type = simple_map[valve_name].get(raw_code, "OTHER")
-                    function_type = function_map[valve_name].get(raw_code, "OTHER")
-                    display_state = event_type
-                    all_valve_events.append({
-                        "EDS Command Time": this_time,
-                        "EDS Command Value": row["EDS Command Value"],
-                        "Valve Name": valve_name,
-                        "Valve Event": display_state,
-                        "Function State": function_type,
-                        "Raw Status Code": raw_code,
-                        "Valve Event Time": event_time,
-                        "Seconds After Command": int(seconds_after)
-                    })
-
-    triggers_df["Total Volume (gal)"] = total_vols
-    valve_events_df = pd.DataFrame(all_valve_events)
-    return triggers_df, valve_events_df
 
 def render_eds_cycles(
     rig, start_date, end_date,
     valve_map=None, per_valve_simple_map=None, per_valve_function_map=None,
     vol_ext=None, active_pod_tag=None, eds_base_tag=None
 ):
+    # Months in the materialized store are read as tables; signals are only
+    # fetched for the rest of the range (logic/event_store.py)
+    plan = event_store.plan_range(rig, start_date, end_date)
     cache_key = f"eds_data_{rig}_{start_date}_{end_date}"
     if (cache_key not in st.session_state) or st.button("Reload EDS Data"):
-        triggers_df, valve_events_df = get_eds_triggers_and_valve_events(
-            rig, start_date, end_date,
-            valve_map, per_valve_simple_map, per_valve_function_map, vol_ext,
-            active_pod_tag, eds_base_tag,
-            window_seconds=900  # 15 min
+        if cache_key in st.session_state:
+            # Explicit reload: drop the shared copy too
+            cached_eds_signals.clear()
+        st.session_state[cache_key] = None if plan.live_start is None else cached_eds_signals(
+            rig, plan.live_fetch_start, end_date,
+            valve_map, vol_ext, active_pod_tag, eds_base_tag,
         )
-        st.session_state[cache_key] = (triggers_df, valve_events_df)
-    else:
-        triggers_df, valve_events_df = st.session_state[cache_key]
+        st.session_state.pop(f"{cache_key}_windows", None)
+    signals = st.session_state[cache_key]
+
+    window_seconds = st.select_slider(
+        "Post-command window",
+        options=WINDOW_OPTIONS,
+        value=900,
+        format_func=_format_window,
+        key="eds_window_seconds",
+    )
+
+    # Derived tables are cheap to re-slice, keep one per window length
+    windows_cache = st.session_state.setdefault(f"{cache_key}_windows", {})
+    if window_seconds not in windows_cache:
+        with stage("eds_windows", tag=str(window_seconds)):
+            live = (pd.DataFrame(), pd.DataFrame()) if signals is None else analyze_eds_windows(
+                signals, per_valve_simple_map, per_valve_function_map,
+                window_seconds=window_seconds,
+            )
+            live = tuple(plan.live_rows(t, df) for t, df in zip(("eds_triggers", "eds_valve_events"), live))
+            stored = event_store.stored_eds_windows(rig, plan, start_date, end_date, window_seconds)
+            windows_cache[window_seconds] = event_store.stitch_eds(stored, live)
+    triggers_df, valve_events_df = windows_cache[window_seconds]
 
     st.subheader("EDS Command Log")
     if triggers_df.empty:
@@ -138,10 +63,10 @@ def render_eds_cycles(
         return
 
     show_cols = ["Event #", "EDS Command Time", "Pod at Command", "EDS Command Value", "Total Volume (gal)"]
-    st.dataframe(triggers_df[show_cols], use_container_width=True, hide_index=True)
+    render_profile.dataframe(st, triggers_df[show_cols], use_container_width=True, hide_index=True)
 
     def format_cmd_row(row):
-        t = pd.to_datetime(row["EDS Command Time"]).strftime("%Y-%m-%d %H:%M:%S")
+        t = row["EDS Command Time"].strftime("%Y-%m-%d %H:%M:%S")
         return f"{row['Event #']}) {t} | {row['Pod at Command']} | Value: {row['EDS Command Value']}"
 
     st.subheader("Select an EDS Command to View Related Valve Events")
@@ -154,7 +79,7 @@ def render_eds_cycles(
         format_func=lambda i: select_options[i]
     )
 
-    st.subheader("Valve Events After Selected EDS Command (up to 15 min or next EDS)")
+    st.subheader(f"Valve Events After Selected EDS Command (up to {_format_window(window_seconds)} or next EDS)")
     if selected_idx == 0:
         filtered_events = valve_events_df
     else:
@@ -164,7 +89,8 @@ def render_eds_cycles(
     if filtered_events.empty:
         st.info("No valve events found after the selected EDS command.")
     else:
-        st.dataframe(
+        render_profile.dataframe(
+            st,
             filtered_events[
                 [
                     "EDS Command Time",
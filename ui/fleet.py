@@ -0,0 +1,64 @@
+# ui/fleet.py
+
+import streamlit as st
+import plotly.express as px
+
+from logic.fleet import run_fleet
+from logic.tag_maps import RIG_LABELS
+from ui_components import render_profile
+
+
+class _PartialFleet(Exception):
+    def __init__(self, tables):
+        super().__init__("some rigs failed")
+        self.tables = tables
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_fleet_tables(start_date, end_date, category_windows: dict, rare_threshold: int):
+    tables = run_fleet(start_date, end_date, category_windows, rare_threshold)
+    if tables[2]:
+        # st.cache_data does not keep raised results: rigs that failed are
+        # retried on the next run instead of shown as failed for an hour
+        raise _PartialFleet(tables)
+    return tables
+
+
+def _fleet_tables(start_date, end_date, category_windows: dict, rare_threshold: int):
+    try:
+        return _cached_fleet_tables(start_date, end_date, category_windows, rare_threshold)
+    except _PartialFleet as e:
+        return e.tables
+
+
+def render_fleet(start_date, end_date, category_windows: dict, rare_threshold: int, plotly_template: str):
+    st.title("Fleet")
+    st.caption(
+        f"All rigs, {start_date} to {end_date}. Pressure cycles count those at or above "
+        f"the Rare threshold ({rare_threshold:,} psi)."
+    )
+
+    with st.spinner("Running the pipeline for every rig…"):
+        rig_df, class_df, errors = _fleet_tables(start_date, end_date, dict(category_windows), rare_threshold)
+    for rig, err in errors.items():
+        st.error(f"{RIG_LABELS.get(rig, rig)}: {err}")
+    if rig_df.empty:
+        st.info("No rig returned data for the selected range.")
+        return
+
+    rig_df = rig_df.assign(Rig=rig_df["Rig"].map(RIG_LABELS).fillna(rig_df["Rig"]))
+    class_df = class_df.assign(Rig=class_df["Rig"].map(RIG_LABELS).fillna(class_df["Rig"]))
+
+    st.markdown("### By rig")
+    render_profile.dataframe(st, rig_df.round(2), use_container_width=True, hide_index=True)
+
+    st.markdown("### By valve class")
+    c1, c2 = st.columns(2)
+    for col, metric in ((c1, "Total Volume (gal)"), (c2, "Pressure Cycles")):
+        fig = px.bar(
+            class_df, x="Valve Class", y=metric, color="Rig", barmode="group",
+            template=plotly_template, title=metric,
+        )
+        fig.update_layout(height=360, margin=dict(l=20, r=20, t=40, b=20))
+        render_profile.plotly_chart(col, fig, use_container_width=True)
+    render_profile.dataframe(st, class_df.round(2), use_container_width=True, hide_index=True)
@@ -0,0 +1,82 @@
+# ui/long_range.py
+#
+# Long-Range Trends: accumulator gallons by pod and pressure envelopes per
+# day or week, read from rollups (logic/rollups.py). The page never holds
+# the range's raw samples, so a year costs a few thousand buckets per
+# signal. Valve events need raw transitions and stay on the other pages.
+
+from datetime import timedelta
+
+import streamlit as st
+import plotly.graph_objects as go
+
+from config import ROLLUPS
+from logic.preprocessing import to_ms
+from logic.rollups import accumulator_usage, pressure_envelope
+from logic.tag_maps import get_rig_tags
+from utils.colors import BY_COLORS
+from ui_components import render_profile
+
+PERIODS = {"Day": "1D", "Week": "W"}
+# Envelopes from hourly buckets for daily periods, daily ones for weeks
+ENVELOPE_LEVELS = {"1D": "1h", "W": "1D"}
+
+
+def _usage_chart(usage, period, template):
+    fig = go.Figure()
+    for pod in usage.columns:
+        if usage[pod].sum() > 0:
+            fig.add_trace(go.Bar(x=usage.index, y=usage[pod], name=str(pod),
+                                 marker_color=BY_COLORS.get(pod, "#999999")))
+    fig.update_layout(
+        title=f"Accumulator Gallons per {period} by Pod", barmode="stack", template=template,
+        height=320, margin=dict(l=20, r=20, t=40, b=20), yaxis_title="gal",
+    )
+    return fig
+
+
+def _envelope_chart(env, name, period, template):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=env.index, y=env["max"], mode="lines", line=dict(width=0),
+                             showlegend=False, hoverinfo="skip"))
+    fig.add_trace(go.Scatter(x=env.index, y=env["min"], mode="lines", line=dict(width=0), fill="tonexty",
+                             name="min/max", opacity=0.3))
+    fig.add_trace(go.Scatter(x=env.index, y=env["mean"], mode="lines+markers", name="mean"))
+    fig.update_layout(
+        title=f"{name} Envelope per {period}", template=template,
+        height=320, margin=dict(l=20, r=20, t=40, b=20), yaxis_title="psi",
+    )
+    return fig
+
+
+def render_long_range(rig, start_date, end_date, plotly_template):
+    st.title("Long-Range Trends")
+    if not ROLLUPS:
+        st.info("Rollups are turned off (ROLLUPS=0).")
+        return
+    st.caption(f"{start_date} to {end_date}, from 1 h / 1 day rollups rather than raw samples.")
+
+    tags = get_rig_tags(rig)
+    sm = to_ms(start_date)
+    em = to_ms(end_date + timedelta(days=1)) - 1
+    period = st.radio("Period", list(PERIODS), horizontal=True, key="long_range_period")
+    freq = PERIODS[period]
+
+    with render_profile.section("Accumulator"):
+        with st.spinner("Summarizing the accumulator…"):
+            usage = accumulator_usage(tags["vol_ext"], tags["active_pod_tag"], sm, em, freq)
+        if usage.empty:
+            st.info("No accumulator data for the selected range.")
+        else:
+            render_profile.plotly_chart(st, _usage_chart(usage, period, plotly_template), use_container_width=True)
+
+    with render_profile.section("Pressure envelope"):
+        names = list(tags["pressure_map"])
+        default = names.index("Well Pressure") if "Well Pressure" in names else 0
+        name = st.selectbox("Pressure", names, index=default, key="long_range_pressure")
+        with st.spinner(f"Summarizing {name}…"):
+            env = pressure_envelope(tags["pressure_map"][name], sm, em, freq, ENVELOPE_LEVELS[freq])
+        if env.empty:
+            st.info(f"No {name} data for the selected range.")
+        else:
+            render_profile.plotly_chart(st, _envelope_chart(env, name, period, plotly_template), use_container_width=True)
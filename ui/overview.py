@@ -5,6 +5,7 @@ import pandas as pd
 import plotly.express as px
 
 from utils.colors import BY_COLORS, FLOW_COLORS, FLOW_CATEGORY_ORDER
+from ui_components import render_profile
 
 PIE_SIZE     = 300
 BOX_SIZE     = 300
@@ -52,18 +53,10 @@ def render_overview(
         for _, row in df2.iterrows()
     ]
 
-    vol = vol_df.copy()
-    if "timestamp" in vol.columns:
-        vol["timestamp"] = pd.to_datetime(vol["timestamp"])
-    elif isinstance(vol.index, pd.DatetimeIndex):
-        vol = vol.reset_index().rename(columns={vol.index.name or "index": "timestamp"})
-        vol["timestamp"] = pd.to_datetime(vol["timestamp"])
-    else:
-        vol = vol.reset_index().rename(columns={vol.columns[0]: "timestamp"})
-        vol["timestamp"] = pd.to_datetime(vol["timestamp"])
-    vol = vol[vol["Active Pod"].isin(["Blue Pod", "Yellow Pod"])]
+    # vol_df is indexed by the canonical (sorted, naive-UTC) time axis
+    vol = vol_df.reset_index().rename(columns={vol_df.index.name or "index": "timestamp"})
+    vol = vol[vol["Active Pod"].isin(["Blue Pod", "Yellow Pod"])].copy()
 
-    vol = vol.sort_values("timestamp")
     vol["time_diff"] = vol["timestamp"].diff().dt.total_seconds().fillna(0)
     vol["pod_prev"]  = vol["Active Pod"].shift().fillna(vol["Active Pod"])
     time_by_pod = (
@@ -97,7 +90,7 @@ def render_overview(
             domain=dict(x=[0.15,0.85], y=[0.15,0.85]), automargin=True
         )
         fig.update_layout(legend_title_text="Pod", margin=SMALL_MARGIN)
-        st.plotly_chart(fig, use_container_width=True)
+        render_profile.plotly_chart(st, fig, use_container_width=True)
 
     with c2:
         fig = px.pie(
@@ -113,7 +106,7 @@ def render_overview(
             domain=dict(x=[0.15,0.85], y=[0.15,0.85]), automargin=True
         )
         fig.update_layout(legend_title_text="Pod", margin=SMALL_MARGIN)
-        st.plotly_chart(fig, use_container_width=True)
+        render_profile.plotly_chart(st, fig, use_container_width=True)
 
     df2_cat = df2.assign(**{"Flow Category": pd.Categorical(
         df2["Flow Category"], categories=flow_category_order, ordered=True
@@ -132,7 +125,7 @@ def render_overview(
             height=BOX_SIZE, width=BOX_SIZE,
         )
         fig.update_layout(margin=SMALL_MARGIN, showlegend=True)
-        st.plotly_chart(fig, use_container_width=True)
+        render_profile.plotly_chart(st, fig, use_container_width=True)
 
     with c4:
         fig = px.box(
@@ -147,7 +140,7 @@ def render_overview(
             height=BOX_SIZE, width=BOX_SIZE,
         )
         fig.update_layout(margin=SMALL_MARGIN, showlegend=True)
-        st.plotly_chart(fig, use_container_width=True)
+        render_profile.plotly_chart(st, fig, use_container_width=True)
 
     st.markdown("---")
     col_blue, col_yellow, col_total = st.columns(3)
@@ -198,7 +191,7 @@ def render_overview(
         )
         fig.update_xaxes(title="Depletion (%)")
         fig.update_yaxes(automargin=True, tickfont=dict(size=12), title="")
-        container.plotly_chart(fig, use_container_width=True)
+        render_profile.plotly_chart(container, fig, use_container_width=True)
 
     with col_blue:
         plot_depletion("Blue Pod: Depletion by Flow Category", col_blue, df2[df2["Active Pod"] == "Blue Pod"])
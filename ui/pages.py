@@ -0,0 +1,65 @@
+# ui/pages.py
+#
+# Page registry. app.py imports a page's module, and the plotting stack it
+# pulls in, the first time the page is shown, so a run pays only for the
+# page on screen. First imports are timed into the run's diagnostics
+# ("import" stages) and the log. Pages that do not draw on the rig's
+# dashboard tables skip loading them entirely.
+
+import importlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from logic import instrumentation
+
+logger = logging.getLogger("pages")
+
+_timed = set()  # modules whose first import has been timed
+_timed_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class PageSpec:
+    module: str
+    function: str
+    needs_rig_data: bool = True  # renders from load_dashboard's tables
+
+
+PAGES = {
+    "Valve Analytics": PageSpec("ui.dashboard", "render_dashboard"),
+    "Pods Overview": PageSpec("ui.overview", "render_overview"),
+    "EDS Cycles": PageSpec("ui.eds_cycles", "render_eds_cycles"),
+    "Pressure Cycles": PageSpec("ui.pressure_cycles", "render_pressure_cycles"),
+    "Analog Trends": PageSpec("ui.analog_trends", "render_analog_trends", needs_rig_data=False),
+    "Long-Range Trends": PageSpec("ui.long_range", "render_long_range", needs_rig_data=False),  # reads rollups
+    "Fleet": PageSpec("ui.fleet", "render_fleet", needs_rig_data=False),  # runs every rig itself
+}
+
+
+def lazy_import(module):
+    """importlib.import_module, timing the first import. Always goes
+    through import_module: its per-module lock makes a session that races
+    another one's first import wait for the module to finish initializing."""
+    with _timed_lock:
+        first = module not in _timed
+        _timed.add(module)
+    if not first:
+        return importlib.import_module(module)
+    with instrumentation.stage("import", tag=module):
+        t0 = time.perf_counter()
+        loaded = importlib.import_module(module)
+    logger.info(f"[PAGES] Imported {module} in {time.perf_counter() - t0:.2f}s")
+    return loaded
+
+
+def needs_rig_data(page) -> bool:
+    spec = PAGES.get(page)
+    return spec is None or spec.needs_rig_data
+
+
+def page_renderer(page):
+    """The page's render function, importing its module on first use."""
+    spec = PAGES[page]
+    return getattr(lazy_import(spec.module), spec.function)
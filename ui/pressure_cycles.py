@@ -7,6 +7,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 
 from logic.pressure_cycles import analyze_pressure_cycles
+from ui_components import render_profile
 from ui_components.pressure_cycles_viz import (
     plot_regulator_pressure_cycles, 
     plot_well_pressure_cycles,
@@ -26,10 +27,7 @@ def render_pressure_cycles(
         if isinstance(cycles_df, pd.DataFrame) and not cycles_df.empty:
             local_cycles = cycles_df.copy()
         else:
-            wps = well_pressure_series.copy()
-            wps.index = pd.to_datetime(wps.index)
-            wps = wps.sort_index()
-            local_cycles = analyze_pressure_cycles(df, valve_map, wps)
+            local_cycles = analyze_pressure_cycles(df, valve_map, well_pressure_series)
 
     if local_cycles.empty:
         st.info("No valid pressure cycles found in the selected range.")
@@ -48,7 +46,7 @@ def render_pressure_cycles(
     st.markdown("#### Wet and Dry Cycles per Valve")
     cc1, cc2 = st.columns([2, 3])
     with cc1:
-        st.dataframe(wet_dry_table, use_container_width=True, hide_index=True, height=min(400, 48 + 35*len(wet_dry_table)))
+        render_profile.dataframe(st, wet_dry_table, use_container_width=True, hide_index=True, height=min(400, 48 + 35*len(wet_dry_table)))
     with cc2:
         fig_wd = go.Figure(data=[
             go.Bar(name='Wet', x=wet_dry_table["Valve"], y=wet_dry_table["Wet Cycles"]),
@@ -60,7 +58,7 @@ def render_pressure_cycles(
             legend=dict(orientation='h', yanchor='top', y=0.98, xanchor='right', x=0.99),
             xaxis_title='Valve', yaxis_title='Cycle Count', height=300,
         )
-        st.plotly_chart(fig_wd, use_container_width=True)
+        render_profile.plotly_chart(st, fig_wd, use_container_width=True)
 
     def time_above_threshold(cycles_df_in, threshold):
         df_ = cycles_df_in.copy()
@@ -73,15 +71,15 @@ def render_pressure_cycles(
     st.markdown(f"#### Time Above {RARE_CYCLE_THRESHOLD} psi per Valve")
     cta1, cta2 = st.columns([2, 3])
     with cta1:
-        st.dataframe(summary_df, use_container_width=True, hide_index=True, height=min(400, 48 + 35*len(summary_df)))
+        render_profile.dataframe(st, summary_df, use_container_width=True, hide_index=True, height=min(400, 48 + 35*len(summary_df)))
     with cta2:
         fig2 = px.bar(summary_df, x="Valve", y=f"Time > {RARE_CYCLE_THRESHOLD} psi (min)", color="Valve")
         fig2.update_layout(showlegend=False, margin=dict(l=20, r=20, t=20, b=20), xaxis_title='Valve', yaxis_title=f"Time > {RARE_CYCLE_THRESHOLD} psi (min)", height=300)
-        st.plotly_chart(fig2, use_container_width=True)
+        render_profile.plotly_chart(st, fig2, use_container_width=True)
 
     rare_cycles = local_cycles[local_cycles["Max Well Pressure"] >= RARE_CYCLE_THRESHOLD]
     st.markdown(f"#### Cycles with Max Well Pressure ≥ {RARE_CYCLE_THRESHOLD} psi")
-    st.dataframe(rare_cycles, use_container_width=True, hide_index=True, height=min(300, 48 + 35*len(rare_cycles)))
+    render_profile.dataframe(st, rare_cycles, use_container_width=True, hide_index=True, height=min(300, 48 + 35*len(rare_cycles)))
     if not rare_cycles.empty:
         st.info(f"{len(rare_cycles)} cycles exceeded {RARE_CYCLE_THRESHOLD} psi.")
 
@@ -97,15 +95,15 @@ def render_pressure_cycles(
     )
     fig.update_traces(marker=dict(size=8, opacity=0.8), selector=dict(mode='markers'))
     fig.update_layout(legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=0.98), margin=dict(l=20, r=20, t=20, b=20))
-    st.plotly_chart(fig, use_container_width=True)
+    render_profile.plotly_chart(st, fig, use_container_width=True)
 
     st.markdown("#### Top 5 Cycles: Pressure × Duration")
     local_cycles["StressMetric"] = local_cycles["Max Well Pressure"] * local_cycles["Duration (min)"]
     top_extreme = local_cycles.sort_values("StressMetric", ascending=False).head(5)
-    st.dataframe(top_extreme, use_container_width=True, hide_index=True, height=280)
+    render_profile.dataframe(st, top_extreme, use_container_width=True, hide_index=True, height=280)
 
     st.markdown("#### All Valve Pressure Cycles")
-    st.dataframe(local_cycles, use_container_width=True, hide_index=True, height=min(700, 48 + 35*len(local_cycles)))
+    render_profile.dataframe(st, local_cycles, use_container_width=True, hide_index=True, height=min(700, 48 + 35*len(local_cycles)))
 
     if not rare_cycles.empty:
         st.markdown("#### Per-Cycle Pressure Trends for Close Cycles (Above Rare Threshold)")
@@ -122,19 +120,19 @@ def render_pressure_cycles(
             else:
                 from ui_components.pressure_cycles_viz import plot_regulator_pressure_cycles, regulator_pressure_summary_table
                 fig = plot_regulator_pressure_cycles(valve_cycles, regulator_pressure_series)
-                st.plotly_chart(fig, use_container_width=True)
+                render_profile.plotly_chart(st, fig, use_container_width=True)
                 reg_table = regulator_pressure_summary_table(valve_cycles, regulator_pressure_series)
                 st.markdown("###### Regulator Pressure Table for Rare Cycles")
-                st.dataframe(reg_table, use_container_width=True, hide_index=True)
+                render_profile.dataframe(st, reg_table, use_container_width=True, hide_index=True)
                 st.markdown("###### Full Regulator Pressure Trend (Selected Valve)")
                 fig_trend = go.Figure()
                 fig_trend.add_trace(go.Scatter(x=regulator_pressure_series.index, y=regulator_pressure_series.values, mode="lines", name="Regulator Pressure", line=dict(width=2)))
                 fig_trend.update_layout(xaxis_title="Timestamp", yaxis_title="Regulator Pressure (psi)", height=250, margin=dict(l=20, r=20, t=30, b=20))
-                st.plotly_chart(fig_trend, use_container_width=True)
+                render_profile.plotly_chart(st, fig_trend, use_container_width=True)
         with c2:
             st.markdown("##### Well Pressure (Rare Close Cycles)")
             from ui_components.pressure_cycles_viz import plot_well_pressure_cycles
             fig_wp = plot_well_pressure_cycles(valve_cycles, well_pressure_series)
-            st.plotly_chart(fig_wp, use_container_width=True)
+            render_profile.plotly_chart(st, fig_wp, use_container_width=True)
     else:
         st.info("No rare cycles to display regulator or well pressure data.")
@@ -1,13 +1,18 @@
 import streamlit as st
 from datetime import datetime, timedelta
 
+from config import DEFAULT_LOOKBACK_DAYS
+from logic.depletion import DEFAULT_CATEGORY_WINDOWS as _W
+from logic.tag_maps import RIG_LABELS, RIGS
+from ui.pages import PAGES
+
 def render_sidebar(default_rig: str | None = None, default_page: str | None = None):
     today = datetime.today()
-    default_start = today - timedelta(days=60)
+    default_start = today - timedelta(days=DEFAULT_LOOKBACK_DAYS)
     default_end = today
 
-    rigs = ["TransoceanDPS", "TransoceanDTH", "TransoceanDPT", "Drillmax"]
-    rig_labels = ["Doom", "Thanos", "Venom", "Drillmax"]
+    rigs = RIGS
+    rig_labels = [RIG_LABELS[r] for r in rigs]
     default_index = rigs.index(default_rig) if default_rig in rigs else 0
 
     selected_label = st.sidebar.selectbox(
@@ -18,13 +23,7 @@ def render_sidebar(default_rig: str | None = None, default_page: str | None = No
     )
     rig = rigs[rig_labels.index(selected_label)]
 
-    all_pages = [
-        "Valve Analytics",
-        "Pods Overview",
-        "EDS Cycles",
-        "Pressure Cycles",
-        "Analog Trends",
-    ]
+    all_pages = list(PAGES)
     page_index = all_pages.index(default_page) if default_page in all_pages else 0
     page = st.sidebar.radio("Select Page", all_pages, index=page_index, key="sidebar_page")
 
@@ -33,11 +32,11 @@ def render_sidebar(default_rig: str | None = None, default_page: str | None = No
 
     st.sidebar.markdown("### Ramp Detection Window (seconds)")
     category_windows = {
-        "Annular":      st.sidebar.slider("Annular", 5, 60, 30),
-        "Pipe Ram":     st.sidebar.slider("Pipe Ram", 5, 90, 60),
-        "Shear Ram":    st.sidebar.slider("Shear Ram", 10, 120, 90),
-        "Casing Shear": st.sidebar.slider("Casing Shear", 10, 180, 120),
-        "Connector":    st.sidebar.slider("Connector", 10, 180, 120),
+        "Annular":      st.sidebar.slider("Annular", 5, 60, _W["Annular"]),
+        "Pipe Ram":     st.sidebar.slider("Pipe Ram", 5, 90, _W["Pipe Ram"]),
+        "Shear Ram":    st.sidebar.slider("Shear Ram", 10, 120, _W["Shear Ram"]),
+        "Casing Shear": st.sidebar.slider("Casing Shear", 10, 180, _W["Casing Shear"]),
+        "Connector":    st.sidebar.slider("Connector", 10, 180, _W["Connector"]),
     }
 
     st.sidebar.markdown("### Cycle Thresholds")
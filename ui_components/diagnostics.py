@@ -0,0 +1,97 @@
+# ui_components/diagnostics.py
+
+import pandas as pd
+import streamlit as st
+
+from logic.fetch_scheduler import get_scheduler
+from logic.memo import memo_stats
+from logic.rate_control import get_limiter
+from logic.tag_catalog import get_tag_catalog
+
+MB = 2 ** 20
+
+
+def stage_table(trace) -> pd.DataFrame:
+    """One row per stage name: calls, total/max seconds, rows, MB, peak MB."""
+    rows = pd.DataFrame([vars(r) for r in trace.records])
+    if rows.empty:
+        return rows
+    out = rows.groupby("stage", sort=False).agg(
+        calls=("stage", "size"),
+        total_s=("seconds", "sum"),
+        max_s=("seconds", "max"),
+        rows_in=("rows_in", "sum"),
+        rows_out=("rows_out", "sum"),
+        mb=("bytes", "sum"),
+        peak_mb=("peak_bytes", "max"),
+        first_at_s=("offset_s", "min"),
+    ).reset_index()
+    out["mb"] = out["mb"] / MB
+    out["peak_mb"] = out["peak_mb"] / MB
+    return out.sort_values("first_at_s").round(3)
+
+
+def memo_table() -> pd.DataFrame:
+    """Process-wide memoization counters per function (logic/memo.py)."""
+    stats = memo_stats()
+    if not stats:
+        return pd.DataFrame()
+    df = pd.DataFrame.from_dict(stats, orient="index").rename_axis("function").reset_index()
+    df["function"] = df["function"].str.rsplit(".", n=1).str[-1]
+    return df
+
+
+def fetch_table(trace) -> pd.DataFrame:
+    rows = [r for r in trace.records if r.stage == "fetch"]
+    if not rows:
+        return pd.DataFrame()
+    df = pd.DataFrame({
+        "tag": [r.tag for r in rows],
+        "seconds": [r.seconds for r in rows],
+        "rows": [r.rows_out for r in rows],
+        "mb": [(r.bytes or 0) / MB for r in rows],
+        "thread": [r.thread for r in rows],
+    })
+    return df.sort_values("seconds", ascending=False).round(3)
+
+
+def render_diagnostics(trace):
+    if trace is None:
+        return
+    summary = trace.summary()
+    with st.expander("Diagnostics", expanded=False):
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Run (s)", f"{summary['seconds'] or 0:.2f}")
+        c2.metric("Fetches", summary["fetches"])
+        c3.metric("Fetch time (s, summed)", f"{summary['fetch_seconds']:.2f}")
+        c4.metric("Fetched (MB)", f"{summary['fetch_bytes'] / MB:.1f}")
+        sched = get_scheduler().stats()
+        rate = get_limiter().stats()
+        st.caption(
+            f"Trace {summary['trace']} · {summary['name']} · fetch pool: "
+            f"{sched['in_flight']}/{sched['max_workers']} in flight, {sched['queued']} queued "
+            f"({sched['sessions_waiting']} sessions waiting), {sched['cancelled']} cancelled · "
+            f"upstream concurrency {rate['in_flight']}/{rate['limit']}, {rate['throttled']} throttled"
+        )
+        catalog = get_tag_catalog()
+        if catalog is not None:
+            cat = catalog.stats()
+            st.caption(
+                f"Tag catalog: {cat['tags']} tags known ({cat['dead']} without data, {cat['pending']} pending) · "
+                f"{cat['skipped']} fetches skipped, {cat['clipped']} clipped"
+            )
+
+        stages = stage_table(trace)
+        if stages.empty:
+            st.info("No pipeline stages ran this run (everything was served from cache).")
+            return
+        st.markdown("##### Stages")
+        st.dataframe(stages, use_container_width=True, hide_index=True)
+        fetches = fetch_table(trace)
+        if not fetches.empty:
+            st.markdown("##### Fetches by tag")
+            st.dataframe(fetches, use_container_width=True, hide_index=True)
+        memo = memo_table()
+        if not memo.empty:
+            st.markdown("##### Memoized functions (since server start)")
+            st.dataframe(memo, use_container_width=True, hide_index=True)
@@ -0,0 +1,33 @@
+# ui_components/live_status.py
+
+import streamlit as st
+
+import config
+
+_APP_RUN = "_live_tail_app_run"
+
+
+@st.fragment(run_every=config.LIVE_POLL_S)
+def _live_poll(key):
+    tail = st.session_state.get(key)
+    if tail is None:
+        return
+    # A full app run has just drawn the page from the tail's tables; only
+    # the fragment's own timer reruns poll, and rerun the app on new data
+    if not st.session_state.pop(_APP_RUN, False):
+        if tail.refresh()["new_points"]:
+            st.rerun()
+    s = tail.last_refresh
+    if s:
+        st.caption(
+            f"Live · polled {s['at']:%H:%M:%S} · {s['new_points']} new points · "
+            f"{s['events_recomputed']} events, {s['cycles_recomputed']} cycles updated in {s['seconds']} s"
+        )
+
+
+def render_live_status(key):
+    """Sidebar status line that polls the LiveTail in ``st.session_state[key]``
+    every LIVE_POLL_S seconds."""
+    st.session_state[_APP_RUN] = True
+    with st.sidebar:
+        _live_poll(key)
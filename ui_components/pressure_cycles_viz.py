@@ -12,7 +12,7 @@ def plot_regulator_pressure_cycles(valve_cycles, regulator_pressure_series):
         interval = regulator_pressure_series.loc[t0:t1]
         if interval.empty:
             continue
-        times = (pd.to_datetime(interval.index) - pd.to_datetime(t0)).total_seconds() / 60
+        times = (interval.index - t0).total_seconds() / 60
         label = f"Cycle {i+1} ({t0.strftime('%Y-%m-%d %H:%M')})"
         fig.add_trace(go.Scatter(
             x=times,
@@ -50,7 +50,7 @@ def plot_well_pressure_cycles(valve_cycles, well_pressure_series):
         interval = well_pressure_series.loc[t0:t1]
         if interval.empty:
             continue
-        times = (pd.to_datetime(interval.index) - pd.to_datetime(t0)).total_seconds() / 60
+        times = (interval.index - t0).total_seconds() / 60
         label = f"Cycle {i+1} ({t0.strftime('%Y-%m-%d %H:%M')})"
         fig.add_trace(go.Scatter(
             x=times,
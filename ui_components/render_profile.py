@@ -0,0 +1,184 @@
+# ui_components/render_profile.py
+#
+# Opt-in render profiler (?profile=1). Pages route figures and tables through
+# ``plotly_chart`` / ``dataframe`` below and group their work with
+# ``section``; while a profile is active each call also records build time,
+# serialized payload size and trace/point or row counts. Without an active
+# profile the wrappers just call Streamlit.
+
+import contextvars
+import io
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import pandas as pd
+import plotly.io as pio
+import pyarrow as pa
+import streamlit as st
+from pandas.io.formats.style import Styler
+
+KB = 1024
+
+_current = contextvars.ContextVar("render_profile", default=None)
+
+# Trace attributes that carry per-point data, largest wins
+_POINT_ATTRS = ("x", "y", "z", "values", "lat", "lon", "r", "theta")
+
+
+@dataclass
+class RenderRecord:
+    kind: str  # "section", "figure" or "dataframe"
+    section: str
+    name: str
+    seconds: float
+    bytes: int | None = None
+    traces: int | None = None
+    points: int | None = None
+    rows: int | None = None
+    columns: int | None = None
+
+
+@dataclass
+class RenderProfile:
+    name: str
+    started: float = field(default_factory=time.perf_counter)
+    seconds: float | None = None
+    records: list = field(default_factory=list)
+    path: list = field(default_factory=list)
+    _seq: int = 0
+
+    def section_name(self) -> str:
+        return " / ".join(self.path) or "(page)"
+
+    def next_name(self, kind) -> str:
+        self._seq += 1
+        return f"{kind} {self._seq}"
+
+
+def begin(name: str, enabled: bool):
+    profile = RenderProfile(name) if enabled else None
+    _current.set(profile)
+    return profile
+
+
+def end(profile):
+    if profile is None:
+        return None
+    profile.seconds = time.perf_counter() - profile.started
+    if _current.get() is profile:
+        _current.set(None)
+    return profile
+
+
+@contextmanager
+def section(name: str):
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    profile.path.append(name)
+    label = profile.section_name()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.path.pop()
+        profile.records.append(RenderRecord("section", label, name, time.perf_counter() - t0))
+
+
+def figure_stats(fig) -> tuple[int, int, int]:
+    """(JSON bytes, traces, points) of a Plotly figure as sent to the browser."""
+    points = 0
+    for trace in fig.data:
+        sizes = [len(v) for v in (getattr(trace, a, None) for a in _POINT_ATTRS)
+                 if v is not None and hasattr(v, "__len__") and not isinstance(v, str)]
+        points += max(sizes, default=0)
+    return len(pio.to_json(fig, validate=False)), len(fig.data), points
+
+
+def frame_stats(data) -> tuple[int, int, int]:
+    """(Arrow IPC bytes, rows, columns) of a table passed to st.dataframe."""
+    df = data.data if isinstance(data, Styler) else data
+    if not isinstance(df, pd.DataFrame):
+        df = pd.DataFrame(df)
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.tell(), len(df), df.shape[1]
+
+
+def plotly_chart(target, fig, **kwargs):
+    """``target.plotly_chart(fig, **kwargs)``; target is ``st`` or a container."""
+    profile = _current.get()
+    if profile is None:
+        return target.plotly_chart(fig, **kwargs)
+    t0 = time.perf_counter()
+    out = target.plotly_chart(fig, **kwargs)
+    seconds = time.perf_counter() - t0
+    size, traces, points = figure_stats(fig)
+    name = kwargs.get("key") or fig.layout.title.text or profile.next_name("figure")
+    profile.records.append(RenderRecord(
+        "figure", profile.section_name(), str(name), seconds, bytes=size, traces=traces, points=points,
+    ))
+    return out
+
+
+def dataframe(target, data, **kwargs):
+    """``target.dataframe(data, **kwargs)``; target is ``st`` or a container."""
+    profile = _current.get()
+    if profile is None:
+        return target.dataframe(data, **kwargs)
+    t0 = time.perf_counter()
+    out = target.dataframe(data, **kwargs)
+    seconds = time.perf_counter() - t0
+    size, rows, cols = frame_stats(data)
+    name = kwargs.get("key") or profile.next_name("table")
+    profile.records.append(RenderRecord(
+        "dataframe", profile.section_name(), str(name), seconds, bytes=size, rows=rows, columns=cols,
+    ))
+    return out
+
+
+def summary_frames(profile) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(sections, widgets) tables: sections by build time, widgets by payload."""
+    rows = pd.DataFrame([vars(r) for r in profile.records])
+    if rows.empty:
+        return rows, rows
+    rows["kb"] = rows["bytes"] / KB
+    sections = (
+        rows[rows["kind"] == "section"][["section", "seconds"]]
+        .sort_values("seconds", ascending=False)
+    )
+    widgets = rows[rows["kind"] != "section"]
+    payload = widgets.groupby("section")["kb"].sum().rename("payload_kb")
+    count = widgets.groupby("section").size().rename("widgets")
+    sections = sections.join(payload, on="section").join(count, on="section")
+    widgets = (
+        widgets[["section", "kind", "name", "seconds", "kb", "traces", "points", "rows", "columns"]]
+        .sort_values("kb", ascending=False)
+    )
+    return sections.round(4).reset_index(drop=True), widgets.round(4).reset_index(drop=True)
+
+
+def render_profile(profile):
+    if profile is None:
+        return
+    sections, widgets = summary_frames(profile)
+    with st.expander("Render profile", expanded=True):
+        figures = widgets[widgets["kind"] == "figure"] if not widgets.empty else widgets
+        tables = widgets[widgets["kind"] == "dataframe"] if not widgets.empty else widgets
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Script run (s)", f"{profile.seconds or 0:.2f}")
+        c2.metric("Figures", len(figures))
+        c3.metric("Tables", len(tables))
+        c4.metric("Payload (MB)", f"{(widgets['kb'].sum() if not widgets.empty else 0) / KB:.2f}")
+        if widgets.empty and sections.empty:
+            st.info("Nothing was rendered through the profiler this run.")
+            return
+        # Rendered with plain st.dataframe so the profile does not profile itself
+        st.markdown("##### Sections")
+        st.dataframe(sections, use_container_width=True, hide_index=True)
+        st.markdown("##### Figures and tables (largest payload first)")
+        st.dataframe(widgets, use_container_width=True, hide_index=True)
@@ -27,7 +27,7 @@ def generate_statistics_table(df: pd.DataFrame) -> pd.DataFrame:
     }
     result = (
         df
-        .groupby(["valve", "state", "Active Pod"])
+        .groupby(["valve", "state", "Active Pod"], observed=True)
         .agg(**agg_dict)
         .round(2)
         .reset_index()